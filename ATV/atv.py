@@ -10,17 +10,29 @@ istekler gönderir. Bu yöntem en hızlı, en güvenilir ve en kalıcı çözüm
 
 import os
 import sys
+import json
 import time
 import logging
+import argparse
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm
 from slugify import slugify
-from requests.adapters import HTTPAdapter, Retry
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # ortak paket (common/)
+from common.checkpoint import Checkpoint
+from common.engine import Engine
+from common.htmlparse import find_attribute, find_response_attribute, make_soup
+from common.http_cache import HTTPCache
+from common.m3u_index import PlaylistIndex
+from common.manifest import write_if_changed
+from common.metrics import METRICS, write_report
+from common.ratelimit import HostLimiter, RateScheduler
+from common.session import make_session
+from common.source import Source
+from common.stream_cache import StreamCache
 
 # ============================
 # 1. TEMEL AYARLAR VE SABİTLER
@@ -28,8 +40,11 @@ from requests.adapters import HTTPAdapter, Retry
 BASE_DIR = Path(__file__).resolve().parent
 ALL_M3U_DIR = str(BASE_DIR)
 ALL_M3U_NAME = "ATV"
+MANIFEST_NAME = "m3u_manifest.json"
 DIZILER_M3U_DIR = str(BASE_DIR / "diziler")
 PROGRAMLAR_M3U_DIR = str(BASE_DIR / "programlar")
+# Artımlı mod için yan durum dosyası: içerik -> bilinen bölümler (ad, sayfa, yayın linki)
+STATE_PATH = str(BASE_DIR / "atv_state.json")
 
 BASE_URL = "https://www.atv.com.tr/"
 DIZILER_PAGE_URL = urljoin(BASE_URL, "diziler")
@@ -38,7 +53,20 @@ CONTENT_API_URL = urljoin(BASE_URL, "services/get-all-series-and-programs-by-cat
 STREAM_API_URL = "https://vms.atv.com.tr/vms/api/Player/GetVideoPlayer"
 
 REQUEST_TIMEOUT = 45
-MAX_RETRIES = 5
+
+# Eşzamanlı çözümleme ayarları: toplam işçi sayısı ve aynı sunucuya aynı anda
+# gidebilecek en fazla istek sayısı. MAX_WORKERS = 1 her adımı tek işçiyle (seri) çalıştırır.
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 4
+# Host başına saniyedeki başlangıç istek sayısı; 429/503 alındıkça düşer,
+# sorunsuz istekler sürdükçe yeniden artar.
+RATE_LIMIT = 20.0
+
+# Kalıcı yayın linki önbelleği: arşiv bölümlerinin video ID'leri değişmez, yayın
+# linkleri ise haftada bir yeniden doğrulanır.
+VIDEO_ID_TTL_DAYS = 365
+STREAM_TTL_DAYS = 30
+STREAM_REVALIDATE_DAYS = 7
 
 # GERÇEK BİR TARAYICIYI TAKLİT EDEN BAŞLIKLAR
 DEFAULT_HEADERS = {
@@ -54,61 +82,26 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s |
 log = logging.getLogger("atv-scraper")
 
 # Otomatik tekrar deneme ve cookie yönetimi için Session
-SESSION = requests.Session()
-retries = Retry(total=MAX_RETRIES, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-SESSION.mount("https://", HTTPAdapter(max_retries=retries))
-SESSION.headers.update(DEFAULT_HEADERS)
+SESSION = make_session(DEFAULT_HEADERS)
 
-# ============================
-# 2. M3U OLUŞTURMA YARDIMCILARI (DEĞİŞİKLİK YOK)
-# ============================
-def _ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
 
-def _atomic_write(path: str, text: str) -> None:
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
-        f.write(text)
-    os.replace(tmp, path)
+HOST_LIMITER = HostLimiter(PER_HOST_LIMIT)
+STREAM_CACHE: Optional[StreamCache] = None
+HTTP_CACHE: Optional[HTTPCache] = None
+
 
+def _get(url: str, **kwargs: Any) -> requests.Response:
+    """SESSION.get çağrısını host limiti altında yapar."""
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    with HOST_LIMITER.slot(url):
+        return SESSION.get(url, **kwargs)
+
+# ============================
+# 2. M3U ÇIKTI YARDIMCILARI
+# ============================
 def _safe_series_filename(name: str) -> str:
     return slugify((name or "icerik").lower()) + ".m3u"
 
-def create_m3us_for_category(channel_folder_path: str, data: List[Dict[str, Any]]) -> None:
-    _ensure_dir(channel_folder_path)
-    for item in data:
-        episodes = item.get("episodes") or []
-        if not episodes: continue
-        item_name = item.get("name", "Bilinmeyen").strip()
-        item_logo = item.get("img", "").strip()
-        plist_path = os.path.join(channel_folder_path, _safe_series_filename(item_name))
-        lines = ["#EXTM3U"]
-        for ep in episodes:
-            stream = ep.get("stream_url")
-            if not stream: continue
-            ep_name = ep.get("name", "Bölüm")
-            group = item_name.replace('"', "'")
-            lines.append(f'#EXTINF:-1 tvg-logo="{item_logo}" group-title="{group}",{ep_name}')
-            lines.append(stream)
-        if len(lines) > 1: _atomic_write(plist_path, "\n".join(lines) + "\n")
-
-def create_single_m3u(channel_folder_path: str, data: List[Dict[str, Any]], custom_path: str) -> None:
-    _ensure_dir(channel_folder_path)
-    master_path = os.path.join(channel_folder_path, f"{custom_path}.m3u")
-    lines = ["#EXTM3U"]
-    for item in data:
-        item_name = item.get("name", "Bilinmeyen").strip()
-        item_logo = item.get("img", "").strip()
-        episodes = item.get("episodes", [])
-        for ep in episodes:
-            stream = ep.get("stream_url")
-            if not stream: continue
-            ep_name = ep.get("name", "Bölüm")
-            group = item_name.replace('"', "'")
-            lines.append(f'#EXTINF:-1 tvg-logo="{item_logo}" group-title="{group}",{ep_name}')
-            lines.append(stream)
-    _atomic_write(master_path, "\n".join(lines) + "\n")
-
 # ============================
 # 3. VERİ ÇEKME FONKSİYONLARI (API ODAKLI NİHAİ SÜRÜM)
 # ============================
@@ -123,14 +116,12 @@ def get_content_from_api(page_url: str, slug: str, content_type: str) -> List[Di
         # 1. Adım: Sayfayı ziyaret et ve gerekli cookie/token'ları al
         response = SESSION.get(page_url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        token_tag = soup.find("input", {"name": "__RequestVerificationToken"})
-        
-        if not token_tag or not token_tag.get("value"):
+        token = find_attribute(response.content, "input", "value", {"name": "__RequestVerificationToken"})
+
+        if not token:
             log.error("-> KRİTİK: CSRF token bulunamadı! Site yapısı değişmiş.")
             return []
-        
-        token = token_tag["value"]
+
         log.info("-> Kimlik bilgileri başarıyla alındı.")
 
         # 2. Adım: Alınan kimlik bilgileriyle API'ye POST isteği gönder
@@ -166,81 +157,257 @@ def get_content_from_api(page_url: str, slug: str, content_type: str) -> List[Di
         log.error("-> '%s' verisi işlenirken beklenmedik hata: %s", content_type, e)
         return []
 
-def get_episodes_and_streams(content_url: str) -> List[Dict[str, str]]:
-    """Bir içeriğin bölümlerini ve yayın linklerini çeker."""
+def parse_episode_list(html: bytes) -> List[Dict[str, str]]:
+    """/bolumler sayfasındaki bölüm adlarını ve sayfa adreslerini sırayla ayıklar."""
+    soup = make_soup(html)
+    episodes = []
+    for ep_link in soup.select("article.widget-item a"):
+        ep_name_div = ep_link.select_one("div.name")
+        if not (ep_link.get("href") and ep_name_div): continue
+        episodes.append({"name": ep_name_div.get_text(strip=True), "url": urljoin(BASE_URL, ep_link["href"])})
+    return episodes
+
+def list_episodes(content_url: str) -> List[Dict[str, str]]:
+    """İçeriğin /bolumler sayfasındaki bölümleri; sayfa değişmediyse önceki ayrıştırma sonucu."""
     episodes_url = urljoin(content_url.rstrip('/') + "/", "bolumler")
-    processed_episodes = []
     try:
-        response = SESSION.get(episodes_url, timeout=REQUEST_TIMEOUT)
+        if HTTP_CACHE is not None:
+            return HTTP_CACHE.get_parsed(_get, episodes_url, parse_episode_list, key="atv-bolumler")
+        response = _get(episodes_url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        episode_links = soup.select("article.widget-item a")
-
-        for ep_link in tqdm(episode_links, desc=f"   -> Bölümler", leave=False):
-            ep_name_div = ep_link.select_one("div.name")
-            if not (ep_link.get("href") and ep_name_div): continue
-            
-            ep_url = urljoin(BASE_URL, ep_link["href"])
-            ep_name = ep_name_div.get_text(strip=True)
-            
-            try:
-                ep_page_response = SESSION.get(ep_url, timeout=REQUEST_TIMEOUT)
-                ep_page_response.raise_for_status()
-                ep_soup = BeautifulSoup(ep_page_response.content, "html.parser")
-                video_container = ep_soup.find("div", {"id": "video-container", "data-videoid": True})
-                
-                if video_container and video_container.get("data-videoid"):
-                    video_id = video_container["data-videoid"]
-                    stream_response = SESSION.get(STREAM_API_URL, params={"id": video_id})
-                    stream_response.raise_for_status()
-                    stream_url = stream_response.json()["data"]["video"]["url"]
-                    processed_episodes.append({"name": ep_name, "stream_url": stream_url})
-            except (requests.RequestException, KeyError, ValueError):
-                log.warning("--> '%s' için yayın linki alınamadı.", ep_name)
-                continue
-        return processed_episodes
+        return parse_episode_list(response.content)
     except requests.RequestException:
         return []
 
+def _fetch_video_id(ep_url: str) -> Optional[str]:
+    """Bölüm sayfasındaki video-container'dan video ID'sini okur; bulunca sayfanın kalanını indirmez."""
+    ep_page_response = _get(ep_url, stream=True)
+    try:
+        ep_page_response.raise_for_status()
+    except requests.RequestException:
+        ep_page_response.close()
+        raise
+    return find_response_attribute(ep_page_response, "div", "data-videoid", {"id": "video-container"})
+
+def _fetch_stream_url(ep_url: str, ep_name: str) -> Optional[str]:
+    """Video ID'sini (önbellekten ya da sayfadan) alıp GetVideoPlayer ile yayın linkini çözer."""
+    try:
+        if STREAM_CACHE is not None:
+            video_id = STREAM_CACHE.resolve("atv-video", ep_url, lambda: _fetch_video_id(ep_url))
+        else:
+            video_id = _fetch_video_id(ep_url)
+        if not video_id:
+            return None
+        stream_response = _get(STREAM_API_URL, params={"id": video_id})
+        stream_response.raise_for_status()
+        return stream_response.json()["data"]["video"]["url"]
+    except (requests.RequestException, KeyError, ValueError):
+        log.warning("--> '%s' için yayın linki alınamadı.", ep_name)
+        return None
+
+class ATVSource(Source):
+    """ATV dizi ve programları: API'deki içerik listesi -> /bolumler sayfası -> GetVideoPlayer."""
+
+    name = "atv"
+    master_path = os.path.join(ALL_M3U_DIR, f"{ALL_M3U_NAME}.m3u")
+    manifest_name = MANIFEST_NAME
+    stream_ttl_days = STREAM_TTL_DAYS
+    stream_revalidate_days = STREAM_REVALIDATE_DAYS
+    session = SESSION
+
+    def list_content(self) -> List[Dict[str, Any]]:
+        diziler = get_content_from_api(DIZILER_PAGE_URL, "diziler", "dizi")
+        programlar = get_content_from_api(PROGRAMLAR_PAGE_URL, "programlar", "program")
+        return diziler + programlar
+
+    def list_episodes(self, content: Dict[str, Any]) -> List[Dict[str, str]]:
+        return list_episodes(content["url"])
+
+    def resolve_stream(self, episode: Dict[str, Any]) -> Optional[str]:
+        return _fetch_stream_url(episode["url"], episode["name"])
+
+    def group_path(self, content: Dict[str, Any]) -> Optional[str]:
+        folder = {"dizi": DIZILER_M3U_DIR, "program": PROGRAMLAR_M3U_DIR}.get(content.get("type"))
+        return os.path.join(folder, _safe_series_filename(content.get("name", "Bilinmeyen").strip())) if folder else None
+
 # ============================
-# 4. ANA İŞLEM AKIŞI
+# 4. ARTIMLI (SADECE YENİ BÖLÜMLER) MOD
 # ============================
-def run() -> None:
-    diziler = get_content_from_api(DIZILER_PAGE_URL, "diziler", "dizi")
-    programlar = get_content_from_api(PROGRAMLAR_PAGE_URL, "programlar", "program")
-    
-    all_content = diziler + programlar
-    if not all_content:
-        log.critical("Hiçbir dizi veya program bulunamadı. İşlem durduruldu.")
-        return
-        
-    log.info("Toplam %d içerik bulundu. Bölümler ve yayın linkleri çekilecek...", len(all_content))
-    processed_data = []
+def load_state(path: str = STATE_PATH) -> Dict[str, Dict[str, Any]]:
+    """Önceki çalıştırmanın durum dosyasını (içerik adresi -> içerik) okur."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log.warning("Durum dosyası okunamadı, yok sayılıyor: %s", e)
+        return {}
 
-    for content in tqdm(all_content, desc="Tüm İçerikler"):
-        log.info("İşleniyor: %s (%s)", content["name"], content["type"].upper())
-        episodes_with_streams = get_episodes_and_streams(content["url"])
-        
-        if episodes_with_streams:
-            temp_content = dict(content)
-            temp_content["episodes"] = episodes_with_streams
-            processed_data.append(temp_content)
+def save_state(processed_data: List[Dict[str, Any]], path: str = STATE_PATH) -> None:
+    state = {item["url"]: item for item in processed_data}
+    write_if_changed(path, json.dumps(state, ensure_ascii=False, indent=1, sort_keys=True) + "\n")
 
-    if not processed_data:
-        log.error("Hiçbir bölüm için geçerli yayın linki bulunamadı. M3U dosyaları oluşturulmayacak.")
-        return
+def _category_dir(content: Dict[str, Any]) -> str:
+    return DIZILER_M3U_DIR if content.get("type") == "dizi" else PROGRAMLAR_M3U_DIR
 
-    log.info("Veri çekme tamamlandı. M3U dosyaları oluşturuluyor...")
+def _load_playlist_episodes(path: str) -> Dict[str, str]:
+    """Daha önce üretilmiş bir içerik M3U'sundan bölüm adı -> yayın linki eşlemesini okur."""
     try:
-        diziler_data = [item for item in processed_data if item.get("type") == "dizi"]
-        programlar_data = [item for item in processed_data if item.get("type") == "program"]
+        index = PlaylistIndex.load(path)
+    except OSError:
+        return {}
+    return dict(zip(index.titles(), index.urls()))
 
-        if diziler_data: create_m3us_for_category(DIZILER_M3U_DIR, diziler_data)
-        if programlar_data: create_m3us_for_category(PROGRAMLAR_M3U_DIR, programlar_data)
-        create_single_m3u(ALL_M3U_DIR, processed_data, ALL_M3U_NAME)
-        log.info("TÜM İŞLEMLER BAŞARIYLA TAMAMLANDI!")
-    except Exception as e:
-        log.critical("M3U dosyaları oluşturulurken hata: %s", e, exc_info=True)
+def _known_episodes(content: Dict[str, Any], state: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    İçeriğin zaten çözülmüş bölümlerini sayfa adresine göre döndürür. Durum dosyasında
+    kayıt yoksa mevcut M3U dosyasındaki bölümler ada göre eşleştirilmek üzere kullanılır.
+    """
+    previous = state.get(content["url"])
+    if previous:
+        return {ep.get("url") or ep["name"]: ep for ep in previous.get("episodes", [])}
+    playlist = os.path.join(_category_dir(content), _safe_series_filename(content["name"].strip()))
+    try:
+        # Eski listeden gelen linkler, listenin yazıldığı anda çözülmüş sayılır.
+        resolved_at = int(os.path.getmtime(playlist))
+    except OSError:
+        return {}
+    return {
+        name: {"name": name, "stream_url": stream, "resolved_at": resolved_at}
+        for name, stream in _load_playlist_episodes(playlist).items()
+    }
+
+def resolve_incrementally(engine: Engine, all_content: List[Dict[str, Any]],
+                          state: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Her içerik için yalnızca /bolumler sayfasını çeker, listeyi önceki çalıştırmayla
+    karşılaştırır ve sadece yeni bölümlerin ya da linki STREAM_REVALIDATE_DAYS'ten
+    eski olan bölümlerin yayın linklerini çözer. Yeniden çözüm başarısız olursa eski
+    link STREAM_TTL_DAYS dolana kadar kullanılır. Sayfada artık görünmeyen eski
+    bölümler listenin sonunda korunur.
+    """
+    now = time.time()
+    revalidate_after, ttl = STREAM_REVALIDATE_DAYS * 86400, STREAM_TTL_DAYS * 86400
+    episode_lists = engine.fetch_episode_lists(all_content)
+    merged: List[List[Optional[Dict[str, str]]]] = []
+    pending: List[tuple] = []
+    new_count = 0
+
+    def schedule(idx: int, episodes: List[Optional[Dict[str, str]]], ep: Dict[str, str],
+                 previous: Optional[Dict[str, Any]]) -> None:
+        age = now - (previous or {}).get("resolved_at", 0)
+        if previous and previous.get("stream_url") and age <= revalidate_after:
+            episodes.append(dict(previous, name=ep["name"], url=ep.get("url", previous.get("url", ""))))
+        elif ep.get("url"):
+            fallback = previous if previous and previous.get("stream_url") and age <= ttl else None
+            pending.append((idx, len(episodes), {"name": ep["name"], "url": ep["url"]}, fallback))
+            episodes.append(None)
+        elif previous and previous.get("stream_url") and age <= ttl:
+            episodes.append(previous)
+
+    for idx, (content, page_episodes) in enumerate(zip(all_content, episode_lists)):
+        known = _known_episodes(content, state)
+        episodes: List[Optional[Dict[str, str]]] = []
+        seen = set()
+        for ep in page_episodes:
+            key = ep["url"] if ep["url"] in known else ep["name"]
+            previous = known.get(key)
+            if previous:
+                seen.add(key)
+            else:
+                new_count += 1
+            schedule(idx, episodes, ep, previous)
+        # Sayfada görünmeyen (ya da sayfası alınamayan) eski bölümler korunur.
+        for key, previous in known.items():
+            if key not in seen:
+                schedule(idx, episodes, previous, previous)
+        merged.append(episodes)
+
+    log.info("Artımlı mod: %d yeni, %d süresi dolmak üzere olan bölüm çözülecek.",
+             new_count, len(pending) - new_count)
+    resolved_list = engine.resolve_episodes([ep for _, _, ep, _ in pending])
+    for (idx, pos, _, fallback), resolved in zip(pending, resolved_list):
+        merged[idx][pos] = resolved or fallback
+    return engine.collect(all_content, merged)
+
+# ============================
+# 5. ANA İŞLEM AKIŞI
+# ============================
+def run(workers: int = MAX_WORKERS, per_host: int = PER_HOST_LIMIT, use_cache: bool = True,
+        incremental: bool = False, resume: bool = False, max_runtime: Optional[float] = None,
+        rate: float = RATE_LIMIT, stream_cache: Optional[StreamCache] = None,
+        http_cache: Optional[HTTPCache] = None, lazy: Optional[str] = None) -> bool:
+    """
+    ATV listelerini üretir; M3U dosyaları yazıldıysa True döner. `stream_cache` /
+    `http_cache` verilirse (run_all.py'nin ortak önbellekleri) onlar kullanılır ve kapatılmaz.
+    `lazy` verilirse (ör. "http://127.0.0.1:8080") yayın linkleri çözülmez, bölümler bu
+    adresteki çözümleyiciye bağlanır; her çalıştırma tam liste taraması olduğundan
+    artımlı mod ve durum dosyası kullanılmaz.
+    """
+    global HOST_LIMITER, STREAM_CACHE, HTTP_CACHE
+    started = time.perf_counter()
+    checkpoint = Checkpoint("atv", resume=resume, max_runtime=max_runtime * 60 if max_runtime else None)
+    HOST_LIMITER = HostLimiter(per_host)
+    if use_cache:
+        STREAM_CACHE = stream_cache or StreamCache()
+        STREAM_CACHE.set_policy("atv-video", VIDEO_ID_TTL_DAYS)
+        HTTP_CACHE = http_cache or HTTPCache()
+    limiter = RateScheduler(rate, burst=per_host)
+    engine = Engine(ATVSource(), workers=workers, stream_cache=STREAM_CACHE, checkpoint=checkpoint, limiter=limiter,
+                    lazy_base=lazy)
+    try:
+        if incremental and not lazy:
+            state = load_state()
+            data = engine.run(lambda all_content: resolve_incrementally(engine, all_content, state))
+        else:
+            data = engine.run()
+        if data:
+            # Çözümleyici adresleri durum dosyasına yazılmaz; sonraki normal çalıştırma bunları link sanmasın.
+            if not lazy:
+                save_state(data)
+            log.info("TÜM İŞLEMLER BAŞARIYLA TAMAMLANDI!")
+        return bool(data)
+    finally:
+        # Başarılı çalışmada kayıt silinmiştir; yarıda kalan işler bir sonraki --resume için yazılır.
+        checkpoint.flush()
+        if STREAM_CACHE is not None and stream_cache is None:
+            STREAM_CACHE.log_stats(log)
+            STREAM_CACHE.close()
+        if HTTP_CACHE is not None and http_cache is None:
+            HTTP_CACHE.log_stats(log)
+            HTTP_CACHE.close()
+        STREAM_CACHE = HTTP_CACHE = None
+        log.info("Hız sınırlayıcı: %s", limiter.summary())
+        log.info("Toplam çalışma süresi: %.1f sn", time.perf_counter() - started)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ATV diziler/programlar M3U oluşturucu")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="Eşzamanlı işçi sayısı (1 = seri mod, varsayılan: %(default)s)")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT,
+                        help="Aynı sunucuya eşzamanlı en fazla istek (varsayılan: %(default)s)")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                        help="Host başına saniyedeki başlangıç istek sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Kalıcı yayın linki ve HTTP önbelleklerini kullanma")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Sadece yeni bölümleri çöz ve mevcut listelere ekle")
+    parser.add_argument("--resume", action="store_true",
+                        help="Yarıda kalan bir önceki çalıştırmanın ara kaydından devam et")
+    parser.add_argument("--max-runtime", type=float, default=None, metavar="DAKİKA",
+                        help="Bu süre dolunca yeni iş başlatma, ilerlemeyi kaydet ve çık")
+    parser.add_argument("--lazy", default=None, metavar="URL",
+                        help="Yayın linklerini çözme; bölümleri bu adresteki çözümleyiciye bağla "
+                             "(ör. http://127.0.0.1:8080, bkz. playlist_server.py --resolver)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    args = parse_args()
+    try:
+        run(workers=max(1, args.workers), per_host=args.per_host, use_cache=args.use_cache,
+            incremental=args.incremental, resume=args.resume, max_runtime=args.max_runtime, rate=args.rate,
+            lazy=args.lazy)
+    finally:
+        log.info("Ölçümler: %s", METRICS.summary())
+        write_report("atv", extra={"incremental": args.incremental})
\ No newline at end of file
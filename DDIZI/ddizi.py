@@ -11,16 +11,28 @@ import os
 import re
 import sys
 import time
+import asyncio
 import logging
+import argparse
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from urllib.parse import urljoin
 
+import httpx
 import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm
 from slugify import slugify
-from requests.adapters import HTTPAdapter, Retry
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # ortak paket (common/)
+from common.checkpoint import Checkpoint
+from common.engine import Engine
+from common.htmlparse import find_attribute, find_response_attribute, make_soup
+from common.http_cache import HTTPCache, MissingPage
+from common.metrics import METRICS, write_report
+from common.ratelimit import THROTTLE_STATUSES, RateScheduler
+from common.resolver import lazy_url
+from common.session import MAX_RETRIES, RETRY_STATUSES, make_session
+from common.source import Source
+from common.stream_cache import StreamCache
 
 # ============================
 # 1. TEMEL AYARLAR VE SABİTLER
@@ -28,14 +40,28 @@ from requests.adapters import HTTPAdapter, Retry
 BASE_DIR = Path(__file__).resolve().parent
 ALL_M3U_DIR = str(BASE_DIR)
 ALL_M3U_NAME = "DDIZI"
+MANIFEST_NAME = "m3u_manifest.json"
 SERIES_M3U_DIR = str(BASE_DIR / "diziler")
 
 BASE_URL = "https://www.ddizi.im/"
 # DÜZELTME: Sitenin doğru dizi listesi adresi "/arsiv" olarak güncellendi.
 SERIES_LIST_URL = urljoin(BASE_URL, "arsiv")
+FEMBED_API_BASE = "https://femax20.com/api/source/"
+FEMBED_IFRAME_RE = re.compile(r"//(femax20|supervideo)\.com")
 
 REQUEST_TIMEOUT = 30
-MAX_RETRIES = 5
+
+# Asenkron motor ayarları: eşzamanlı istek sayısı ve host başına hız sınırı
+# (saniyedeki başlangıç istek sayısı ve anlık patlama kapasitesi; 429/503
+# alındıkça düşer, sorunsuz istekler sürdükçe yeniden artar).
+ASYNC_CONCURRENCY = 16
+RATE_LIMIT = 10.0
+RATE_BURST = 10
+
+# Kalıcı yayın linki önbelleği (Fembed linkleri kısa ömürlü olabildiğinden
+# sık yeniden doğrulanır).
+STREAM_TTL_DAYS = 14
+STREAM_REVALIDATE_DAYS = 3
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
@@ -44,140 +70,129 @@ DEFAULT_HEADERS = {
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger("ddizi-scraper")
+# httpx her istek için INFO satırı basar; binlerce satırı önlemek için sadece uyarılar.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+SESSION = make_session(DEFAULT_HEADERS)
 
-SESSION = requests.Session()
-retries = Retry(total=MAX_RETRIES, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-SESSION.mount("https://", HTTPAdapter(max_retries=retries))
-SESSION.headers.update(DEFAULT_HEADERS)
+STREAM_CACHE: Optional[StreamCache] = None
+HTTP_CACHE: Optional[HTTPCache] = None
+CHECKPOINT: Optional[Checkpoint] = None
 
 # ============================
-# 2. M3U OLUŞTURMA YARDIMCILARI (DEĞİŞİKLİK YOK)
+# 2. M3U ÇIKTI YARDIMCILARI
 # ============================
-def _ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
-
-def _atomic_write(path: str, text: str) -> None:
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
-        f.write(text)
-    os.replace(tmp, path)
-
 def _safe_series_filename(name: str) -> str:
     return slugify((name or "dizi").lower()) + ".m3u"
 
-def create_m3us_for_series(channel_folder_path: str, data: List[Dict[str, Any]]) -> None:
-    _ensure_dir(channel_folder_path)
-    for series in data:
-        episodes = series.get("episodes") or []
-        if not episodes: continue
-        series_name = series.get("name", "Bilinmeyen").strip()
-        series_logo = series.get("img", "").strip()
-        plist_path = os.path.join(channel_folder_path, _safe_series_filename(series_name))
-        lines = ["#EXTM3U"]
-        for ep in episodes:
-            stream = ep.get("stream_url")
-            if not stream: continue
-            ep_name = ep.get("name", "Bölüm")
-            group = series_name.replace('"', "'")
-            lines.append(f'#EXTINF:-1 tvg-logo="{series_logo}" group-title="{group}",{ep_name}')
-            lines.append(stream)
-        if len(lines) > 1: _atomic_write(plist_path, "\n".join(lines) + "\n")
-
-def create_single_m3u(channel_folder_path: str, data: List[Dict[str, Any]], custom_path: str) -> None:
-    _ensure_dir(channel_folder_path)
-    master_path = os.path.join(channel_folder_path, f"{custom_path}.m3u")
-    lines = ["#EXTM3U"]
-    for series in data:
-        series_name = series.get("name", "Bilinmeyen").strip()
-        series_logo = series.get("img", "").strip()
-        episodes = series.get("episodes", [])
-        for ep in episodes:
-            stream = ep.get("stream_url")
-            if not stream: continue
-            ep_name = ep.get("name", "Bölüm")
-            group = series_name.replace('"', "'")
-            lines.append(f'#EXTINF:-1 tvg-logo="{series_logo}" group-title="{group}",{ep_name}')
-            lines.append(stream)
-    _atomic_write(master_path, "\n".join(lines) + "\n")
-
 # ============================
 # 3. VERİ ÇEKME FONKSİYONLARI (DDIZI.IM İÇİN ÖZEL)
 # ============================
 
+def parse_series_list(html: bytes, base_url: str = BASE_URL) -> List[Dict[str, str]]:
+    """Arşiv sayfasındaki dizi adlarını ve adreslerini ayıklar."""
+    soup = make_soup(html)
+    series_list = []
+    # Arşiv sayfasındaki seçici (selector) doğru, değişiklik gerekmiyor.
+    for link in soup.select("ul.dizi-list li a"):
+        if link.get("href"):
+            series_list.append({
+                "name": link.text.strip(),
+                "url": urljoin(base_url, link["href"])
+            })
+    return series_list
+
+def parse_series_page(html: bytes, base_url: str = BASE_URL) -> Tuple[str, List[Dict[str, str]]]:
+    """Dizi sayfasından posteri ve bölüm listesini ayıklar."""
+    soup = make_soup(html)
+    poster_img = ""
+    poster_tag = soup.select_one("div.dizi-poster img")
+    if poster_tag:
+        poster_img = urljoin(base_url, poster_tag.get("src", ""))
+
+    episodes = []
+    for link in soup.select("div.sezon-bolumleri ul li a"):
+        if link.get("href"):
+            episodes.append({
+                "name": link.text.strip(),
+                "url": urljoin(base_url, link["href"])
+            })
+    return poster_img, episodes
+
+def find_fembed_url(html: Any) -> Optional[str]:
+    """
+    Bölüm sayfasındaki Fembed/Supervideo iframe adresini döndürür. `html` bayt ya da
+    bayt parçaları olabilir; iframe bulunduğu anda okuma durur.
+    """
+    src = find_attribute(html, "iframe", "src", {"src": FEMBED_IFRAME_RE})
+    return "https:" + src if src else None
+
+def parse_fembed_response(api_data: Dict[str, Any]) -> Optional[str]:
+    """Fembed API cevabından en yüksek kaliteli kaynağın linkini seçer."""
+    if api_data.get("success") and api_data.get("data"):
+        highest_quality_source = api_data["data"][-1]
+        return highest_quality_source.get("file")
+    return None
+
+def _get_parsed(url: str, parse: Any, key: str) -> Any:
+    """Sayfayı (varsa HTTP önbelleği üzerinden koşullu olarak) çekip ayrıştırır."""
+    if HTTP_CACHE is not None:
+        return HTTP_CACHE.get_parsed(SESSION.get, url, parse, key=key, timeout=REQUEST_TIMEOUT)
+    response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return parse(response.content)
+
 def get_all_series() -> List[Dict[str, str]]:
     """Sitedeki tüm dizilerin listesini çeker."""
     log.info("Sitedeki tüm dizi listesi alınıyor: %s", SERIES_LIST_URL)
     try:
-        response = SESSION.get(SERIES_LIST_URL, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        series_list = []
-        # Arşiv sayfasındaki seçici (selector) doğru, değişiklik gerekmiyor.
-        links = soup.select("ul.dizi-list li a")
-        for link in links:
-            if link.get("href"):
-                series_list.append({
-                    "name": link.text.strip(),
-                    "url": urljoin(BASE_URL, link["href"])
-                })
+        series_list = _get_parsed(SERIES_LIST_URL, lambda html: parse_series_list(html, BASE_URL), "ddizi-arsiv")
         log.info("-> Başarılı: %d adet dizi bulundu.", len(series_list))
         return series_list
     except requests.RequestException as e:
         log.critical("Dizi listesi alınamadı, işlem durduruldu: %s", e)
         return []
 
-def get_episodes_for_series(series_url: str) -> Tuple[str, List[Dict[str, str]]]:
-    """Bir dizinin tüm bölümlerini ve posterini çeker."""
-    episodes = []
-    poster_img = ""
-    try:
-        response = SESSION.get(series_url, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        poster_tag = soup.select_one("div.dizi-poster img")
-        if poster_tag:
-            poster_img = urljoin(BASE_URL, poster_tag.get("src", ""))
-
-        episode_links = soup.select("div.sezon-bolumleri ul li a")
-        for link in episode_links:
-            if link.get("href"):
-                episodes.append({
-                    "name": link.text.strip(),
-                    "url": urljoin(BASE_URL, link["href"])
-                })
-        return poster_img, episodes
-    except requests.RequestException as e:
-        log.error("-> '%s' için bölümler alınamadı: %s", series_url, e)
-        return poster_img, []
+def _checkpoint_get(section: str, key: str) -> Any:
+    """Ara kayıttaki sonucu döndürür; kayıt yoksa None."""
+    return CHECKPOINT.get(section, key) if CHECKPOINT is not None else None
+
+def _out_of_time() -> bool:
+    """--max-runtime dolduysa True; yeni istek başlatılmaz."""
+    return CHECKPOINT is not None and CHECKPOINT.expired()
 
-def get_stream_url_from_episode(episode_url: str) -> Optional[str]:
+def _checkpoint_put(section: str, key: str, value: Any) -> None:
+    """
+    Başarılı sonuçları ortak motorun ara kayıt biçiminde kaydeder; başarısızlar
+    --resume'da yeniden denenir.
+    """
+    if CHECKPOINT is not None and value:
+        CHECKPOINT.put(section, key, value)
+
+def _fetch_stream_url(episode_url: str) -> Optional[str]:
     """Bölüm sayfasından video yayın linkini (m3u8) çeker."""
     try:
-        response = SESSION.get(episode_url, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        iframe = soup.find("iframe", {"src": re.compile(r"//(femax20|supervideo)\.com")})
-        if not iframe:
+        response = SESSION.get(episode_url, timeout=REQUEST_TIMEOUT, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.RequestException:
+            response.close()
+            raise
+
+        src = find_response_attribute(response, "iframe", "src", {"src": FEMBED_IFRAME_RE})
+        fembed_url = "https:" + src if src else None
+        if not fembed_url:
             log.warning("--> Fembed/Supervideo iframe'i bulunamadı.")
             return None
-        
-        fembed_url = "https:" + iframe["src"]
+
         video_id = fembed_url.split('/')[-1]
-        
-        fembed_api_url = f"https://femax20.com/api/source/{video_id}"
-        api_response = SESSION.post(fembed_api_url, headers={"Referer": fembed_url}, timeout=REQUEST_TIMEOUT)
+        api_response = SESSION.post(FEMBED_API_BASE + video_id, headers={"Referer": fembed_url}, timeout=REQUEST_TIMEOUT)
         api_response.raise_for_status()
-        
-        api_data = api_response.json()
-        if api_data.get("success") and api_data.get("data"):
-            highest_quality_source = api_data["data"][-1]
-            return highest_quality_source.get("file")
-            
-        log.warning("--> Fembed API'sinden geçerli veri alınamadı.")
-        return None
+
+        stream_url = parse_fembed_response(api_response.json())
+        if not stream_url:
+            log.warning("--> Fembed API'sinden geçerli veri alınamadı.")
+        return stream_url
     except requests.RequestException as e:
         log.warning("--> Yayın linki alınırken hata: %s", e)
         return None
@@ -185,52 +200,314 @@ def get_stream_url_from_episode(episode_url: str) -> Optional[str]:
         log.error("--> Yayın linki işlenirken beklenmedik hata: %s", e)
         return None
 
+class DdiziSource(Source):
+    """ddizi.im: arşiv sayfası -> dizi sayfası (poster + bölümler) -> bölüm sayfası + Fembed API."""
+
+    name = "ddizi"
+    master_path = os.path.join(ALL_M3U_DIR, f"{ALL_M3U_NAME}.m3u")
+    manifest_name = MANIFEST_NAME
+    stream_ttl_days = STREAM_TTL_DAYS
+    stream_revalidate_days = STREAM_REVALIDATE_DAYS
+    session = SESSION
+
+    def list_content(self) -> List[Dict[str, str]]:
+        return get_all_series()
+
+    def list_episodes(self, content: Dict[str, Any]) -> List[Dict[str, str]]:
+        try:
+            poster_img, episodes = _get_parsed(content["url"], lambda html: parse_series_page(html, BASE_URL), "ddizi-dizi")
+        except requests.RequestException as e:
+            log.error("-> '%s' için bölümler alınamadı: %s", content["url"], e)
+            return []
+        content["img"] = poster_img
+        return episodes
+
+    def resolve_stream(self, episode: Dict[str, Any]) -> Optional[str]:
+        return _fetch_stream_url(episode["url"])
+
+    def group_path(self, content: Dict[str, Any]) -> Optional[str]:
+        return os.path.join(SERIES_M3U_DIR, _safe_series_filename(content.get("name", "Bilinmeyen").strip()))
+
 # ============================
-# 4. ANA İŞLEM AKIŞI
+# 4. ASENKRON TARAMA MOTORU
 # ============================
-def run() -> None:
-    series_list = get_all_series()
-    if not series_list:
-        return
-        
-    log.info("Tüm diziler için bölümler ve yayın linkleri çekilecek...")
-    processed_data = []
-
-    for series in tqdm(series_list, desc="Tüm Diziler"):
-        log.info("İşleniyor: %s", series["name"])
-        poster_img, episodes = get_episodes_for_series(series["url"])
-        
-        if not episodes:
-            log.warning("-> '%s' için bölüm bulunamadı, atlanıyor.", series["name"])
-            continue
-
-        temp_series = dict(series)
-        temp_series["img"] = poster_img
-        temp_series["episodes"] = []
-
-        for ep in tqdm(episodes, desc=f"  -> {series['name']}", leave=False):
-            stream_url = get_stream_url_from_episode(ep["url"])
-            if stream_url:
-                ep_with_stream = dict(ep)
-                ep_with_stream["stream_url"] = stream_url
-                temp_series["episodes"].append(ep_with_stream)
-            time.sleep(0.1)
-
-        if temp_series["episodes"]:
-            processed_data.append(temp_series)
-
-    if not processed_data:
-        log.error("Hiçbir bölüm için geçerli yayın linki bulunamadı. M3U dosyaları oluşturulmayacak.")
-        return
-
-    log.info("Veri çekme tamamlandı. M3U dosyaları oluşturuluyor...")
+class AsyncCrawler:
+    """
+    Arşiv listesi -> dizi sayfaları -> bölüm sayfaları + Fembed API çağrılarını
+    sınırlı kuyruklarla birbirine bağlanmış eşzamanlı aşamalar olarak çalıştırır.
+    Tüm istekler tek bir keep-alive httpx istemcisini ve host başına ortak hız sınırlayıcıyı kullanır.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, fembed_api_base: str = FEMBED_API_BASE,
+                 concurrency: int = ASYNC_CONCURRENCY, rate: float = RATE_LIMIT, burst: int = RATE_BURST,
+                 limiter: Optional[RateScheduler] = None, lazy_base: Optional[str] = None) -> None:
+        self.base_url = base_url
+        self.fembed_api_base = fembed_api_base
+        self.concurrency = max(1, concurrency)
+        self.limiter = limiter or RateScheduler(rate, burst=burst)
+        # Verilirse bölüm sayfaları açılmaz; yayın linki yerine çözümleyici adresi yazılır.
+        self.lazy_base = lazy_base
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        SESSION'daki Retry politikasının asenkron karşılığı. 429/503'te bekleme süresini
+        (Retry-After dahil) hız sınırlayıcı belirler; diğer 5xx ve ağ hatalarında üstel bekleme.
+        Son yanıt, tekrarlar dahil geçen süre ve tekrar sayısıyla ölçümlere yazılır.
+        """
+        started, response, attempt = time.perf_counter(), None, 0
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                response = None
+                await self.limiter.wait_async(url)
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                    self.limiter.record_headers(url, response.status_code, response.headers)
+                    if response.status_code == 304:
+                        return response
+                    if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        response.raise_for_status()
+                        return response
+                    if response.status_code in THROTTLE_STATUSES:
+                        continue
+                except httpx.TransportError:
+                    if attempt == MAX_RETRIES:
+                        raise
+                await asyncio.sleep(2 ** attempt)
+            raise RuntimeError("unreachable")
+        finally:
+            METRICS.record_request(url, response.status_code if response is not None else None,
+                                   time.perf_counter() - started, len(response.content) if response is not None else 0,
+                                   retries=attempt)
+
+    async def _get_parsed(self, url: str, parse: Any, key: str) -> Any:
+        """Sayfayı koşullu GET ile çeker; HTTP önbelleğine göre değişmediyse ayrıştırmayı atlar."""
+        if HTTP_CACHE is None:
+            response = await self._request("GET", url)
+            return parse(response.content)
+        response = await self._request("GET", url, headers=HTTP_CACHE.validators(url))
+        try:
+            body, _, unchanged = HTTP_CACHE.complete(url, response.status_code, response.headers, response.content)
+        except MissingPage:
+            response = await self._request("GET", url)
+            body, _, unchanged = HTTP_CACHE.complete(url, response.status_code, response.headers, response.content)
+        return HTTP_CACHE.parse(url, body, unchanged, parse, key)
+
+    async def _series_worker(self, series_queue: asyncio.Queue, episode_queue: asyncio.Queue,
+                             results: List[Optional[Dict[str, Any]]]) -> None:
+        while True:
+            item = await series_queue.get()
+            try:
+                if item is None:
+                    return
+                idx, series = item
+                with METRICS.stage("ddizi/bölüm listesi"):
+                    try:
+                        saved = _checkpoint_get("episode_lists", series["url"])
+                        if saved is not None:
+                            poster_img, episodes = saved["content"].get("img", ""), saved["episodes"]
+                        elif _out_of_time():
+                            continue
+                        else:
+                            poster_img, episodes = await self._get_parsed(
+                                series["url"], lambda html: parse_series_page(html, self.base_url), "ddizi-dizi")
+                            _checkpoint_put("episode_lists", series["url"],
+                                            {"content": dict(series, img=poster_img), "episodes": episodes} if episodes else None)
+                    except httpx.HTTPError as e:
+                        log.error("-> '%s' için bölümler alınamadı: %s", series["url"], e)
+                        METRICS.mark_failed()
+                        continue
+                    except Exception as e:
+                        log.error("-> '%s' işlenirken beklenmedik hata: %s", series["url"], e)
+                        METRICS.mark_failed()
+                        continue
+                    if not episodes:
+                        log.warning("-> '%s' için bölüm bulunamadı, atlanıyor.", series["name"])
+                        continue
+                results[idx] = dict(series, img=poster_img, episodes=[None] * len(episodes))
+                for ep_idx, ep in enumerate(episodes):
+                    await episode_queue.put((idx, ep_idx, ep))
+            finally:
+                series_queue.task_done()
+
+    async def _episode_worker(self, episode_queue: asyncio.Queue, results: List[Optional[Dict[str, Any]]]) -> None:
+        while True:
+            item = await episode_queue.get()
+            try:
+                if item is None:
+                    return
+                idx, ep_idx, ep = item
+                if self.lazy_base is not None:
+                    results[idx]["episodes"][ep_idx] = dict(
+                        ep, stream_url=lazy_url(self.lazy_base, "ddizi", ep["url"]), resolved_at=int(time.time()))
+                    continue
+                with METRICS.stage("ddizi/yayın linki"):
+                    resolved = _checkpoint_get("resolved", ep["url"])
+                    if resolved is None and not _out_of_time():
+                        cached, fresh = STREAM_CACHE.lookup("ddizi", ep["url"]) if STREAM_CACHE else (None, False)
+                        if fresh:
+                            stream_url = cached
+                        else:
+                            stream_url = await self._resolve_episode(ep["url"])
+                            if STREAM_CACHE is not None:
+                                stream_url = STREAM_CACHE.settle("ddizi", ep["url"], stream_url, cached)
+                        # Önbellekten gelen linkin yaşı korunur; yeniden doğrulama saati sıfırlanmaz.
+                        resolved_at = STREAM_CACHE.resolved_at("ddizi", ep["url"]) \
+                            if STREAM_CACHE is not None and stream_url else None
+                        if stream_url:
+                            resolved = dict(ep, stream_url=stream_url, resolved_at=int(resolved_at or time.time()))
+                            _checkpoint_put("resolved", ep["url"], resolved)
+                    if resolved is None:
+                        METRICS.mark_failed()
+                    results[idx]["episodes"][ep_idx] = resolved
+            finally:
+                episode_queue.task_done()
+
+    async def _resolve_episode(self, episode_url: str) -> Optional[str]:
+        try:
+            response = await self._request("GET", episode_url)
+            fembed_url = find_fembed_url(response.content)
+            if not fembed_url:
+                log.warning("--> Fembed/Supervideo iframe'i bulunamadı.")
+                return None
+            video_id = fembed_url.split('/')[-1]
+            api_response = await self._request("POST", self.fembed_api_base + video_id, headers={"Referer": fembed_url})
+            stream_url = parse_fembed_response(api_response.json())
+            if not stream_url:
+                log.warning("--> Fembed API'sinden geçerli veri alınamadı.")
+            return stream_url
+        except httpx.HTTPError as e:
+            log.warning("--> Yayın linki alınırken hata: %s", e)
+            return None
+        except Exception as e:
+            log.error("--> Yayın linki işlenirken beklenmedik hata: %s", e)
+            return None
+
+    async def crawl(self) -> List[Dict[str, Any]]:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(headers=DEFAULT_HEADERS, timeout=REQUEST_TIMEOUT, limits=limits,
+                                     follow_redirects=True) as client:
+            self.client = client
+            series_list_url = urljoin(self.base_url, "arsiv")
+            log.info("Sitedeki tüm dizi listesi alınıyor: %s", series_list_url)
+            try:
+                with METRICS.stage("ddizi/içerik listesi"):
+                    series_list = await self._get_parsed(
+                        series_list_url, lambda html: parse_series_list(html, self.base_url), "ddizi-arsiv")
+            except httpx.HTTPError as e:
+                log.critical("Dizi listesi alınamadı, işlem durduruldu: %s", e)
+                return []
+            log.info("-> Başarılı: %d adet dizi bulundu.", len(series_list))
+
+            results: List[Optional[Dict[str, Any]]] = [None] * len(series_list)
+            series_queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+            episode_queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 4)
+            series_workers = max(1, self.concurrency // 4)
+            series_tasks = [asyncio.create_task(self._series_worker(series_queue, episode_queue, results))
+                            for _ in range(series_workers)]
+            episode_tasks = [asyncio.create_task(self._episode_worker(episode_queue, results))
+                             for _ in range(self.concurrency)]
+
+            for item in enumerate(series_list):
+                await series_queue.put(item)
+            for _ in series_tasks:
+                await series_queue.put(None)
+            await asyncio.gather(*series_tasks)
+            for _ in episode_tasks:
+                await episode_queue.put(None)
+            await asyncio.gather(*episode_tasks)
+            self.client = None
+
+        processed_data = []
+        for series in results:
+            if not series:
+                continue
+            series["episodes"] = [ep for ep in series["episodes"] if ep]
+            if series["episodes"]:
+                processed_data.append(series)
+        return processed_data
+
+# ============================
+# 5. ANA İŞLEM AKIŞI
+# ============================
+def run(engine: str = "async", concurrency: int = ASYNC_CONCURRENCY, rate: float = RATE_LIMIT,
+        use_cache: bool = True, resume: bool = False, max_runtime: Optional[float] = None,
+        stream_cache: Optional[StreamCache] = None, http_cache: Optional[HTTPCache] = None,
+        lazy: Optional[str] = None) -> bool:
+    """
+    `engine="async"` httpx tabanlı asenkron tarayıcıyı, `"sync"` ortak (thread tabanlı)
+    motoru kullanır; iki durumda da çıktı, önbellek ve ara kayıt ortak motordan geçer.
+    M3U dosyaları yazıldıysa True döner. `stream_cache` / `http_cache` verilirse
+    (run_all.py'nin ortak önbellekleri) onlar kullanılır ve kapatılmaz. `lazy` verilirse
+    yayın linkleri çözülmez; bölümler bu adresteki çözümleyiciye bağlanır.
+    """
+    global STREAM_CACHE, HTTP_CACHE, CHECKPOINT
+    started = time.perf_counter()
+    checkpoint = Checkpoint("ddizi", resume=resume, max_runtime=max_runtime * 60 if max_runtime else None)
+    if use_cache:
+        STREAM_CACHE = stream_cache or StreamCache()
+        HTTP_CACHE = http_cache or HTTPCache()
+    limiter = RateScheduler(rate, burst=max(1, int(rate)))
+    runner = Engine(DdiziSource(), workers=concurrency, stream_cache=STREAM_CACHE, checkpoint=checkpoint,
+                    limiter=limiter if engine == "sync" else None, lazy_base=lazy)
     try:
-        create_m3us_for_series(SERIES_M3U_DIR, processed_data)
-        create_single_m3u(ALL_M3U_DIR, processed_data, ALL_M3U_NAME)
-        log.info("TÜM İŞLEMLER BAŞARIYLA TAMAMLANDI!")
-    except Exception as e:
-        log.critical("M3U dosyaları oluşturulurken hata: %s", e, exc_info=True)
+        if engine == "async":
+            CHECKPOINT = checkpoint
+            crawler = AsyncCrawler(BASE_URL, FEMBED_API_BASE, concurrency=concurrency, limiter=limiter, lazy_base=lazy)
+            data = runner.publish(asyncio.run(crawler.crawl()))
+        else:
+            data = runner.run()
+        if data:
+            log.info("TÜM İŞLEMLER BAŞARIYLA TAMAMLANDI!")
+        return bool(data)
+    finally:
+        # Başarılı çalışmada kayıt silinmiştir; yarıda kalan işler bir sonraki --resume için yazılır.
+        checkpoint.flush()
+        CHECKPOINT = None
+        if STREAM_CACHE is not None and stream_cache is None:
+            STREAM_CACHE.log_stats(log)
+            STREAM_CACHE.close()
+        if HTTP_CACHE is not None and http_cache is None:
+            HTTP_CACHE.log_stats(log)
+            HTTP_CACHE.close()
+        STREAM_CACHE = HTTP_CACHE = None
+        log.info("Hız sınırlayıcı: %s", limiter.summary())
+        log.info("Toplam çalışma süresi: %.1f sn", time.perf_counter() - started)
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("sıfırdan büyük bir değer olmalı")
+    return number
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DDIZI.im M3U oluşturucu")
+    parser.add_argument("--engine", choices=("async", "sync"), default="async",
+                        help="Tarama motoru: async (httpx) ya da sync (ortak thread tabanlı motor) "
+                             "(varsayılan: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_CONCURRENCY,
+                        help="Eşzamanlı istek (sync motorda aşama başına işçi) sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--rate", type=_positive_float, default=RATE_LIMIT,
+                        help="Host başına saniyedeki başlangıç istek sayısı; 429/503'te düşer, "
+                             "sorunsuz isteklerde artar (varsayılan: %(default)s)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Kalıcı yayın linki ve HTTP önbelleklerini kullanma")
+    parser.add_argument("--resume", action="store_true",
+                        help="Yarıda kalan bir önceki çalıştırmanın ara kaydından devam et")
+    parser.add_argument("--max-runtime", type=float, default=None, metavar="DAKİKA",
+                        help="Bu süre dolunca yeni iş başlatma, ilerlemeyi kaydet ve çık")
+    parser.add_argument("--lazy", default=None, metavar="URL",
+                        help="Yayın linklerini çözme; bölümleri bu adresteki çözümleyiciye bağla "
+                             "(ör. http://127.0.0.1:8080, bkz. playlist_server.py --resolver)")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    args = parse_args()
+    try:
+        run(engine=args.engine, concurrency=args.concurrency, rate=args.rate, use_cache=args.use_cache,
+            resume=args.resume, max_runtime=args.max_runtime, lazy=args.lazy)
+    finally:
+        log.info("Ölçümler: %s", METRICS.summary())
+        write_report("ddizi", extra={"engine": args.engine})
\ No newline at end of file
@@ -1,7 +1,18 @@
+import json
 import os
-import requests
 import concurrent.futures
 
+import requests
+
+from common.engine import Engine
+from common.manifest import write_if_changed
+from common.metrics import METRICS, write_report
+from common.ratelimit import RateScheduler, throttle_session
+from common.session import make_session
+from common.source import Source
+
+M3U_HEADER = "#EXTM3U\n\n"
+
 # --- LİG BİLGİLERİ ---
 
 # Trendyol Süper Lig için veri yapıları
@@ -24,15 +35,6 @@ super_lig_sezonlar = {
     3853: '2025/2026', 
 }
 
-super_lig_haftalar = {
-    32: range(1, 35), 30: range(1, 35), 25: range(1, 35),
-    34: range(1, 35), 37: range(1, 35), 24: range(1, 35),
-    29: range(1, 35), 23: range(1, 35), 20: range(1, 35),
-    994: range(1, 35), 3189: range(1, 43), 3308: range(1, 39),
-    3438: range(1, 39), 3580: range(1, 39), 3746: range(1, 39),
-    3853: range(1, 39),
-}
-
 super_lig_st = {
     30: 2899,
 }
@@ -51,20 +53,6 @@ birinci_lig_sezonlar = {
     3856: '2025/2026',
 }
 
-# 1. Lig için hafta aralıkları (1'den belirtilen haftaya kadar)
-birinci_lig_haftalar = {
-    1108: range(1, 35),  # 34 Hafta
-    1105: range(1, 35),  # 34 Hafta
-    908:  range(1, 35),  # 34 Hafta
-    1034: range(1, 38),  # 37 Hafta
-    3190: range(1, 38),  # 37 Hafta
-    3309: range(1, 41),  # 40 Hafta
-    3440: range(1, 42),  # 41 Hafta
-    3583: range(1, 38),  # 37 Hafta
-    3759: range(1, 43),  # 42 Hafta
-    3856: range(1, 3),   # 2 Hafta (mevcut veri)
-}
-
 # 1. Lig için st kodları
 birinci_lig_st = {
     1108: 5067,
@@ -79,20 +67,68 @@ birinci_lig_st = {
     3856: 0,
 }
 
+# Ligler bildirimsel olarak tanımlanır: API'deki organizasyon (o) kodu, sezonlar ve st kodları.
+# Hafta sayıları elle yazılmaz; `discover_weeks` ile API'ye sorularak bulunur ve
+# WEEKS_CACHE_PATH'te saklanır. Her ligin son sezonu "güncel" sayılır ve her
+# çalıştırmada yeni haftalar için yeniden yoklanır.
+LEAGUES = [
+    {"name": "Süper Lig", "o": 18, "seasons": super_lig_sezonlar, "st": super_lig_st},
+    {"name": "Trendyol 1. Lig", "o": 130, "seasons": birinci_lig_sezonlar, "st": birinci_lig_st},
+]
 
 # --- ANA KOD ---
 
-# Çıktı klasörünü oluştur
+API_URL = "https://beinsports.com.tr/api/highlights/events"
+MAX_WORKERS = 20
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 5
+# API'ye saniyede gönderilen başlangıç istek sayısı; 429/503 alındıkça düşer (Retry-After'a
+# uyulur), sorunsuz istekler sürdükçe yeniden artar. İşçiler bu hızı aşamaz.
+RATE_LIMIT = 10.0
+# Art arda bu kadar boş hafta gelince sezonun bittiği kabul edilir (ertelenen haftalara tolerans).
+EMPTY_WEEKS_TO_STOP = 2
+# Yanlış bir API cevabı sonsuz yoklamaya yol açmasın diye üst sınır.
+MAX_WEEKS = 60
+
 output_folder = 'playsport'
-os.makedirs(output_folder, exist_ok=True)
+WEEKS_CACHE_PATH = os.path.join(output_folder, 'season_weeks.json')
+# Tamamlanmış sezonların maçları burada saklanır ve bir daha API'den istenmez.
+FROZEN_DIR = os.path.join(output_folder, 'frozen')
+
+
+# Tüm işçiler tek Session'ı paylaşır: havuz işçi sayısı kadar bağlantı tutar, böylece her
+# istek yeni bir TLS bağlantısı açmaz. 429/5xx hatalarında ATV betiğindeki politikayla
+# üstel bekleyerek tekrar denenir.
+SESSION = make_session(max_retries=MAX_RETRIES, pool_size=MAX_WORKERS)
+RATE_LIMITER = RateScheduler(RATE_LIMIT, burst=MAX_WORKERS)
+throttle_session(SESSION, RATE_LIMITER)
+
+
+def connection_stats(session=SESSION):
+    """Session havuzlarında açılan bağlantı ve gönderilen istek sayılarını (tekrarlar dahil) döndürür."""
+    connections = sent = 0
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            connections += pool.num_connections
+            sent += pool.num_requests
+    return connections, sent
+
+
+def week_url(league, season_id, week):
+    st = league["st"].get(season_id, 0)  # Varsayılan st değeri
+    return f"{API_URL}?sp=1&o={league['o']}&s={season_id}&r={week}&st={st}"
 
-def fetch_and_parse(url_info):
+
+def fetch_and_parse(url):
     """
-    Verilen URL'den veriyi çeker, M3U formatına dönüştürür.
+    Verilen URL'deki haftanın maç özetlerini [maç id, başlık, video, logo] listesi olarak
+    döndürür. Hata durumunda None döner; böylece "bu haftada maç yok" (boş liste) ile
+    "istek başarısız" birbirinden ayrılır.
     """
-    url, group_title = url_info
     try:
-        response = requests.get(url, timeout=10)
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()  # HTTP hatalarını kontrol et
         data = response.json()
         events = data.get('Data', {}).get('events', [])
@@ -107,83 +143,251 @@ def fetch_and_parse(url_info):
             match_id = event.get('matchId', '')
 
             if video_url:
-                title = f"{home} {home_score}-{away_score} {away}"
-                line1 = f'#EXTINF:-1 tvg-id="{match_id}" tvg-logo="{logo}" group-title="{group_title}",{title}\n'
-                line2 = f"{video_url}\n"
-                result.append((group_title, line1, line2))
+                result.append([match_id, f"{home} {home_score}-{away_score} {away}", video_url, logo])
         return result
     except requests.exceptions.RequestException as e:
         print(f"URL alınırken hata oluştu: {url} - Hata: {e}")
-        return []
+        return None
     except Exception as e:
         print(f"Veri işlenirken bir hata oluştu: {url} - Hata: {e}")
-        return []
-
-# Tüm liglerden çekilecek URL'lerin listesi
-all_urls_to_fetch = []
-
-# Süper Lig URL'lerini oluştur
-for sezon_id, sezon_adi in super_lig_sezonlar.items():
-    haftalar = super_lig_haftalar.get(sezon_id, range(1, 39)) # Varsayılan hafta aralığı
-    st = super_lig_st.get(sezon_id, 0) # Varsayılan st değeri
-    group_title = f"Süper Lig {sezon_adi}"
-    for hafta in haftalar:
-        url = f"https://beinsports.com.tr/api/highlights/events?sp=1&o=18&s={sezon_id}&r={hafta}&st={st}"
-        all_urls_to_fetch.append((url, group_title))
-
-# Trendyol 1. Lig URL'lerini oluştur
-for sezon_id, sezon_adi in birinci_lig_sezonlar.items():
-    haftalar = birinci_lig_haftalar.get(sezon_id, range(1, 2)) # ID bulunamazsa varsayılan olarak 1 hafta
-    st = birinci_lig_st.get(sezon_id, 0) # Varsayılan st değeri
-    group_title = f"Trendyol 1. Lig {sezon_adi}"
-    for hafta in haftalar:
-        url = f"https://beinsports.com.tr/api/highlights/events?sp=1&o=130&s={sezon_id}&r={hafta}&st={st}"
-        all_urls_to_fetch.append((url, group_title))
-
-
-# Sonuçları gruplamak için sözlük
-grouped_results = {}
-
-# Eşzamanlı olarak tüm URL'leri çek ve işle
-with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-    # `map` fonksiyonu, `fetch_and_parse` fonksiyonunu `all_urls_to_fetch` listesindeki her bir eleman için çalıştırır.
-    future_results = executor.map(fetch_and_parse, all_urls_to_fetch)
-    
-    # Gelen sonuçları işle
-    for result_list in future_results:
-        for group_title, line1, line2 in result_list:
-            if group_title not in grouped_results:
-                grouped_results[group_title] = []
-            grouped_results[group_title].append((line1, line2))
-
-# Tüm sezon/lig kombinasyonlarını tek bir dosyada toplamak için liste
-all_lines_combined = []
-
-# Gruplanmış sonuçları dosyalara yaz
-for group_title, lines in sorted(grouped_results.items()):
-    # Dosya ve klasör adları için geçersiz karakterleri temizle
-    safe_folder_name = group_title.replace('/', '-').replace(' ', '_')
-    folder_path = os.path.join(output_folder, safe_folder_name)
-    os.makedirs(folder_path, exist_ok=True)
-    
-    file_path = os.path.join(folder_path, f"{safe_folder_name}.m3u")
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write("#EXTM3U\n\n")
-        for line1, line2 in lines:
-            f.write(line1)
-            f.write(line2)
-            all_lines_combined.append((line1, line2))
-
-# Tüm lig ve sezonları içeren tek bir M3U dosyası oluştur
-all_m3u_path = os.path.join(output_folder, 'all_leagues.m3u')
-with open(all_m3u_path, 'w', encoding='utf-8') as f:
-    f.write("#EXTM3U\n\n")
-    # Önce gruplara göre sıralanmış sonuçları yaz
-    for line1, line2 in all_lines_combined:
-        f.write(line1)
-        f.write(line2)
-
-print(f"'{output_folder}' klasörü içinde her lig/sezon için klasörler, M3U dosyaları ve 'all_leagues.m3u' başarıyla oluşturuldu.")
+        return None
+
+
+def all_seasons():
+    """LEAGUES tablosundaki her sezonu anahtarı, grup başlığı ve güncel olup olmadığıyla üretir."""
+    for league in LEAGUES:
+        current_season = list(league["seasons"])[-1]
+        for season_id, season_name in league["seasons"].items():
+            yield {
+                "key": f"{league['o']}:{season_id}",
+                "league": league,
+                "season_id": season_id,
+                "group": f"{league['name']} {season_name}",
+                "current": season_id == current_season,
+            }
+
+
+def load_week_counts(path=WEEKS_CACHE_PATH):
+    """Daha önce bulunan hafta sayılarını ("o:sezon" -> hafta) okur."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Hafta önbelleği okunamadı, tüm sezonlar yoklanacak: {e}")
+        return {}
+
+
+def save_week_counts(week_counts, path=WEEKS_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_if_changed(path, json.dumps(week_counts, ensure_ascii=False, indent=1, sort_keys=True) + "\n")
+
+
+def _frozen_path(key, folder):
+    return os.path.join(folder, key.replace(':', '_') + '.json')
+
+
+def load_frozen_seasons(seasons, folder=FROZEN_DIR):
+    """Dondurulmuş (tamamlanmış) sezonların haftalık maç listelerini {anahtar: {hafta: maçlar}} olarak okur."""
+    frozen = {}
+    for season in seasons:
+        try:
+            with open(_frozen_path(season["key"], folder), 'r', encoding='utf-8') as f:
+                weeks = json.load(f)["weeks"]
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Dondurulmuş sezon okunamadı, yeniden çekilecek: {season['group']} - {e}")
+            continue
+        frozen[season["key"]] = {week: events for week, events in enumerate(weeks, start=1)}
+    return frozen
+
+
+def freeze_season(key, weeks, folder=FROZEN_DIR):
+    """Tamamlanmış bir sezonun haftalarını (1..n sırasıyla) sıkıştırılmış JSON olarak saklar."""
+    os.makedirs(folder, exist_ok=True)
+    payload = {"weeks": [weeks[week] for week in range(1, len(weeks) + 1)]}
+    write_if_changed(_frozen_path(key, folder), json.dumps(payload, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+
+def is_complete(season, weeks, week_counts):
+    """Güncel olmayan, hafta sayısı bilinen ve tüm haftaları hatasız çekilmiş sezon tamamlanmıştır."""
+    count = week_counts.get(season["key"])
+    if season["current"] or not count or None in weeks.values():
+        return False
+    return all(weeks.get(week) is not None for week in range(1, count + 1))
+
+
+def discover_weeks(executor, week_counts, seasons=None):
+    """
+    Verilen sezonların haftalarını çeker ve {sezon anahtarı: {hafta: maçlar}} döndürür;
+    isteği başarısız olan haftaların değeri None'dır.
+
+    Hafta sayısı bilinen sezonların haftaları doğrudan paralel çekilir; başarısız olanlar
+    ikinci bir geçişte bir kez daha denenir. Hafta sayısı bilinmeyen sezonlar ile her
+    ligin güncel sezonu, bilinen son haftadan sonrası için tur tur yoklanır: her turda
+    yoklanan her sezonun bir sonraki haftası paralel istenir (başarısız hafta bir sonraki
+    turda bir kez daha denenir) ve art arda EMPTY_WEEKS_TO_STOP boş hafta gelen sezonun
+    yoklaması biter. `week_counts` yerinde güncellenir.
+    """
+    seasons = list(all_seasons()) if seasons is None else seasons
+    results = {season["key"]: {} for season in seasons}
+    known_jobs = []
+    probing = {}  # sezon anahtarı -> [sezon, sonraki hafta, art arda boş, bu haftada deneme]
+    request_count = 0
+
+    for season in seasons:
+        known = week_counts.get(season["key"])
+        for week in range(1, (known or 0) + 1):
+            known_jobs.append((season["key"], week, week_url(season["league"], season["season_id"], week)))
+        if known is None or season["current"]:
+            probing[season["key"]] = [season, (known or 0) + 1, 0, 0]
+
+    fetched = executor.map(fetch_and_parse, [url for _, _, url in known_jobs])
+    for (key, week, _), events in zip(known_jobs, fetched):
+        results[key][week] = events
+    request_count += len(known_jobs)
+
+    # İkinci geçiş: ilk geçişte başarısız olan haftalar (Retry politikası da tükenmişse) bir kez daha
+    failed = [job for job in known_jobs if results[job[0]][job[1]] is None]
+    if failed:
+        print(f"{len(failed)} hafta alınamadı, ikinci geçişte yeniden deneniyor...")
+        for (key, week, _), events in zip(failed, executor.map(fetch_and_parse, [url for _, _, url in failed])):
+            results[key][week] = events
+        request_count += len(failed)
+
+    while probing:
+        round_keys = list(probing)
+        urls = [week_url(probing[k][0]["league"], probing[k][0]["season_id"], probing[k][1]) for k in round_keys]
+        request_count += len(urls)
+        for key, events in zip(round_keys, executor.map(fetch_and_parse, urls)):
+            season, week, empty_streak, attempts = probing[key]
+            if events is None:
+                results[key][week] = None
+                if attempts == 0:
+                    probing[key] = [season, week, empty_streak, 1]
+                else:
+                    # İki kez başarısız: hafta sayısı bu çalıştırmada ilerletilmez, sonraki çalıştırma yeniden dener.
+                    del probing[key]
+                continue
+            if events:
+                results[key][week] = events
+                week_counts[key] = week
+                empty_streak = 0
+            else:
+                empty_streak += 1
+                week_counts.setdefault(key, 0)
+            if empty_streak >= EMPTY_WEEKS_TO_STOP or week >= MAX_WEEKS:
+                del probing[key]
+            else:
+                probing[key] = [season, week + 1, empty_streak, 0]
+
+    print(f"Toplam {request_count} hafta isteği yapıldı ({len(known_jobs)} bilinen, "
+          f"{request_count - len(known_jobs)} yoklama/yeniden deneme).")
+    return results
+
+
+def failed_weeks(season_weeks, seasons):
+    """Tüm denemelere rağmen alınamayan haftaların URL'lerini döndürür."""
+    by_key = {season["key"]: season for season in seasons}
+    return [
+        week_url(by_key[key]["league"], by_key[key]["season_id"], week)
+        for key, weeks in season_weeks.items() for week, events in sorted(weeks.items()) if events is None
+    ]
+
+
+class BeinSource(Source):
+    """
+    beIN Sports özetleri: her lig sezonu bir içerik, maçları da bölümleridir. Haftalar
+    `list_content` içinde keşfedilir (dondurulmuş sezonlar diskten okunur); video
+    linkleri API cevabında hazır geldiğinden ayrıca çözülmez. Gruplar başlığa, grup
+    içindeki maçlar haftaya göre sıralanır.
+    """
+
+    name = "beinsports"
+    master_path = os.path.join(output_folder, 'all_leagues.m3u')
+    header = M3U_HEADER
+    manifest_name = 'manifest.json'
+    skip_empty_groups = False
+    session = SESSION
+
+    def __init__(self, executor, week_counts):
+        self.executor = executor
+        self.week_counts = week_counts
+        self.seasons = list(all_seasons())
+        self.live = []
+        self.season_weeks = {}
+
+    def list_content(self):
+        frozen = load_frozen_seasons(self.seasons)
+        self.live = [season for season in self.seasons if season["key"] not in frozen]
+        print(f"{len(frozen)} sezon dondurulmuş kayıttan okunuyor, {len(self.live)} sezon API'den çekilecek.")
+        self.season_weeks = discover_weeks(self.executor, self.week_counts, self.live)
+        self.season_weeks.update(frozen)
+        return sorted(self.seasons, key=lambda season: season["group"])
+
+    def content_key(self, season):
+        return season["key"]
+
+    def list_episodes(self, season):
+        weeks = self.season_weeks[season["key"]]
+        return [
+            {"id": match_id, "name": title, "url": video_url, "stream_url": video_url, "img": logo}
+            for week in sorted(weeks) for match_id, title, video_url, logo in weeks[week] or []
+        ]
+
+    def group_path(self, season):
+        # Dosya ve klasör adları için geçersiz karakterleri temizle
+        safe_folder_name = season["group"].replace('/', '-').replace(' ', '_')
+        return os.path.join(output_folder, safe_folder_name, f"{safe_folder_name}.m3u")
+
+    def entries(self, season):
+        for match in season["episodes"]:
+            yield match["name"], match["stream_url"], [
+                ("tvg-id", match["id"]), ("tvg-logo", match["img"]), ("group-title", season["group"]),
+            ]
+
+
+def main() -> bool:
+    """Tüm lig/sezon listelerini üretir; M3U dosyaları yazıldıysa True döner."""
+    os.makedirs(output_folder, exist_ok=True)
+    week_counts = load_week_counts()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        source = BeinSource(executor, week_counts)
+        engine = Engine(source, workers=4)
+        data = engine.run()
+    save_week_counts(week_counts)
+
+    connections, sent = connection_stats()
+    if sent:
+        print(f"Bağlantı havuzu: {sent} HTTP isteği (tekrarlar dahil), {connections} bağlantı açıldı "
+              f"(bağlantı başına {sent / max(connections, 1):.1f} istek).")
+        print(f"Hız sınırlayıcı: {RATE_LIMITER.summary()}")
+    failed = failed_weeks(source.season_weeks, source.live)
+    if failed:
+        print(f"{len(failed)} hafta iki denemede de alınamadı (sonraki çalıştırmada yeniden denenecek):")
+        for url in failed:
+            print(f"  - {url}")
+
+    for season in source.live:
+        weeks = source.season_weeks[season["key"]]
+        if is_complete(season, weeks, week_counts):
+            freeze_season(season["key"], {week: weeks[week] for week in range(1, week_counts[season["key"]] + 1)})
+            print(f"Sezon tamamlandı ve donduruldu: {season['group']}")
+
+    if data:
+        print(f"M3U çıktıları: {engine.manifest.summary()}")
+        print(f"'{output_folder}' klasörü içinde her lig/sezon için klasörler, M3U dosyaları ve 'all_leagues.m3u' başarıyla oluşturuldu.")
+    return bool(data)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        print(f"Ölçümler: {METRICS.summary()}")
+        write_report("beinsports")
 
 # Sakultah tarafından yapılmıştır iyi kullanımlar :)
\ No newline at end of file
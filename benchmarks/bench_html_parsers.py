@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML ayrıştırma arka uçlarının mikro benchmark'ı.
+
+Eski yöntem (BeautifulSoup + html.parser ile tam ağaç), lxml arka ucu ve
+common.htmlparse.find_attribute hızlı yolu; ATV video ID'si, ATV CSRF token'ı
+ve DDIZI Fembed iframe'i aramaları üzerinde karşılaştırılır.
+
+Kullanım:
+    python benchmarks/bench_html_parsers.py                # örnek sayfaları üretir
+    python benchmarks/bench_html_parsers.py --pages DIR    # DIR/*.html kayıtlı sayfalar
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from common.htmlparse import find_attribute  # noqa: E402
+
+FEMBED_RE = re.compile(r"//(femax20|supervideo)\.com")
+
+# (ad, etiket, nitelik, eşleşme koşulları)
+LOOKUPS = [
+    ("atv-videoid", "div", "data-videoid", {"id": "video-container"}),
+    ("atv-token", "input", "value", {"name": "__RequestVerificationToken"}),
+    ("ddizi-iframe", "iframe", "src", {"src": FEMBED_RE}),
+]
+
+
+def _filler(n: int) -> str:
+    item = ('<article class="widget-item"><a href="/dizi/{0}-bolum"><img src="/i/{0}.jpg">'
+            '<div class="name">{0}. Bölüm</div><p>Açıklama metni {0} ' + "lorem ipsum " * 20 + '</p></a></article>')
+    return "".join(item.format(i) for i in range(n))
+
+
+def sample_pages() -> Dict[str, bytes]:
+    """Kayıtlı sayfa yoksa gerçek sayfaların yapısını taklit eden örnekler üretir."""
+    head = "<html><head>" + "<script>var x = 1;</script>" * 50 + "</head><body>"
+    return {
+        "atv-bolum.html": (head + _filler(40) + '<div id="video-container" data-videoid="12345"></div>'
+                           + _filler(200) + "</body></html>").encode(),
+        "atv-diziler.html": (head + '<form><input name="__RequestVerificationToken" value="tok"></form>'
+                             + _filler(300) + "</body></html>").encode(),
+        "ddizi-bolum.html": (head + _filler(60) + "<iframe src='//femax20.com/v/abc'></iframe>"
+                             + _filler(120) + "</body></html>").encode(),
+    }
+
+
+def _bs4(parser: str, tag: str, attr: str, match: dict) -> Callable[[bytes], object]:
+    def run(html: bytes):
+        node = BeautifulSoup(html, parser).find(tag, match)
+        return node.get(attr) if node else None
+    return run
+
+
+def _fast(tag: str, attr: str, match: dict) -> Callable[[bytes], object]:
+    return lambda html: find_attribute(html, tag, attr, match)
+
+
+def backends(tag: str, attr: str, match: dict) -> List[Tuple[str, Callable[[bytes], object]]]:
+    result = [("bs4/html.parser", _bs4("html.parser", tag, attr, match))]
+    try:
+        import lxml  # noqa: F401
+        result.append(("bs4/lxml", _bs4("lxml", tag, attr, match)))
+    except ImportError:
+        print("lxml kurulu değil, atlanıyor.", file=sys.stderr)
+    result.append(("hızlı yol", _fast(tag, attr, match)))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=Path, help="Kayıtlı HTML sayfalarının klasörü")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = ({p.name: p.read_bytes() for p in sorted(args.pages.glob("*.html"))}
+             if args.pages else sample_pages())
+    print(f"{'sayfa':<22}{'arama':<14}{'arka uç':<18}{'ms/sayfa':>10}")
+    for page_name, html in pages.items():
+        for lookup_name, tag, attr, match in LOOKUPS:
+            baseline = None
+            for backend_name, func in backends(tag, attr, match):
+                if func(html) is None:
+                    continue
+                best = min(timeit.repeat(lambda: func(html), number=1, repeat=args.repeat)) * 1000
+                baseline = baseline or best
+                print(f"{page_name:<22}{lookup_name:<14}{backend_name:<18}{best:>10.2f}  (x{baseline / best:.1f})")
+
+
+if __name__ == "__main__":
+    main()
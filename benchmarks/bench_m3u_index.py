@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+M3U okuma: `common.m3u_index.PlaylistIndex` ile sözlük listesi karşılaştırması.
+
+Sözlük listesi, satır satır okuyup her girdi için {group, tvg-id, title, url, logo}
+sözlüğü üreten alışılmış ayrıştırıcıdır. Ayrıştırma süresi (en iyi tekrar), tutulan
+bellek (tracemalloc; dosya metni dahil) ve grup/sezon/takım süzme ile linke göre
+tekilleştirme süreleri ölçülür.
+
+Kullanım:
+    python benchmarks/bench_m3u_index.py                            # playsport/all_leagues.m3u
+    python benchmarks/bench_m3u_index.py ATV/ATV.m3u --repeat 50
+"""
+
+import argparse
+import gc
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from common.m3u_index import PlaylistIndex  # noqa: E402
+
+
+def _attr(line: str, name: str) -> str:
+    start = line.find(f'{name}="')
+    return line[start + len(name) + 2:line.find('"', start + len(name) + 2)] if start >= 0 else ""
+
+
+def parse_dicts(text: str) -> List[Dict[str, str]]:
+    entries: List[Dict[str, str]] = []
+    pending = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXTINF"):
+            _, sep, title = line.partition('",')
+            pending = {"group": _attr(line, "group-title"), "tvg-id": _attr(line, "tvg-id"),
+                       "logo": _attr(line, "tvg-logo"), "title": title if sep else line.split(",", 1)[-1]}
+        elif line and not line.startswith("#") and pending is not None:
+            pending["url"] = line
+            entries.append(pending)
+            pending = None
+    return entries
+
+
+def retained_kb(build: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / 1024
+
+
+def best_ms(func: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("playlist", nargs="?", type=Path, default=REPO_ROOT / "playsport" / "all_leagues.m3u")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--season", default="2023/2024")
+    parser.add_argument("--team", default="Fenerbahçe")
+    args = parser.parse_args()
+
+    path = str(args.playlist)
+    text = args.playlist.read_text(encoding="utf-8")
+    index, dicts = PlaylistIndex.from_text(text), parse_dicts(text)
+    group = index.groups[0] if index.groups else ""
+    print(f"{path}: {len(index)} girdi, {len(index.groups)} grup, {len(text) / 1024:.0f} KB metin")
+
+    cases = [
+        ("ayrıştırma (dosyadan)", lambda: PlaylistIndex.load(path),
+         lambda: parse_dicts(Path(path).read_text(encoding="utf-8"))),
+        ("grup süzme", lambda: index.rows(group=group),
+         lambda: [e for e in dicts if e["group"] == group]),
+        ("sezon + takım", lambda: index.rows(season=args.season, team=args.team),
+         lambda: [e for e in dicts if args.season in e["group"] and args.team.lower() in e["title"].lower()]),
+        ("linke göre tekilleştirme", index.dedupe,
+         lambda: list({e["url"]: e for e in reversed(dicts)}.values())),
+    ]
+    print(f"{'işlem':<26}{'indeks ms':>11}{'sözlük ms':>11}")
+    for name, with_index, with_dicts in cases:
+        print(f"{name:<26}{best_ms(with_index, args.repeat):>11.2f}{best_ms(with_dicts, args.repeat):>11.2f}")
+
+    index_kb = retained_kb(lambda: PlaylistIndex.load(path))
+    dicts_kb = retained_kb(lambda: parse_dicts(Path(path).read_text(encoding="utf-8")))
+    print(f"{'bellek (KB)':<26}{index_kb:>11.0f}{dicts_kb:>11.0f}  (x{dicts_kb / max(index_kb, 1):.1f})")
+
+
+if __name__ == "__main__":
+    main()
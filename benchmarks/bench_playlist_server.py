@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+playlist_server.py verim ölçümü (istek/sn).
+
+Sunucu ayrı bir süreçte depo listeleriyle başlatılır; birkaç istemci süreci keep-alive
+HTTP/1.1 bağlantılarıyla aynı isteği tekrarlar. Ölçülen durumlar: tam listenin gzip
+yanıtı, süzülmüş görünüm ve If-None-Match ile 304. Sunucu tek süreç olduğundan
+sonuç bir çekirdeğin verimidir.
+
+Kullanım:
+    python benchmarks/bench_playlist_server.py
+    python benchmarks/bench_playlist_server.py --clients 4 --seconds 5
+"""
+
+import argparse
+import http.client
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+CASES = (
+    ("tam liste (gzip)", "/playsport/all_leagues.m3u", {"Accept-Encoding": "gzip"}),
+    ("süzülmüş (sezon+takım)", "/playsport/all_leagues.m3u?season=2023-2024&team=Galatasaray",
+     {"Accept-Encoding": "gzip"}),
+    ("koşullu (304)", "/playsport/all_leagues.m3u", {"Accept-Encoding": "gzip", "If-None-Match": None}),
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("sunucu başlamadı")
+
+
+def hammer(port: int, path: str, headers: Dict[str, str], seconds: float) -> Tuple[int, int]:
+    """Süre dolana kadar aynı isteği tek bağlantı üzerinden tekrarlar; (istek, bayt)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    count = size = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        size += len(response.read())
+        count += 1
+    conn.close()
+    return count, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, str(REPO_ROOT / "playlist_server.py"), "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        # Görünümleri ısıt ve 304 için ETag al.
+        etag = None
+        for _, path, headers in CASES:
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+            response = conn.getresponse()
+            response.read()
+            etag = etag or response.getheader("ETag")
+            conn.close()
+
+        print(f"{'durum':<26}{'istek/sn':>10}{'ort. bayt':>11}")
+        with ProcessPoolExecutor(args.clients) as pool:
+            for name, path, headers in CASES:
+                headers = {key: value if value is not None else etag for key, value in headers.items()}
+                started = time.monotonic()
+                results = list(pool.map(hammer, [port] * args.clients, [path] * args.clients,
+                                        [headers] * args.clients, [args.seconds] * args.clients))
+                elapsed = time.monotonic() - started
+                count = sum(c for c, _ in results)
+                size = sum(s for _, s in results)
+                print(f"{name:<26}{count / elapsed:>10.0f}{size / max(count, 1):>11.0f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scraper'ların ağsız uçtan uca benchmark'ı.
+
+Her site `fixture_server.FixtureServer` ile yerelde sunulur ve betik ayrı bir
+süreçte (temiz modül durumu, ayrı önbellek klasörü) seri ve eşzamanlı
+modlarda baştan sona çalıştırılır. Her çalıştırma için duvar saati süresi,
+saniyedeki istek, tepe bellek (RSS), yazılan girdi sayısı ve `common.metrics`
+gecikme yüzdelikleri raporlanır. Aynı klasörde tekrar edilen çalıştırmalar
+(--runs) önbellekleri dolu (ılık) çalışmayı ölçer.
+
+Betikler hız sınırına takılmadan kodun kendi verimini ölçmek için yüksek bir
+hız sınırıyla (--rate) çalıştırılır; üretimdeki sınırlarla ölçmek için
+--production-rate verilir.
+
+Kullanım:
+    python benchmarks/bench_scrapers.py                          # tüm siteler, seri + eşzamanlı
+    python benchmarks/bench_scrapers.py --sites atv --size 40 --latency 30 --runs 2
+    python benchmarks/bench_scrapers.py --error-rate 0.02 --json sonuc.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import SITES, FixtureServer  # noqa: E402
+
+DEFAULT_RATE = 1000.0
+RESULT_PREFIX = "BENCH_RESULT "
+
+# Site -> mod -> betiğe verilecek ayarlar
+MODES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "atv": {"seri": {"workers": 1, "per_host": 1}, "eşzamanlı": {"workers": 16, "per_host": 8}},
+    "ddizi": {"seri": {"engine": "sync", "concurrency": 1}, "sync": {"engine": "sync", "concurrency": 8},
+              "async": {"engine": "async", "concurrency": 16}},
+    "yabancidizi": {"seri": {"listing": 1, "series": 1, "episodes": 1},
+                    "eşzamanlı": {"listing": 4, "series": 4, "episodes": 8}},
+    "beinsports": {"seri": {"workers": 1}, "eşzamanlı": {"workers": 20}},
+}
+
+
+# ============================
+# Alt süreç: betiği fixture sunucusuna karşı çalıştırma
+# ============================
+def _load(relative_path: str, workdir: Path) -> Any:
+    """Betiği çalışma klasörüne kopyalayıp yükler; çıktılar depo yerine oraya yazılır."""
+    target = workdir / relative_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(REPO_ROOT / relative_path, target)
+    spec = importlib.util.spec_from_file_location(target.stem, target)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[target.stem] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_atv(opts: Dict[str, Any], base: str, rate: Optional[float], workdir: Path) -> Path:
+    atv = _load("ATV/atv.py", workdir)
+    atv.BASE_URL = base + "/"
+    atv.DIZILER_PAGE_URL, atv.PROGRAMLAR_PAGE_URL = base + "/diziler", base + "/programlar"
+    atv.CONTENT_API_URL = base + "/services/get-all-series-and-programs-by-category-slug"
+    atv.STREAM_API_URL = base + "/vms/api/Player/GetVideoPlayer"
+    atv.run(workers=opts["workers"], per_host=opts["per_host"], rate=rate or atv.RATE_LIMIT)
+    return Path(atv.ATVSource.master_path)
+
+
+def run_ddizi(opts: Dict[str, Any], base: str, rate: Optional[float], workdir: Path) -> Path:
+    ddizi = _load("DDIZI/ddizi.py", workdir)
+    ddizi.BASE_URL = base + "/"
+    ddizi.SERIES_LIST_URL = base + "/arsiv"
+    ddizi.FEMBED_API_BASE = base + "/api/source/"
+    ddizi.run(engine=opts["engine"], concurrency=opts["concurrency"], rate=rate or ddizi.RATE_LIMIT)
+    return Path(ddizi.DdiziSource.master_path)
+
+
+def run_yabancidizi(opts: Dict[str, Any], base: str, rate: Optional[float], workdir: Path) -> Path:
+    yd = _load("yabancidizi_generator.py", workdir)
+    yd.get_dynamic_base_url = lambda: base
+    yd.main(["--listing-workers", str(opts["listing"]), "--series-workers", str(opts["series"]),
+             "--episode-workers", str(opts["episodes"]), "--rate", str(rate or yd.RATE_LIMIT)])
+    return workdir / yd.YabanciDiziSource.master_path
+
+
+def run_beinsports(opts: Dict[str, Any], base: str, rate: Optional[float], workdir: Path) -> Path:
+    bein = _load("beinsportsozet.py", workdir)
+    bein.API_URL = base + "/api/highlights/events"
+    bein.MAX_WORKERS = opts["workers"]
+    if rate:
+        bein.RATE_LIMITER = bein.RateScheduler(rate, burst=opts["workers"])
+        bein.throttle_session(bein.SESSION, bein.RATE_LIMITER)
+    bein.main()
+    return workdir / bein.BeinSource.master_path
+
+
+RUNNERS: Dict[str, Callable[[Dict[str, Any], str, Optional[float], Path], Path]] = {
+    "atv": run_atv,
+    "ddizi": run_ddizi,
+    "yabancidizi": run_yabancidizi,
+    "beinsports": run_beinsports,
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def child(site: str, mode: str, base: str, rate: Optional[float], workdir: Path) -> None:
+    from common.metrics import METRICS
+
+    os.chdir(workdir)  # kök betikler çıktılarını göreli yollara yazar
+    started = time.perf_counter()
+    master = RUNNERS[site](MODES[site][mode], base, rate, workdir)
+    wall = time.perf_counter() - started
+    report = METRICS.report()
+    entries = master.read_text(encoding="utf-8").count("#EXTINF") if master.exists() else 0
+    p95 = max((host["latency_s"]["p95"] for host in report["hosts"].values()), default=0.0)
+    print(RESULT_PREFIX + json.dumps({
+        "wall_s": round(wall, 3), "requests": report["totals"]["requests"], "failures": report["totals"]["failures"],
+        "retries": report["totals"]["retries"], "bytes": report["totals"]["bytes"],
+        "parse_s": report["totals"]["parse_s"], "p95_s": p95, "peak_rss_mb": _peak_rss_mb(), "entries": entries,
+    }), flush=True)
+
+
+# ============================
+# Ana süreç
+# ============================
+def run_case(site: str, mode: str, server: FixtureServer, rate: Optional[float], workdir: Path,
+             verbose: bool) -> Dict[str, Any]:
+    env = dict(os.environ, SCRAPER_CACHE_DIR=str(workdir / ".cache"), PYTHONIOENCODING="utf-8")
+    before = server.stats["requests"]
+    command = [sys.executable, __file__, "--child", site, mode, server.url, str(workdir), str(rate or 0)]
+    proc = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                          encoding="utf-8")
+    lines = proc.stdout.splitlines()
+    results = [line[len(RESULT_PREFIX):] for line in lines if line.startswith(RESULT_PREFIX)]
+    if proc.returncode != 0 or not results:
+        print("\n".join(lines[-30:]), file=sys.stderr)
+        raise RuntimeError(f"{site}/{mode} çalıştırması başarısız (çıkış kodu {proc.returncode})")
+    if verbose:
+        print("\n".join(lines), file=sys.stderr)
+    result = json.loads(results[-1])
+    result["server_requests"] = server.stats["requests"] - before
+    result["req_per_s"] = round(result["server_requests"] / result["wall_s"], 1) if result["wall_s"] else 0.0
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scraper'ların ağsız uçtan uca benchmark'ı")
+    parser.add_argument("--sites", nargs="+", choices=sorted(SITES), default=list(MODES))
+    parser.add_argument("--modes", nargs="+", help="Yalnızca bu modlar (ör. seri eşzamanlı async)")
+    parser.add_argument("--size", type=int, default=10,
+                        help="Site başına içerik (dizi; beIN'de sezon başına hafta) sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--latency", type=float, default=20.0, metavar="MS",
+                        help="Fixture sunucusunun yanıt gecikmesi (varsayılan: %(default)s)")
+    parser.add_argument("--jitter", type=float, default=10.0, metavar="MS",
+                        help="Gecikmeye eklenen rastgele sapma (varsayılan: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="503 + Retry-After dönen isteklerin oranı, 0-1 (varsayılan: %(default)s)")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Aynı klasör ve önbellekle art arda çalıştırma sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Host başına saniyedeki istek sınırı (varsayılan: %(default)s)")
+    parser.add_argument("--production-rate", action="store_true", help="Betiklerin kendi hız sınırlarını kullan")
+    parser.add_argument("--json", type=Path, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--verbose", action="store_true", help="Betiklerin çıktısını da göster")
+    parser.add_argument("--child", nargs=5, metavar=("SITE", "MOD", "URL", "KLASÖR", "HIZ"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.child:
+        site, mode, base, workdir, rate = args.child
+        child(site, mode, base, float(rate) or None, Path(workdir))
+        return
+
+    rate = None if args.production_rate else args.rate
+    results: List[Dict[str, Any]] = []
+    header = (f"{'site':<12}{'mod':<11}{'#':>2}{'süre sn':>9}{'istek':>7}{'istek/sn':>10}{'hata':>6}"
+              f"{'p95 sn':>8}{'ayrıştırma sn':>15}{'bellek MB':>11}{'girdi':>7}")
+    print(header)
+    print("-" * len(header))
+    for site in args.sites:
+        for mode in MODES[site]:
+            if args.modes and mode not in args.modes:
+                continue
+            workdir = Path(tempfile.mkdtemp(prefix=f"bench-{site}-"))
+            try:
+                with FixtureServer(site, size=args.size, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                                   error_rate=args.error_rate) as server:
+                    for run in range(1, args.runs + 1):
+                        result = run_case(site, mode, server, rate, workdir, args.verbose)
+                        result.update(site=site, mode=mode, run=run, injected_errors=server.stats["injected_errors"])
+                        results.append(result)
+                        print(f"{site:<12}{mode:<11}{run:>2}{result['wall_s']:>9.2f}{result['server_requests']:>7}"
+                              f"{result['req_per_s']:>10.1f}{result['failures']:>6}{result['p95_s']:>8.3f}"
+                              f"{result['parse_s']:>15.3f}{result['peak_rss_mb'] or 0:>11.1f}{result['entries']:>7}",
+                              flush=True)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    # Aynı sitenin modları aynı listeyi üretmeli; farklıysa benchmark anlamını yitirir.
+    for site in args.sites:
+        counts = {r["mode"]: r["entries"] for r in results if r["site"] == site and r["run"] == 1}
+        if len(set(counts.values())) > 1:
+            print(f"UYARI: {site} modları farklı sayıda girdi üretti: {counts}", file=sys.stderr)
+    if args.json:
+        args.json.write_text(json.dumps({"settings": {k: v for k, v in vars(args).items() if k not in ("json", "child")},
+                                         "results": results}, ensure_ascii=False, indent=2, default=str) + "\n",
+                             encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
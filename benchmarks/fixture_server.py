@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scraper'ları ağsız ölçmek için yerel HTTP sunucusu.
+
+Her site için gerçek yanıtların yapısını (sayfa işaretlemesi ve JSON alanları)
+birebir taklit eden fixture'lar sunulur:
+
+- atv: /diziler, /programlar (CSRF token), içerik API'si, /<içerik>/bolumler,
+  bölüm sayfaları (data-videoid) ve GetVideoPlayer JSON'u
+- ddizi: /arsiv, dizi sayfaları, bölüm sayfaları (Fembed iframe'i) ve Fembed API'si
+- yabancidizi: /diziler/sayfa/N listeleri, dizi sayfaları, bölüm sayfaları ve admin-ajax
+- beinsports: /api/highlights/events haftalık maç JSON'u
+
+Gecikme (sabit + rastgele sapma) ve hata enjeksiyonu (belirli oranda 503 +
+Retry-After) ayarlanabilir. GET yanıtları ETag taşır; If-None-Match eşleşirse
+304 döner ki HTTP önbelleğinin etkisi de ölçülebilsin.
+
+Kullanım:
+    python benchmarks/fixture_server.py atv --port 8701 --latency 20 --error-rate 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# (durum kodu, Content-Type, gövde)
+Response = Tuple[int, str, str]
+# handler(eşleşme, sorgu parametreleri, istek gövdesi, sunucu adresi) -> yanıt
+Handler = Callable[["re.Match", Dict[str, List[str]], str, str], Response]
+Route = Tuple[str, Pattern, Handler]
+
+HTML = "text/html; charset=utf-8"
+JSON = "application/json"
+
+
+def _html(body: str) -> Response:
+    return 200, HTML, body
+
+
+def _json(data) -> Response:
+    return 200, JSON, json.dumps(data, ensure_ascii=False)
+
+
+def _filler(n: int) -> str:
+    """Gerçek sayfalardaki gezinme/öneri bloklarını taklit eden dolgu."""
+    return "".join(f'<div class="card"><a href="/oneri/{i}"><img src="/i/{i}.jpg"><span>Öneri {i}</span></a></div>'
+                   for i in range(n))
+
+
+# ============================
+# Site fixture'ları
+# ============================
+def atv_routes(size: int) -> List[Route]:
+    episodes = size + 4
+
+    def content_api(match, query, body, base):
+        kind = "dizi" if "diziler" in body else "program"
+        return _json([{"Name": f"{kind.title()} {i}", "Url": f"/{kind}-{i}", "ImageUrl": f"/img/{kind}-{i}.jpg"}
+                      for i in range(size)])
+
+    def episode_list(match, query, body, base):
+        slug = match.group(1)
+        items = "".join(f'<article class="widget-item"><a href="/{slug}/{i}-bolum"><img src="/t/{slug}-{i}.jpg">'
+                        f'<div class="name">{i}. Bölüm</div></a></article>' for i in range(episodes, 0, -1))
+        return _html(f"<html><body>{_filler(30)}{items}{_filler(30)}</body></html>")
+
+    def episode_page(match, query, body, base):
+        video_id = f"{match.group(1)}-{match.group(2)}"
+        return _html(f'<html><body>{_filler(40)}<div id="video-container" data-videoid="{video_id}"></div>'
+                     f"{_filler(120)}</body></html>")
+
+    def player(match, query, body, base):
+        video_id = query["id"][0]
+        return _json({"success": True, "data": {"video": {"url": f"https://cdn.example/atv/{video_id}.m3u8"}}})
+
+    token = _html('<html><form><input name="__RequestVerificationToken" value="tok"></form></html>')
+    return [
+        ("GET", re.compile(r"/(diziler|programlar)$"), lambda *a: token),
+        ("POST", re.compile(r"/services/get-all-series-and-programs-by-category-slug$"), content_api),
+        ("GET", re.compile(r"/([\w-]+)/bolumler$"), episode_list),
+        ("GET", re.compile(r"/([\w-]+)/(\d+)-bolum$"), episode_page),
+        ("GET", re.compile(r"/vms/api/Player/GetVideoPlayer$"), player),
+    ]
+
+
+def ddizi_routes(size: int) -> List[Route]:
+    episodes = size + 4
+
+    def archive(match, query, body, base):
+        items = "".join(f"<li><a href='/dizi/dizi-{i}'>Dizi {i}</a></li>" for i in range(size))
+        return _html(f"<html><body>{_filler(20)}<ul class='dizi-list'>{items}</ul></body></html>")
+
+    def series(match, query, body, base):
+        slug = match.group(1)
+        items = "".join(f"<li><a href='/izle/{slug}-{j}'>{slug} {j}. Bölüm</a></li>" for j in range(1, episodes + 1))
+        return _html(f"<html><body><div class='dizi-poster'><img src='/p/{slug}.jpg'></div>"
+                     f"<div class='sezon-bolumleri'><ul>{items}</ul></div>{_filler(20)}</body></html>")
+
+    def episode(match, query, body, base):
+        return _html(f"<html><body>{_filler(40)}<iframe src='//femax20.com/v/{match.group(1)}'></iframe>"
+                     f"{_filler(60)}</body></html>")
+
+    def fembed(match, query, body, base):
+        video_id = match.group(1)
+        return _json({"success": True, "data": [{"file": f"https://cdn.example/{video_id}_360.mp4", "label": "360p"},
+                                                {"file": f"https://cdn.example/{video_id}_720.mp4", "label": "720p"}]})
+
+    return [
+        ("GET", re.compile(r"/arsiv$"), archive),
+        ("GET", re.compile(r"/dizi/([\w-]+)$"), series),
+        ("GET", re.compile(r"/izle/([\w-]+)$"), episode),
+        ("POST", re.compile(r"/api/source/([\w-]+)$"), fembed),
+    ]
+
+
+def yabancidizi_routes(size: int) -> List[Route]:
+    per_page = 5
+    pages = max(1, size // per_page)
+
+    def listing(match, query, body, base):
+        page = int(match.group(1))
+        if page > pages:
+            return _html("<html><body></body></html>")
+        ids = [page * 10 + i for i in range(per_page)] + [(page + 1) * 10]  # sayfa sınırında tekrar eden dizi
+        cards = "".join(f'<div class="poster-card"><a href="{base}/dizi/s{i}"><img src="{base}/p/{i}.jpg">'
+                        f"<h3>Dizi {i}</h3></a></div>" for i in ids)
+        return _html(f"<html><body>{_filler(20)}{cards}</body></html>")
+
+    def series(match, query, body, base):
+        sid = match.group(1)
+        seasons = "".join(
+            f'<div><h3>{s}. Sezon</h3><div class="season-episodes">'
+            + "".join(f'<a href="{base}/izle/{sid}-{s}-{e}">{e}. Bölüm</a>' for e in range(1, 4))
+            + "</div></div>" for s in (1, 2))
+        return _html(f'<html><body><div class="seasons-list">{seasons}</div>{_filler(20)}</body></html>')
+
+    def episode(match, query, body, base):
+        return _html(f'<html><body>{_filler(30)}<div><a data-id="v{match.group(1)}">Vidmoly</a>'
+                     f'<a data-id="x{match.group(1)}">Diğer</a></div></body></html>')
+
+    def ajax(match, query, body, base):
+        video_id = parse_qs(body).get("id", ["?"])[0]
+        return _html(f'<iframe src="https://vidmoly.to/embed-{video_id}.html"></iframe>')
+
+    return [
+        ("GET", re.compile(r"/diziler/sayfa/(\d+)$"), listing),
+        ("GET", re.compile(r"/dizi/s(\d+)$"), series),
+        ("GET", re.compile(r"/izle/([\d-]+)$"), episode),
+        ("POST", re.compile(r"/wp-admin/admin-ajax\.php$"), ajax),
+    ]
+
+
+def beinsports_routes(size: int) -> List[Route]:
+    weeks = size
+
+    def events(match, query, body, base):
+        season, week = int(query["s"][0]), int(query["r"][0])
+        if week > weeks:
+            return _json({"Data": {"events": []}})
+        return _json({"Data": {"events": [
+            {"homeTeam": {"name": f"Ev {season}-{i}", "matchScore": 1},
+             "awayTeam": {"name": f"Dep {week}-{i}", "matchScore": 2},
+             "highlightVideoUrl": f"https://cdn.example/bein/{season}/{week}/{i}.mp4",
+             "highlightThumbnail": f"https://cdn.example/bein/{season}/{week}/{i}.jpg",
+             "matchId": f"{season}{week:02d}{i}"}
+            for i in range(3)
+        ]}})
+
+    return [("GET", re.compile(r"/api/highlights/events$"), events)]
+
+
+SITES: Dict[str, Callable[[int], List[Route]]] = {
+    "atv": atv_routes,
+    "ddizi": ddizi_routes,
+    "yabancidizi": yabancidizi_routes,
+    "beinsports": beinsports_routes,
+}
+
+
+# ============================
+# Sunucu
+# ============================
+class FixtureServer:
+    """
+    Bir sitenin fixture'larını arka planda sunan sunucu; `with` bloğunda çalışır.
+
+        with FixtureServer("atv", size=20, latency=0.02) as server:
+            ... server.url ...
+        print(server.stats)
+    """
+
+    def __init__(self, site: str, size: int = 10, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, port: int = 0, seed: int = 0) -> None:
+        self.routes = SITES[site](size)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def _draw(self) -> Tuple[float, bool]:
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            return delay, self._random.random() < self.error_rate
+
+    def respond(self, method: str, path: str, body: str) -> Response:
+        parts = urlsplit(path)
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(parts.path) if route_method == method else None
+            if match:
+                return handler(match, parse_qs(parts.query), body, self.url)
+        return 404, HTML, "bulunamadı"
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Başlık ve gövde ayrı yazıldığından keep-alive istekleri Nagle + gecikmeli ACK'e
+            # (~40 ms) takılmasın; yoksa seri modlar gecikmeden bağımsız ~20 istek/sn'de kalır.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8", "replace") if length else ""
+                delay, fail = server._draw()
+                if delay:
+                    time.sleep(delay)
+                with server._lock:
+                    server.stats["requests"] += 1
+                    server.stats[method] += 1
+                if fail:
+                    with server._lock:
+                        server.stats["injected_errors"] += 1
+                    return self._send(server.error_status, HTML, b"hata", {"Retry-After": "0"})
+                status, content_type, text = server.respond(method, self.path, body)
+                data = text.encode("utf-8")
+                headers = {}
+                if method == "GET" and status == 200:
+                    etag = '"' + hashlib.md5(data).hexdigest() + '"'
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        with server._lock:
+                            server.stats["not_modified"] += 1
+                        return self._send(304, content_type, b"", headers)
+                self._send(status, content_type, data, headers)
+
+            def _send(self, status: int, content_type: str, data: bytes, headers: Dict[str, str]) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return _Handler
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scraper fixture sunucusu")
+    parser.add_argument("site", choices=sorted(SITES))
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--size", type=int, default=10, help="İçerik (dizi/hafta) sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, metavar="MS", help="Yanıt başına sabit gecikme")
+    parser.add_argument("--jitter", type=float, default=0.0, metavar="MS", help="Gecikmeye eklenen rastgele sapma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 dönen isteklerin oranı (0-1)")
+    args = parser.parse_args()
+    server = FixtureServer(args.site, size=args.size, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                           error_rate=args.error_rate, port=args.port)
+    print(f"{args.site} fixture'ları {server.url} adresinde sunuluyor (Ctrl+C ile çıkış)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
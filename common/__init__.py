@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Tüm scraper'ların (ATV, DDIZI, yabancidizi, beIN özetleri) ortak kullandığı
+yardımcı modüller.
+"""
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Kalıcı önbellekler (yayın linkleri vb.) bu klasörde tutulur; CI'da actions/cache ile saklanır.
+CACHE_DIR = Path(os.environ.get("SCRAPER_CACHE_DIR", REPO_ROOT / ".cache"))
+
+
+def load_script(relative_path: str) -> Any:
+    """Alt klasördeki bir betiği (ör. ATV/atv.py) modül olarak yükler."""
+    path = REPO_ROOT / relative_path
+    name = path.stem
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Uzun süren taramalar için devam ettirilebilir ara kayıt (checkpoint).
+
+Tarama sırasında tamamlanan işler (ör. bölüm listeleri, çözülmüş yayın linkleri)
+bölümler (section) halinde anahtar -> değer olarak tutulur ve belirli aralıklarla
+JSON dosyasına atomik olarak yazılır. İş yarıda kesilirse (zaman aşımı, ağ
+kesintisi, runner'ın durdurulması) `resume=True` ile açılan kayıt bu işleri
+tekrar yapmadan kaldığı yerden devam etmeyi sağlar. `max_runtime` verilirse
+süre dolduğunda `expired()` True döner; çağıran yeni iş başlatmayı bırakır,
+kaydı yazar ve bir sonraki çalıştırma --resume ile devam eder.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from common import CACHE_DIR
+
+CHECKPOINT_DIR = CACHE_DIR / "checkpoints"
+CHECKPOINT_VERSION = 2
+DEFAULT_FLUSH_INTERVAL = 30.0
+DEFAULT_MAX_AGE_HOURS = 48
+
+log = logging.getLogger("checkpoint")
+
+
+class Checkpoint:
+    """Thread-safe ara kayıt; `put` çağrıları en fazla `flush_interval` saniyede bir diske yazılır."""
+
+    def __init__(self, name: str, path: Union[str, Path, None] = None, resume: bool = False,
+                 max_runtime: Optional[float] = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_age_hours: float = DEFAULT_MAX_AGE_HOURS) -> None:
+        self.path = Path(path) if path else CHECKPOINT_DIR / f"{name}.json"
+        self.flush_interval = flush_interval
+        self.deadline = time.monotonic() + max_runtime if max_runtime else None
+        self.created_at = time.time()
+        self.resumed = 0
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        if resume:
+            self._load(max_age_hours)
+
+    def _load(self, max_age_hours: float) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            log.info("Devam edilecek ara kayıt yok, baştan başlanıyor.")
+            return
+        except (OSError, ValueError) as e:
+            log.warning("Ara kayıt okunamadı, baştan başlanıyor: %s", e)
+            return
+        age_hours = (time.time() - data.get("created_at", 0)) / 3600
+        if data.get("version") != CHECKPOINT_VERSION or age_hours > max_age_hours:
+            log.warning("Ara kayıt eski ya da uyumsuz (%.0f saat), baştan başlanıyor.", age_hours)
+            return
+        self.created_at = data["created_at"]
+        self._sections = data.get("sections", {})
+        self.resumed = sum(len(section) for section in self._sections.values())
+        log.info("Ara kayıttan devam ediliyor: %s", self.summary())
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._sections.get(section, {}).get(key, default)
+
+    def put(self, section: str, key: str, value: Any) -> None:
+        """Tamamlanan bir işi kaydeder; son yazmadan bu yana `flush_interval` geçtiyse diske yazar."""
+        with self._lock:
+            self._sections.setdefault(section, {})[key] = value
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def expired(self) -> bool:
+        """`max_runtime` dolduysa True; çağıran yeni iş başlatmamalıdır."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": CHECKPOINT_VERSION, "created_at": self.created_at, "sections": self._sections}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def clear(self) -> None:
+        """Tarama başarıyla bittiğinde kaydı siler."""
+        with self._lock:
+            self._sections = {}
+            self._dirty = False
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(f"{name}: {len(section)}" for name, section in sorted(self._sections.items())) or "boş"
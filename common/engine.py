@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Kaynakları (`common.source.Source`) çalıştıran ortak tarama motoru.
+
+İçerik listesi alındıktan sonra bölüm listeleri ve yayın linkleri sınırlı
+kuyruklarla bağlı iki eşzamanlı aşamada (`common.pipeline.Pipeline`) çözülür;
+sonuçlar içerik ve bölüm sırasına göre toplanır ki çıktı her çalıştırmada aynı
+olsun. Motor her kaynak için aynı şekilde şunları sağlar:
+
+- oturum havuzunun işçi sayısına göre büyütülmesi ve host başına hız sınırı,
+- yayın linklerinin kalıcı önbellekten (`StreamCache`) okunması,
+- tamamlanan işlerin ara kayda (`Checkpoint`) yazılması ve --resume ile devamı,
+- ana liste + grup dosyalarının tek geçişte yazılması ve manifest,
+- istek ve aşama ölçümleri (`common.metrics`; aşamalar "<kaynak>/<aşama>" adıyla),
+- tembel mod (`lazy_base`): yayın linkleri çözülmez, yerine `common.resolver`
+  çözümleyici adresi yazılır.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from common.checkpoint import Checkpoint
+from common.manifest import Manifest
+from common.metrics import METRICS, instrument_session
+from common.m3u import M3UFanout
+from common.pipeline import Pipeline
+from common.ratelimit import RateScheduler, throttle_session
+from common.resolver import lazy_url
+from common.session import resize_pool
+from common.source import Source
+from common.stream_cache import StreamCache
+
+DEFAULT_WORKERS = 8
+
+log = logging.getLogger("engine")
+
+
+class Engine:
+    """
+    Bir kaynağı tarayıp M3U dosyalarını yazar:
+
+        engine = Engine(source, workers=16, stream_cache=cache, checkpoint=checkpoint)
+        data = engine.run()
+
+    `data` yazılan içeriklerin (bölümleriyle) listesidir; hiçbir şey yazılmadıysa None.
+    Özel akışlar için `list_content`, `fetch_episode_lists`, `resolve_episodes`,
+    `collect` ve `write` tek tek de kullanılabilir.
+    """
+
+    def __init__(self, source: Source, workers: int = DEFAULT_WORKERS, stream_cache: Optional[StreamCache] = None,
+                 checkpoint: Optional[Checkpoint] = None, limiter: Optional[RateScheduler] = None,
+                 list_workers: Optional[int] = None, lazy_base: Optional[str] = None) -> None:
+        self.source = source
+        self.workers = max(1, workers)
+        # Bölüm listesi aşamasının işçi sayısı; verilmezse `workers`.
+        self.list_workers = max(1, list_workers or workers)
+        self.stream_cache = stream_cache if source.stream_ttl_days else None
+        self.checkpoint = checkpoint
+        self.limiter = limiter
+        # Verilirse bölümler çözümleyici adresine (`common.resolver.lazy_url`) bağlanır.
+        self.lazy_base = lazy_base
+        self.pipeline: Optional[Pipeline] = None
+        self.manifest: Optional[Manifest] = None
+        if self.stream_cache is not None:
+            self.stream_cache.set_policy(source.name, source.stream_ttl_days, source.stream_revalidate_days)
+        if source.session is not None:
+            instrument_session(source.session)
+            resize_pool(source.session, self.workers + self.list_workers)
+            if limiter is not None:
+                throttle_session(source.session, limiter)
+
+    # --- Ara kayıtlı adımlar ---
+
+    def expired(self) -> bool:
+        return self.checkpoint is not None and self.checkpoint.expired()
+
+    def list_content(self) -> List[Dict[str, Any]]:
+        if self.checkpoint is not None:
+            saved = self.checkpoint.get("content", "all")
+            if saved:
+                return saved
+        with METRICS.stage(f"{self.source.name}/içerik listesi"):
+            contents = self.source.list_content()
+        if self.checkpoint is not None and contents:
+            self.checkpoint.put("content", "all", contents)
+        return contents
+
+    def list_episodes(self, content: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """İçeriğin bölüm listesi; ara kayıtta varsa (içeriğe eklenen bilgilerle birlikte) oradan."""
+        key = self.source.content_key(content)
+        if self.checkpoint is not None:
+            saved = self.checkpoint.get("episode_lists", key)
+            if saved is not None:
+                content.update(saved["content"])
+                return saved["episodes"]
+            if self.checkpoint.expired():
+                return []
+        episodes = self.source.list_episodes(content)
+        if self.checkpoint is not None and episodes:
+            self.checkpoint.put("episode_lists", key, {"content": content, "episodes": episodes})
+        return episodes
+
+    def resolve(self, episode: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Bölümün yayın linkini ara kayıttan, kalıcı önbellekten ya da kaynaktan çözer."""
+        key = self.source.episode_key(episode)
+        if self.lazy_base is not None:
+            return dict(episode, stream_url=lazy_url(self.lazy_base, self.source.name, key),
+                        resolved_at=int(time.time()))
+        if self.checkpoint is not None:
+            saved = self.checkpoint.get("resolved", key)
+            if saved or self.checkpoint.expired():
+                return saved
+        resolved_at = None
+        if self.stream_cache is not None:
+            stream_url = self.stream_cache.resolve(self.source.name, key, lambda: self.source.resolve_stream(episode))
+            # Önbellekten (taze ya da eski) gelen linkin yaşı korunur; yeniden doğrulama saati sıfırlanmaz.
+            resolved_at = self.stream_cache.resolved_at(self.source.name, key) if stream_url else None
+        else:
+            stream_url = self.source.resolve_stream(episode)
+        if not stream_url:
+            METRICS.mark_failed()
+            return None
+        resolved = dict(episode, stream_url=stream_url, resolved_at=int(resolved_at or time.time()))
+        if self.checkpoint is not None:
+            self.checkpoint.put("resolved", key, resolved)
+        return resolved
+
+    # --- Eşzamanlı tarama ---
+
+    def _map(self, stage: str, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        metrics_stage = f"{self.source.name}/{stage}"
+
+        def measured(item: Any) -> Any:
+            with METRICS.stage(metrics_stage):
+                return func(item)
+
+        if self.workers <= 1:
+            return [measured(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(measured, items))
+
+    def fetch_episode_lists(self, contents: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Tüm içeriklerin bölüm listelerini `contents` sırasıyla döndürür."""
+        return self._map("bölüm listesi", self.list_episodes, contents)
+
+    def resolve_episodes(self, episodes: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Bölümlerin yayın linklerini verilen sırayı koruyarak çözer."""
+        return self._map("yayın linki", self.resolve, episodes)
+
+    def crawl(self, contents: List[Dict[str, Any]]) -> List[List[Optional[Dict[str, Any]]]]:
+        """
+        Bölüm listelerini ve yayın linklerini aynı anda ilerleyen iki aşamada çözer.
+        Dönen liste `contents` ile aynı sıradadır; çözülemeyen bölümler None'dır.
+        """
+        results: List[List[Optional[Dict[str, Any]]]] = [[] for _ in contents]
+
+        def list_stage(item: Any, emit: Callable[[Any], None]) -> None:
+            idx, content = item
+            episodes = self.list_episodes(content)
+            if not episodes:
+                log.info("-> '%s' için bölüm bulunamadı, atlanıyor.", content.get("name", ""))
+            results[idx] = [None] * len(episodes)
+            for ep_idx, episode in enumerate(episodes):
+                emit((idx, ep_idx, episode))
+
+        def resolve_stage(item: Any, emit: Callable[[Any], None]) -> None:
+            idx, ep_idx, episode = item
+            results[idx][ep_idx] = self.resolve(episode)
+
+        self.pipeline = Pipeline(name=self.source.name)
+        self.pipeline.stage("bölüm listesi", list_stage, workers=self.list_workers)
+        self.pipeline.stage("yayın linki", resolve_stage, workers=self.workers)
+        self.pipeline.run(enumerate(contents))
+        log.info("[%s] Tarama: %s", self.source.name, self.pipeline.summary())
+        return results
+
+    @staticmethod
+    def collect(contents: List[Dict[str, Any]],
+                episode_lists: List[List[Optional[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Yayın linki çözülen bölümleri içeriklerine ekler; bölümü kalmayan içerikler atlanır."""
+        data = []
+        for content, episodes in zip(contents, episode_lists):
+            episodes = [ep for ep in episodes if ep]
+            if episodes:
+                data.append(dict(content, episodes=episodes))
+        return data
+
+    # --- Çıktı ---
+
+    def write(self, data: List[Dict[str, Any]]) -> Optional[Manifest]:
+        """Ana listeyi ve içerik başına listeleri tek geçişte yazar (her girdi bir kez biçimlendirilir)."""
+        source = self.source
+        manifest = None
+        if source.manifest_name:
+            manifest = Manifest(os.path.join(os.path.dirname(source.master_path), source.manifest_name))
+        with METRICS.stage(f"{source.name}/yazma"), \
+                M3UFanout(source.master_path, header=source.header, skip_empty_groups=source.skip_empty_groups,
+                          manifest=manifest) as out:
+            for content in data:
+                out.start_group(source.group_path(content))
+                out.write_entries(source.entries(content))
+        self.manifest = manifest
+        if manifest is not None:
+            manifest.save()
+            log.info("[%s] M3U çıktıları: %s", source.name, manifest.summary())
+        return manifest
+
+    def run(self, crawl: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+            ) -> Optional[List[Dict[str, Any]]]:
+        """
+        İçerikleri listeler, tarar ve `publish` ile yazar. `crawl` verilirse varsayılan
+        tarama yerine kullanılır (içerik listesini alıp `collect` biçiminde veri döndürür).
+        """
+        contents = self.list_content()
+        if not contents:
+            log.critical("[%s] Hiç içerik bulunamadı. İşlem durduruldu.", self.source.name)
+            return None
+        log.info("[%s] Toplam %d içerik bulundu. Bölümler ve yayın linkleri çekilecek...",
+                 self.source.name, len(contents))
+        return self.publish(crawl(contents) if crawl else self.collect(contents, self.crawl(contents)))
+
+    def publish(self, data: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Taranan veriyi yazar ve döndürür; hiçbir şey yazılmadıysa None. Başarılı çalışmada
+        ara kayıt silinir; süre dolduysa ya da yazma başarısızsa korunur.
+        """
+        name = self.source.name
+        if self.expired():
+            log.warning("[%s] Azami çalışma süresi doldu, M3U dosyaları yazılmadı. İlerleme kaydedildi (%s); "
+                        "kalan iş için --resume ile yeniden çalıştırın.", name, self.checkpoint.summary())
+            return None
+        if not data:
+            log.error("[%s] Hiçbir bölüm için geçerli yayın linki bulunamadı. M3U dosyaları oluşturulmayacak.", name)
+            return None
+        try:
+            self.write(data)
+        except Exception as e:
+            log.critical("[%s] M3U dosyaları oluşturulurken hata: %s", name, e, exc_info=True)
+            return None
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+        return data
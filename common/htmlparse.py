@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+HTML ayrıştırma yardımcıları.
+
+- `make_soup`: BeautifulSoup ağacını kurulu en hızlı arka uçla (lxml varsa lxml,
+  yoksa Python'un html.parser'ı) oluşturur. Arka uç SCRAPER_HTML_PARSER ortam
+  değişkeniyle zorlanabilir.
+- `find_attribute`: Tek bir niteliğin aranması gereken sayfalar için (ör.
+  `div#video-container[data-videoid]`, Fembed iframe'i, CSRF token'ı) ağaç
+  kurmadan, sayfayı parça parça işleyen ve hedef bulunduğu anda duran hızlı yol.
+"""
+
+import codecs
+import os
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Optional, Pattern, Union
+
+from bs4 import BeautifulSoup
+
+from common.metrics import METRICS
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:  # lxml opsiyonel bir bağımlılıktır
+    DEFAULT_PARSER = "html.parser"
+
+PARSER = os.environ.get("SCRAPER_HTML_PARSER", DEFAULT_PARSER)
+CHUNK_SIZE = 16 * 1024
+
+AttrMatch = Dict[str, Union[str, Pattern, bool]]
+
+
+def make_soup(markup: Union[str, bytes], parser: Optional[str] = None) -> BeautifulSoup:
+    """Seçili arka uçla BeautifulSoup ağacı oluşturur."""
+    with METRICS.timer("make_soup"):
+        return BeautifulSoup(markup, parser or PARSER)
+
+
+class _Found(Exception):
+    pass
+
+
+class _AttributeScanner(HTMLParser):
+    """İlk eşleşen etiketin istenen niteliğini bulunca `_Found` fırlatan akış ayrıştırıcı."""
+
+    def __init__(self, tag: str, attr: str, match: AttrMatch) -> None:
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.attr = attr
+        self.match = match
+        self.value: Optional[str] = None
+
+    def _matches(self, attrs: Dict[str, Optional[str]]) -> bool:
+        for name, expected in self.match.items():
+            actual = attrs.get(name)
+            if expected is True:
+                if name not in attrs:
+                    return False
+            elif isinstance(expected, str):
+                if actual != expected:
+                    return False
+            elif actual is None or not expected.search(actual):
+                return False
+        return True
+
+    def handle_starttag(self, tag, attrs):
+        if tag != self.tag:
+            return
+        attr_map = dict(attrs)
+        if attr_map.get(self.attr) and self._matches(attr_map):
+            self.value = attr_map[self.attr]
+            raise _Found()
+
+    handle_startendtag = handle_starttag
+
+
+def find_attribute(source: Union[str, bytes, Iterable[bytes]], tag: str, attr: str,
+                   match: Optional[AttrMatch] = None, encoding: str = "utf-8") -> Optional[str]:
+    """
+    `tag` etiketlerinden `match` koşullarını sağlayan ilkinin `attr` niteliğini döndürür.
+    `source` metin, bayt ya da bayt parçaları (ör. `response.iter_content()`) olabilir;
+    parçalar hedef bulunduğu anda okunmayı bırakır.
+    """
+    if isinstance(source, (str, bytes)):
+        with METRICS.timer("find_attribute"):
+            return _scan((source,), tag, attr, match, encoding)
+    # Parçalı okumada süre ağdan okumayı da içerdiğinden ayrıştırma süresine yazılmaz.
+    return _scan(source, tag, attr, match, encoding)
+
+
+def _scan(chunks: Iterable[Union[str, bytes]], tag: str, attr: str, match: Optional[AttrMatch],
+          encoding: str) -> Optional[str]:
+    scanner = _AttributeScanner(tag, attr, match or {})
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    try:
+        for chunk in chunks:
+            scanner.feed(chunk if isinstance(chunk, str) else decoder.decode(chunk))
+        scanner.feed(decoder.decode(b"", final=True))
+        scanner.close()
+    except _Found:
+        pass
+    return scanner.value
+
+
+def find_response_attribute(response, tag: str, attr: str, match: Optional[AttrMatch] = None) -> Optional[str]:
+    """
+    `stream=True` ile açılmış bir requests yanıtında `find_attribute` çalıştırır ve
+    hedef bulunduğunda gövdenin geri kalanını indirmeden yanıtı kapatır.
+    """
+    try:
+        return find_attribute(response.iter_content(CHUNK_SIZE), tag, attr, match)
+    finally:
+        response.close()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+HTML sayfaları için koşullu GET (ETag / Last-Modified) önbelleği.
+
+Her adres için doğrulayıcılar (ETag, Last-Modified), sayfa gövdesi, gövdenin
+özeti ve isteğe bağlı olarak sayfanın ayrıştırılmış hali SQLite'ta saklanır.
+Sonraki isteklerde If-None-Match / If-Modified-Since gönderilir; sunucu 304
+dönerse ya da gövde birebir aynıysa, kayıtlı ayrıştırma sonucu kullanılır ve
+sayfa yeniden ayrıştırılmaz.
+
+requests.Session, cloudscraper veya host limitli bir `get` fonksiyonu ile
+`HTTPCache.get` / `HTTPCache.get_parsed` üzerinden; asenkron istemcilerle ise
+`validators` + `complete` + `parse` adımlarıyla kullanılır. Doğrulayıcılar
+gönderildikten sonra kayıt silinmişse (ör. `prune`) 304 yanıtı `MissingPage`
+yükseltir; istek doğrulayıcısız tekrarlanmalıdır (`get` bunu kendisi yapar).
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple, TypeVar, Union
+
+import requests
+
+from common import CACHE_DIR
+
+DEFAULT_HTTP_CACHE_PATH = CACHE_DIR / "http.sqlite"
+DEFAULT_MAX_PAGES = 20_000
+COMMIT_EVERY = 50
+
+T = TypeVar("T")
+log = logging.getLogger("http-cache")
+
+
+class MissingPage(Exception):
+    """304 yanıtı geldi ama kayıtlı gövde yok; sayfa doğrulayıcısız yeniden çekilmeli."""
+
+
+class CachedPage(NamedTuple):
+    """`HTTPCache.get` sonucu: asıl yanıt, (304'te kayıttan gelen) gövde ve sayfanın değişip değişmediği."""
+    response: requests.Response
+    content: bytes
+    encoding: Optional[str]
+    unchanged: bool
+
+
+class HTTPCache:
+    """
+    Thread-safe koşullu GET önbelleği; atlanan sayfa ve tasarruf edilen bayt sayılarını tutar.
+    Yazmalar toplu olarak commit edilir; sayfa sayısı `max_pages` ile sınırlıdır.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_HTTP_CACHE_PATH, max_pages: int = DEFAULT_MAX_PAGES) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_pages = max_pages
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, encoding TEXT,"
+            " digest TEXT NOT NULL, body BLOB NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            " url TEXT NOT NULL, parser TEXT NOT NULL, digest TEXT NOT NULL, data TEXT NOT NULL,"
+            " PRIMARY KEY (url, parser))"
+        )
+        self._conn.commit()
+
+    # --- Düşük seviye adımlar (senkron ve asenkron istemciler için ortak) ---
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """`url` için gönderilecek If-None-Match / If-Modified-Since başlıklarını döndürür."""
+        with self._lock:
+            row = self._conn.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        headers: Dict[str, str] = {}
+        if row:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def complete(self, url: str, status: int, headers: Mapping[str, str], body: bytes,
+                 encoding: Optional[str] = None) -> Tuple[bytes, Optional[str], bool]:
+        """
+        Yanıtı işler ve (gövde, kodlama, değişmedi_mi) döndürür. 304 yanıtında kayıtlı
+        gövde döner (kayıt yoksa `MissingPage`); 200 yanıtında gövde önceki özetle
+        karşılaştırılır ve yalnızca değiştiyse yeniden yazılır.
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            row = self._conn.execute(
+                "SELECT digest, body, encoding FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if status == 304:
+                if not row:
+                    self.stats["missing"] += 1
+                    raise MissingPage(url)
+                stored = zlib.decompress(row[1])
+                self.stats["not_modified"] += 1
+                self.stats["bytes_saved"] += len(stored)
+                self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                self._maybe_commit()
+                return stored, row[2], True
+
+            digest = hashlib.sha1(body).hexdigest()
+            unchanged = bool(row) and row[0] == digest
+            if unchanged:
+                # Gövde aynı: sıkıştırılmış kayıt yeniden yazılmaz, yalnızca doğrulayıcılar ve zaman güncellenir.
+                self.stats["identical"] += 1
+                self._conn.execute(
+                    "UPDATE pages SET etag = ?, last_modified = ?, encoding = ?, fetched_at = ? WHERE url = ?",
+                    (headers.get("ETag"), headers.get("Last-Modified"), encoding, time.time(), url),
+                )
+                self._maybe_commit()
+                return body, encoding, True
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, encoding, digest, body, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, headers.get("ETag"), headers.get("Last-Modified"), encoding, digest,
+                 zlib.compress(body), time.time()),
+            )
+            self._maybe_commit()
+        return body, encoding, unchanged
+
+    def parse(self, url: str, body: bytes, unchanged: bool, parse: Callable[[bytes], T],
+              key: Optional[str] = None) -> T:
+        """
+        Sayfa değişmediyse ve daha önce aynı ayrıştırıcıyla ayrıştırılmışsa kayıtlı sonucu,
+        aksi halde `parse(body)` sonucunu döndürür ve kaydeder. Sonuç JSON'a çevrilebilir olmalıdır.
+        """
+        key = key or getattr(parse, "__qualname__", repr(parse))
+        digest = hashlib.sha1(body).hexdigest()
+        if unchanged:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT data FROM parsed WHERE url = ? AND parser = ? AND digest = ?", (url, key, digest)
+                ).fetchone()
+                if row:
+                    self.stats["pages_skipped"] += 1
+            if row:
+                return json.loads(row[0])
+        result = parse(body)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed (url, parser, digest, data) VALUES (?, ?, ?, ?)",
+                (url, key, digest, json.dumps(result, ensure_ascii=False)),
+            )
+            self._maybe_commit()
+        return result
+
+    def _maybe_commit(self) -> None:
+        # Çağıran kilidi tutuyor olmalı.
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_EVERY:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def prune(self) -> int:
+        """Sayfa sayısını `max_pages` altına indirir (en eski çekilenden başlayarak), silinen sayıyı döndürür."""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            excess = total - self.max_pages
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY fetched_at LIMIT ?)", (excess,)
+                )
+            self._conn.execute("DELETE FROM parsed WHERE url NOT IN (SELECT url FROM pages)")
+            self._conn.commit()
+            self._pending_writes = 0
+        return max(excess, 0)
+
+    # --- requests / cloudscraper için yüksek seviye yardımcılar ---
+
+    def get(self, fetch: Callable[..., requests.Response], url: str, **kwargs: Any) -> CachedPage:
+        """
+        `fetch(url, **kwargs)` (ör. `session.get`) çağrısını doğrulayıcı başlıklarla yapar.
+        304 yanıtında `content` kayıtlı gövdedir; `unchanged` sayfanın değişip değişmediğini belirtir.
+        """
+        headers = kwargs.get("headers") or {}
+        response = fetch(url, **dict(kwargs, headers={**headers, **self.validators(url)}))
+        try:
+            return self._complete_page(url, response)
+        except MissingPage:
+            return self._complete_page(url, fetch(url, **dict(kwargs, headers=headers)))
+
+    def _complete_page(self, url: str, response: requests.Response) -> CachedPage:
+        if response.status_code not in (200, 304):
+            return CachedPage(response, response.content, response.encoding, False)
+        body, encoding, unchanged = self.complete(
+            url, response.status_code, response.headers, response.content, response.encoding
+        )
+        return CachedPage(response, body, encoding, unchanged)
+
+    def get_parsed(self, fetch: Callable[..., requests.Response], url: str, parse: Callable[[bytes], T],
+                   key: Optional[str] = None, **kwargs: Any) -> T:
+        """Sayfayı koşullu olarak çeker ve değişmediyse ayrıştırmayı atlar."""
+        page = self.get(fetch, url, **kwargs)
+        page.response.raise_for_status()
+        return self.parse(url, page.content, page.unchanged, parse, key)
+
+    def log_stats(self, logger: Optional[logging.Logger] = None) -> None:
+        (logger or log).info(
+            "HTTP önbelleği: %d istek, %d yanıt 304, %d aynı içerik, %d sayfa ayrıştırılmadan atlandı, %.1f KB tasarruf",
+            self.stats["requests"], self.stats["not_modified"], self.stats["identical"],
+            self.stats["pages_skipped"], self.stats["bytes_saved"] / 1024,
+        )
+
+    def close(self) -> None:
+        evicted = self.prune()
+        if evicted:
+            log.info("HTTP önbelleği boyut sınırı: %d eski sayfa silindi.", evicted)
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Üretilen M3U listelerindeki yayın linklerinin toplu canlılık denetimi.
+
+Her link bir HEAD isteğiyle (yönlendirmeler, ör. akamaized `action=redirect`
+adımları izlenerek) yoklanır; HEAD'i desteklemeyen sunucularda küçük bir aralıklı
+GET'e (`Range: bytes=0-1023`) düşülür. Yoklamalar eşzamanlı yapılır, aynı anda
+açık istek sayısı host başına `HostLimiter` ile sınırlanır; aynı link birden çok
+listede geçse de bir kez yoklanır.
+
+Yalnızca kesin sonuçlar (2xx/3xx canlı, 404/410 ölü) `StreamCache` üzerinde
+`ttl_days` boyunca saklanır; böylece kararlı linkler her çalıştırmada yeniden
+yoklanmaz. Zaman aşımı, 5xx ve 429 gibi belirsiz sonuçlar önbelleğe yazılmaz ve
+girdi listede kalır. Ölü girdiler `prune` kipinde listeden çıkarılır, `tag`
+kipinde başlıklarına `DEAD_TAG` eklenir (link yeniden canlanırsa etiket kalkar).
+Yeniden yazılan liste bir üreticinin manifestinde kayıtlıysa (`MANIFEST_NAMES`)
+manifestteki özet ve girdi sayısı da güncellenir. Tembel modda (`--lazy URL`)
+yerel çözümleyici adresleri yoklanmaz; HEAD isteği bile kaynağı baştan çözdürür.
+
+    python -m common.liveness --mode prune playsport/all_leagues.m3u "ATV/**/*.m3u"
+"""
+
+import argparse
+import glob
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from common.m3u import M3UWriter
+from common.manifest import Manifest
+from common.m3u_index import PlaylistIndex
+from common.metrics import METRICS
+from common.ratelimit import HostLimiter
+from common.resolver import RESOLVE_PATH
+from common.session import make_session
+from common.stream_cache import StreamCache
+
+CACHE_SOURCE = "canlılık"
+DEFAULT_TTL_DAYS = 3.0
+DEFAULT_WORKERS = 64
+DEFAULT_PER_HOST = 32
+PROBE_TIMEOUT = 10
+PROBE_RETRIES = 1
+RANGE_HEADER = "bytes=0-1023"
+# HEAD'e bu kodlarla yanıt veren sunucular aralıklı GET ile yeniden yoklanır.
+HEAD_UNSUPPORTED = (403, 405, 501)
+DEAD_STATUSES = (404, 410)
+DEAD_TAG = "[KIRIK] "
+MODES = ("tag", "prune", "report")
+# Listeyi yazan üreticinin manifesti, listenin klasöründe ya da üst klasörlerinde aranır.
+MANIFEST_NAMES = ("m3u_manifest.json", "manifest.json")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+log = logging.getLogger("liveness")
+
+
+def verdict(status: Optional[int]) -> Optional[bool]:
+    """Son durum kodunu canlı (True), ölü (False) ya da belirsiz (None) olarak yorumlar."""
+    if status is None:
+        return None
+    if status < 400:
+        return True
+    if status in DEAD_STATUSES:
+        return False
+    return None
+
+
+# ============================
+# Yoklama
+# ============================
+class LivenessChecker:
+    """Thread-safe toplu link yoklayıcı; `stats` önbellek/canlı/ölü/belirsiz sayılarını tutar."""
+
+    def __init__(self, cache: Optional[StreamCache] = None, ttl_days: float = DEFAULT_TTL_DAYS,
+                 workers: int = DEFAULT_WORKERS, per_host: int = DEFAULT_PER_HOST,
+                 session: Optional[requests.Session] = None) -> None:
+        self.cache = cache
+        if cache is not None:
+            cache.set_policy(CACHE_SOURCE, ttl_days)
+        self.workers = max(1, workers)
+        self.limiter = HostLimiter(per_host)
+        self.session = session or make_session({"User-Agent": USER_AGENT}, max_retries=PROBE_RETRIES,
+                                               pool_size=per_host)
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def probe(self, url: str) -> Optional[int]:
+        """Yönlendirmeler izlendikten sonraki son durum kodu; bağlantı hatasında None."""
+        try:
+            with self.limiter.slot(url):
+                response = self.session.head(url, allow_redirects=True, timeout=PROBE_TIMEOUT)
+                if response.status_code in HEAD_UNSUPPORTED:
+                    response = self.session.get(url, headers={"Range": RANGE_HEADER}, stream=True,
+                                                allow_redirects=True, timeout=PROBE_TIMEOUT)
+                    response.close()
+            return response.status_code
+        except requests.RequestException as e:
+            log.debug("Yoklama hatası (%s): %s", url, e)
+            return None
+
+    def _check_one(self, url: str) -> Optional[bool]:
+        with METRICS.stage("canlılık/yoklama"):
+            alive = verdict(self.probe(url))
+            if alive is False:
+                METRICS.mark_failed()
+        if alive is not None and self.cache is not None:
+            self.cache.put(CACHE_SOURCE, url, "1" if alive else "0")
+        self._count("canlı" if alive else "ölü" if alive is False else "belirsiz")
+        return alive
+
+    def check(self, urls: Iterable[str]) -> Dict[str, Optional[bool]]:
+        """Her farklı link için canlı/ölü/belirsiz sonucunu döndürür; önbellekte taze olanlar yoklanmaz."""
+        results: Dict[str, Optional[bool]] = {}
+        pending: List[str] = []
+        for url in dict.fromkeys(urls):
+            cached = self.cache.get(CACHE_SOURCE, url) if self.cache is not None else None
+            if cached is not None:
+                results[url] = cached == "1"
+                self._count("önbellek")
+            else:
+                pending.append(url)
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending)), thread_name_prefix="canlılık") as pool:
+                results.update(zip(pending, pool.map(self._check_one, pending)))
+        return results
+
+    def summary(self) -> str:
+        return (f"{self.stats['önbellek']} önbellekten, {self.stats['canlı']} canlı, "
+                f"{self.stats['ölü']} ölü, {self.stats['belirsiz']} belirsiz")
+
+
+# ============================
+# Liste okuma ve yeniden yazma
+# ============================
+def split_extinf(line: str) -> Tuple[str, str]:
+    """`#EXTINF` satırını tırnak dışındaki ilk virgülden nitelikler ve başlık olarak ikiye ayırır."""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            return line[:index + 1], line[index + 1:]
+    return line, ""
+
+
+def _retitle(raw: str, dead: bool) -> str:
+    lines = raw.splitlines(keepends=True)
+    for number, line in enumerate(lines):
+        if line.startswith("#EXTINF"):
+            attrs, title = split_extinf(line)
+            title = title[len(DEAD_TAG):] if title.startswith(DEAD_TAG) else title
+            lines[number] = attrs + (DEAD_TAG if dead else "") + title
+    return "".join(lines)
+
+
+def apply_results(path: str, results: Dict[str, Optional[bool]], mode: str,
+                  manifest: Optional[Manifest] = None) -> Dict[str, int]:
+    """
+    Sonuçlara göre listeyi budar ya da etiketler; içerik değişmediyse dosyaya dokunulmaz.
+    Verilmişse `manifest` listenin yeni özetini ve girdi sayısını kaydeder.
+    """
+    index = PlaylistIndex.load(path)
+    urls = index.urls()
+    summary = {"entries": len(urls), "dead": sum(results.get(url) is False for url in urls), "changed": 0}
+    if mode == "report":
+        return summary
+    with M3UWriter(path, header=index.header, manifest=manifest) as writer:
+        for row, url in enumerate(urls):
+            alive = results.get(url)
+            if alive is False and mode == "prune":
+                continue
+            # Sonucu belirsiz girdinin önceki etiketi olduğu gibi kalır.
+            raw = index.raw(row) if alive is None else _retitle(index.raw(row), not alive)
+            writer.write_formatted(raw if raw.endswith("\n") else raw + "\n")
+        writer.write_formatted(index.trailer, count=0)
+    summary["changed"] = int(writer.changed)
+    return summary
+
+
+def expand(patterns: Iterable[str]) -> Iterator[str]:
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern, recursive=True)) or ([pattern] if os.path.exists(pattern) else []):
+            if path.endswith(".m3u") and path not in seen:
+                seen.add(path)
+                yield path
+
+
+def owning_manifest(path: str, manifests: Dict[str, Manifest]) -> Optional[Manifest]:
+    """Listeyi kaydetmiş en yakın manifest; okunan manifestler `manifests` içinde tutulur."""
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        for name in MANIFEST_NAMES:
+            candidate = os.path.join(directory, name)
+            if candidate not in manifests and os.path.exists(candidate):
+                manifests[candidate] = Manifest.load(candidate)
+            if candidate in manifests and path in manifests[candidate]:
+                return manifests[candidate]
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def check_playlists(patterns: Iterable[str], checker: LivenessChecker, mode: str = "tag",
+                    lazy: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Desenlere uyan tüm listelerin linklerini birlikte yoklar ve `mode`a göre uygular.
+    `lazy` verilmişse o çözümleyicinin adresleri yoklanmaz, girdiler olduğu gibi kalır.
+    """
+    paths = list(expand(patterns))
+    urls = [url for path in paths for url in PlaylistIndex.load(path).urls()]
+    if lazy:
+        resolver_prefix = lazy.rstrip("/") + RESOLVE_PATH
+        skipped = len(urls)
+        urls = [url for url in urls if not url.startswith(resolver_prefix)]
+        skipped -= len(urls)
+        if skipped:
+            log.info("Canlılık denetimi: %d çözümleyici adresi yoklanmadı.", skipped)
+    log.info("Canlılık denetimi: %d liste, %d link (%d farklı).", len(paths), len(urls), len(set(urls)))
+    results = checker.check(urls)
+    manifests: Dict[str, Manifest] = {}
+    report = {path: apply_results(path, results, mode, owning_manifest(path, manifests) if mode != "report" else None)
+              for path in paths}
+    for manifest in manifests.values():
+        if manifest.changed:
+            manifest.save()
+    log.info("Canlılık denetimi bitti: %s.", checker.summary())
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="M3U listelerindeki yayın linklerinin canlılık denetimi")
+    parser.add_argument("playlists", nargs="+", help="M3U dosyaları ya da glob desenleri")
+    parser.add_argument("--mode", choices=MODES, default="tag",
+                        help="Ölü girdileri etiketle, listeden çıkar ya da yalnızca raporla (varsayılan: %(default)s)")
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help="Kesin sonuçların önbellekte tutulacağı gün (varsayılan: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false")
+    parser.add_argument("--lazy", default=None, metavar="URL",
+                        help="Bu tembel çözümleyicinin adreslerini yoklama (bkz. run_all.py --lazy)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S")
+    args = parse_args(argv)
+    cache = StreamCache() if args.use_cache else None
+    try:
+        checker = LivenessChecker(cache, args.ttl_days, args.workers, args.per_host)
+        report = check_playlists(args.playlists, checker, args.mode, args.lazy)
+    finally:
+        if cache is not None:
+            cache.close()
+    for path, summary in report.items():
+        log.info("%s: %d girdi, %d ölü%s", path, summary["entries"], summary["dead"],
+                 " (güncellendi)" if summary["changed"] else "")
+    log.info("Ölçümler: %s", METRICS.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+M3U yazma yardımcıları.
+
+`M3UWriter` girdileri bellekte biriktirmeden tamponlu olarak geçici bir dosyaya
+yazar ve kapatılırken hedef dosyanın yerine atomik olarak taşır. Yazma sırasında
+hata olursa geçici dosya silinir ve eski liste olduğu gibi kalır; içerik mevcut
+dosyayla birebir aynıysa dosyaya hiç dokunulmaz. `M3UFanout` ana liste ile grup
+dosyalarını tek geçişte birlikte üretir.
+"""
+
+import hashlib
+import os
+from typing import Iterable, Optional, Sequence, Tuple
+
+from common.manifest import Manifest, replace_if_changed
+
+DEFAULT_HEADER = "#EXTM3U\n"
+WRITE_BUFFER = 64 * 1024
+
+Attrs = Sequence[Tuple[str, object]]
+
+
+def escape_attr(value: object) -> str:
+    """Nitelik değerini tırnak ve satır sonlarından arındırır."""
+    return str(value).replace('"', "'").replace("\r", " ").replace("\n", " ")
+
+
+def escape_title(value: object) -> str:
+    """Başlıkta satır sonu bulunursa liste bozulacağından boşlukla değiştirir."""
+    return str(value).replace("\r", " ").replace("\n", " ")
+
+
+def format_entry(title: object, url: str, attrs: Attrs = ()) -> str:
+    """Tek bir girdinin `#EXTINF` + URL satırlarını üretir."""
+    attr_text = "".join(f' {name}="{escape_attr(value)}"' for name, value in attrs)
+    return f"#EXTINF:-1{attr_text},{escape_title(title)}\n{url.strip()}\n"
+
+
+class M3UWriter:
+    """
+    Tamponlu, artımlı ve atomik M3U yazıcı. Bağlam yöneticisi olarak kullanılır:
+
+        with M3UWriter(path) as writer:
+            writer.write_entry(title, url, [("group-title", group)])
+
+    `skip_empty=True` ise hiç girdi yazılmadığında dosya oluşturulmaz. İçerik yazılırken
+    özeti hesaplanır; `changed` kapatıldıktan sonra dosyanın değişip değişmediğini,
+    verilmişse `manifest` de yol, özet ve girdi sayısını tutar.
+    """
+
+    def __init__(self, path: str, header: str = DEFAULT_HEADER, skip_empty: bool = False,
+                 manifest: Optional[Manifest] = None) -> None:
+        self.path = path
+        self.skip_empty = skip_empty
+        self.manifest = manifest
+        self.entries = 0
+        self.digest: Optional[str] = None
+        self.changed = False
+        self._hasher = hashlib.sha256()
+        self._tmp = path + ".tmp"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self._tmp, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER)
+        self._write(header)
+
+    def _write(self, text: str) -> None:
+        self._file.write(text)
+        self._hasher.update(text.encode("utf-8"))
+
+    def write_entry(self, title: object, url: str, attrs: Attrs = ()) -> None:
+        self.write_formatted(format_entry(title, url, attrs))
+
+    def write_formatted(self, text: str, count: int = 1) -> None:
+        """`format_entry` ile önceden biçimlendirilmiş `count` girdiyi yazar."""
+        self._write(text)
+        self.entries += count
+
+    def write_entries(self, entries: Iterable[Tuple[object, str, Attrs]]) -> None:
+        for title, url, attrs in entries:
+            self.write_entry(title, url, attrs)
+
+    def close(self) -> Optional[str]:
+        """
+        Dosyayı (içerik değiştiyse) yerine taşır ve yolunu döndürür; boş liste atlandıysa
+        None döner.
+        """
+        if self._file.closed:
+            return None if self.digest is None else self.path
+        self._file.close()
+        if self.skip_empty and not self.entries:
+            os.remove(self._tmp)
+            return None
+        self.digest = self._hasher.hexdigest()
+        self.changed = replace_if_changed(self._tmp, self.path, self.digest)
+        if self.manifest is not None:
+            self.manifest.record(self.path, self.digest, self.entries, self.changed)
+        return self.path
+
+    def discard(self) -> None:
+        """Yazılanları atar; hedef dosyaya dokunulmaz."""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self) -> "M3UWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class M3UFanout:
+    """
+    Her girdiyi tek sefer biçimlendirip hem ana listeye hem de o anki grup dosyasına
+    yazan yazıcı. Gruplar ardışık gelmelidir; `start_group` önceki grup dosyasını
+    kapatır. Aynı gruba daha sonra dönülmesi dosyanın üzerine yazacağından hata verir.
+
+        with M3UFanout(master_path) as out:
+            for item in data:
+                out.start_group(group_path)
+                out.write_entries(entries(item))
+    """
+
+    def __init__(self, master_path: str, header: str = DEFAULT_HEADER, skip_empty_groups: bool = True,
+                 manifest: Optional[Manifest] = None) -> None:
+        self.header = header
+        self.skip_empty_groups = skip_empty_groups
+        self.manifest = manifest
+        self.master = M3UWriter(master_path, header=header, manifest=manifest)
+        self.group: Optional[M3UWriter] = None
+        self.groups_written = 0
+        self._seen_groups = set()
+
+    @property
+    def entries(self) -> int:
+        return self.master.entries
+
+    def start_group(self, path: Optional[str]) -> None:
+        """Yeni grup dosyasına geçer; `path` None ise sonraki girdiler yalnızca ana listeye yazılır."""
+        if path in self._seen_groups:
+            raise ValueError(f"Grup ardışık değil, dosya iki kez yazılacaktı: {path}")
+        self._close_group()
+        if path is not None:
+            self._seen_groups.add(path)
+            self.group = M3UWriter(path, header=self.header, skip_empty=self.skip_empty_groups,
+                                   manifest=self.manifest)
+
+    def write_entry(self, title: object, url: str, attrs: Attrs = ()) -> None:
+        self.write_formatted(format_entry(title, url, attrs))
+
+    def write_formatted(self, text: str, count: int = 1) -> None:
+        self.master.write_formatted(text, count)
+        if self.group is not None:
+            self.group.write_formatted(text, count)
+
+    def write_entries(self, entries: Iterable[Tuple[object, str, Attrs]]) -> None:
+        for title, url, attrs in entries:
+            self.write_entry(title, url, attrs)
+
+    def _close_group(self) -> None:
+        if self.group is not None:
+            if self.group.close() is not None:
+                self.groups_written += 1
+            self.group = None
+
+    def close(self) -> Optional[str]:
+        self._close_group()
+        return self.master.close()
+
+    def discard(self) -> None:
+        if self.group is not None:
+            self.group.discard()
+            self.group = None
+        self.master.discard()
+
+    def __enter__(self) -> "M3UFanout":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Üretilmiş M3U listeleri için sütunlu, dizi (array) tabanlı okuma indeksi.
+
+`PlaylistIndex` dosyanın UTF-8 baytlarını tek bir `bytes` nesnesi olarak tutar; her
+girdi için yalnızca başlık, URL, tvg-id ve ham metin aralıklarının konumlarını
+`array` sütunlarında, grup adını da tekilleştirilmiş bir koda çevrilmiş olarak
+saklar. Girdi başına sözlük ve ayrı dizgi nesneleri oluşmadığından sözlük listesine
+göre daha az bellek kullanır; alanlar erişildiği anda dilimlenip çözülür. Ayrıştırma
+tek bir düzenli ifade taramasıyla yapılır (karşılaştırma: benchmarks/bench_m3u_index.py).
+
+    index = PlaylistIndex.load("playsport/all_leagues.m3u")
+    fb = index.select(season="2023/2024", team="fenerbahçe")
+    merged = PlaylistIndex.merge([index, PlaylistIndex.load("diger.m3u")]).dedupe()
+    merged.write("birlesik.m3u")
+
+Her girdinin ham metni (`raw`), önceki girdiden sonra gelen yorum satırları dahil
+olmak üzere dosyadaki haliyle korunur; başlık + girdiler + `trailer` birleştirilince
+dosya aynen elde edilir.
+"""
+
+import re
+from array import array
+from operator import methodcaller
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from common.m3u import DEFAULT_HEADER, M3UWriter
+
+# `line` #EXTINF satırının geri kalanı; URL'den önceki yorum satırları (#EXTVLCOPT vb.)
+# ve boş satırlar girdinin parçası sayılır. `[^\n]*` re modülünde özel olarak hızlı
+# çalıştığından satır sonundaki \r ve boşluklar ifadede değil sonradan ayıklanır.
+ENTRY_RE = re.compile(
+    rb'^#EXTINF:(?P<line>[^\n]*)\n'
+    rb'(?:(?!#EXTINF)#[^\n]*\n|[ \t\r]*\n)*'
+    rb'[ \t]*(?P<url>[^#\s][^\n]*)(?:\n|\Z)',
+    re.M,
+)
+
+_COLUMNS = ("_start", "_end", "_title_start", "_title_end", "_url_start", "_url_end", "_id_start", "_id_end")
+
+
+class PlaylistEntry(NamedTuple):
+    group: str
+    tvg_id: str
+    title: str
+    url: str
+
+
+def _fields(line: bytes) -> Tuple[int, int, bytes, int, int]:
+    """
+    #EXTINF satırından (başlık başlangıcı, başlık sonu, grup, tvg-id başlangıcı, tvg-id
+    sonu). Başlık tırnak dışındaki ilk virgülden sonra başlar; nitelik değerlerinde
+    tırnak bulunmaz (bkz. `common.m3u.escape_attr`), bu yüzden tırnaklı niteliklerin
+    sonu ilk `",` olur.
+    """
+    title_end = len(line) - line.endswith(b"\r")
+    comma = line.find(b",")
+    if comma < 0:
+        return title_end, title_end, b"", 0, 0
+    if line.find(b'"', 0, comma) >= 0:
+        comma = line.find(b'",') + 1
+    group = line.find(b'group-title="', 0, comma)
+    group_name = line[group + 13:line.find(b'"', group + 13)] if group >= 0 else b""
+    tvg_id = line.find(b'tvg-id="', 0, comma)
+    if tvg_id < 0:
+        return comma + 1, title_end, group_name, 0, 0
+    return comma + 1, title_end, group_name, tvg_id + 8, line.find(b'"', tvg_id + 8)
+
+
+def _fold(text: str) -> str:
+    """Türkçe I/İ dönüşümünü gözeterek büyük/küçük harf duyarsız karşılaştırma için küçültür."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def _season_key(text: str) -> str:
+    return text.replace("-", "/").replace("_", " ")
+
+
+class PlaylistIndex:
+    """Salt okunur M3U indeksi; `select`, `dedupe` ve `merge` yeni indeks döndürür."""
+
+    def __init__(self, data: bytes = b"", header: str = DEFAULT_HEADER, trailer: str = "") -> None:
+        self.data = data
+        self.header = header
+        self.trailer = trailer
+        self.groups: List[str] = []
+        self._group_codes: Dict[bytes, int] = {}
+        self._group = array("I")
+        for column in _COLUMNS:
+            setattr(self, column, array("I"))
+
+    # --- Oluşturma ---
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PlaylistIndex":
+        first = data.find(b"#EXTINF")
+        if first < 0:
+            return cls(data, header=data.decode("utf-8"))
+        index = cls(data, header=data[:first].decode("utf-8"))
+        # Sütunlar satır satır döngü yerine eşleşmeler üzerinde map ile toplu doldurulur.
+        matches = list(ENTRY_RE.finditer(data, first))
+        if not matches:
+            index.trailer = data[first:].decode("utf-8")
+            return index
+        ends = array("I", map(methodcaller("end"), matches))
+        index._start = array("I", [first]) + ends[:-1]
+        index._end = ends
+        url_starts = array("I", map(methodcaller("start", "url"), matches))
+        index._url_start = url_starts
+        index._url_end = array("I", [end if data[end - 1] > 32 else start + len(data[start:end].rstrip())
+                                     for start, end in zip(url_starts, map(methodcaller("end", "url"), matches))])
+        line_starts = array("I", map(methodcaller("start", "line"), matches))
+        fields = list(map(_fields, map(methodcaller("group", "line"), matches)))
+        code = index._code
+        index._group = array("I", [code(group) for _, _, group, _, _ in fields])
+        index._title_start = array("I", [start + field[0] for start, field in zip(line_starts, fields)])
+        index._title_end = array("I", [start + field[1] for start, field in zip(line_starts, fields)])
+        index._id_start = array("I", [start + field[3] if field[4] else 0 for start, field in zip(line_starts, fields)])
+        index._id_end = array("I", [start + field[4] if field[4] else 0 for start, field in zip(line_starts, fields)])
+        index.trailer = data[ends[-1]:].decode("utf-8")
+        return index
+
+    @classmethod
+    def from_text(cls, text: str) -> "PlaylistIndex":
+        return cls.from_bytes(text.encode("utf-8"))
+
+    @classmethod
+    def load(cls, path: str) -> "PlaylistIndex":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def _code(self, group: bytes) -> int:
+        code = self._group_codes.get(group)
+        if code is None:
+            code = self._group_codes[group] = len(self.groups)
+            self.groups.append(group.decode("utf-8"))
+        return code
+
+    def take(self, rows: Iterable[int]) -> "PlaylistIndex":
+        """Verilen satırlardan (sırasıyla) oluşan, aynı veriyi paylaşan yeni indeks."""
+        rows = list(rows)
+        subset = PlaylistIndex(self.data, self.header, self.trailer)
+        subset.groups, subset._group_codes = self.groups, self._group_codes
+        for name in _COLUMNS + ("_group",):
+            column = getattr(self, name)
+            setattr(subset, name, array(column.typecode, [column[row] for row in rows]))
+        return subset
+
+    @classmethod
+    def merge(cls, indexes: Sequence["PlaylistIndex"]) -> "PlaylistIndex":
+        """Listeleri sırayla birleştirir; başlık ilk listeden, son ek son listeden alınır."""
+        if not indexes:
+            return cls()
+        merged = cls(b"".join(index.data for index in indexes), indexes[0].header, indexes[-1].trailer)
+        offset = 0
+        for index in indexes:
+            # tvg-id'si olmayan girdilerin (0, 0) aralığı kaydırılsa da boş kalır.
+            for name in _COLUMNS:
+                column = getattr(index, name)
+                getattr(merged, name).extend(array("I", [value + offset for value in column]) if offset else column)
+            codes = [merged._code(group.encode("utf-8")) for group in index.groups]
+            merged._group.extend(array("I", [codes[code] for code in index._group]))
+            offset += len(index.data)
+        return merged
+
+    # --- Erişim ---
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def _slice(self, start: int, end: int) -> str:
+        return self.data[start:end].decode("utf-8")
+
+    def group(self, row: int) -> str:
+        return self.groups[self._group[row]]
+
+    def title(self, row: int) -> str:
+        return self._slice(self._title_start[row], self._title_end[row])
+
+    def url(self, row: int) -> str:
+        return self._slice(self._url_start[row], self._url_end[row])
+
+    def tvg_id(self, row: int) -> str:
+        return self._slice(self._id_start[row], self._id_end[row])
+
+    def raw(self, row: int) -> str:
+        """Girdinin dosyadaki metni (önündeki yorum satırları ve URL satırı dahil)."""
+        return self._slice(self._start[row], self._end[row])
+
+    def __getitem__(self, row: int) -> PlaylistEntry:
+        if row < 0:
+            row += len(self)
+        return PlaylistEntry(self.group(row), self.tvg_id(row), self.title(row), self.url(row))
+
+    def __iter__(self) -> Iterator[PlaylistEntry]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def urls(self) -> List[str]:
+        data = self.data
+        return [data[start:end].decode("utf-8") for start, end in zip(self._url_start, self._url_end)]
+
+    def titles(self) -> List[str]:
+        data = self.data
+        return [data[start:end].decode("utf-8") for start, end in zip(self._title_start, self._title_end)]
+
+    # --- Sorgu ---
+
+    def rows(self, group: Optional[str] = None, season: Optional[str] = None,
+             team: Optional[str] = None, group_like: Optional[str] = None) -> List[int]:
+        """
+        Koşullara uyan satırlar. `group` grup adıyla birebir, `season` grup adında
+        ("2023/2024", "2023-2024"), `group_like` (lig, dizi adı) grup adında ve `team`
+        başlıkta büyük/küçük harf duyarsız aranır.
+        """
+        codes: Iterable[int] = range(len(self.groups))
+        if group is not None:
+            codes = [code for code in codes if self.groups[code] == group]
+        if group_like is not None:
+            needle = _fold(group_like)
+            codes = [code for code in codes if needle in _fold(self.groups[code])]
+        if season is not None:
+            key = _season_key(season)
+            codes = [code for code in codes if key in _season_key(self.groups[code])]
+        wanted = set(codes)
+        rows = [row for row, code in enumerate(self._group) if code in wanted]
+        if team is not None:
+            needle, data = _fold(team), self.data
+            starts, ends = self._title_start, self._title_end
+            rows = [row for row in rows if needle in _fold(data[starts[row]:ends[row]].decode("utf-8"))]
+        return rows
+
+    def select(self, group: Optional[str] = None, season: Optional[str] = None,
+               team: Optional[str] = None, group_like: Optional[str] = None) -> "PlaylistIndex":
+        return self.take(self.rows(group, season, team, group_like))
+
+    def dedupe(self) -> "PlaylistIndex":
+        """Aynı yayın linkinin yalnızca ilk geçtiği girdiyi tutar."""
+        data, seen, rows = self.data, set(), []
+        for row, (start, end) in enumerate(zip(self._url_start, self._url_end)):
+            url = data[start:end]
+            if url not in seen:
+                seen.add(url)
+                rows.append(row)
+        return self.take(rows) if len(rows) != len(self) else self
+
+    # --- Yazma ---
+
+    def to_bytes(self) -> bytes:
+        """Başlık, ham girdiler ve son ekten oluşan liste içeriği (UTF-8)."""
+        data, parts = self.data, [self.header.encode("utf-8")]
+        for start, end in zip(self._start, self._end):
+            parts.append(data[start:end])
+            if data[end - 1:end] != b"\n":
+                parts.append(b"\n")
+        parts.append(self.trailer.encode("utf-8"))
+        return b"".join(parts)
+
+    def write(self, path: str) -> bool:
+        """Girdileri ham halleriyle `M3UWriter` üzerinden yazar; dosya değiştiyse True."""
+        with M3UWriter(path, header=self.header) as writer:
+            for row in range(len(self)):
+                raw = self.raw(row)
+                writer.write_formatted(raw if raw.endswith("\n") else raw + "\n")
+            writer.write_formatted(self.trailer, count=0)
+        return writer.changed
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Çıktı dosyaları için içerik özeti (sha256) karşılaştırması ve manifest.
+
+İçeriği değişmeyen dosyalara dokunulmaz (mtime korunur, gereksiz disk yazması
+olmaz). `Manifest` her çalıştırmada yazılan dosyaları (yol → özet, girdi sayısı)
+kaydeder. Manifest dosyası da yalnızca değiştiğinde yeniden yazılır, bu nedenle
+iş akışları `git status` ile listelerin değişip değişmediğine karar verebilir.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+READ_CHUNK = 64 * 1024
+
+
+def file_digest(path: str) -> Optional[str]:
+    """Dosyanın sha256 özetini döndürür; dosya yoksa None."""
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                hasher.update(chunk)
+    except FileNotFoundError:
+        return None
+    return hasher.hexdigest()
+
+
+def replace_if_changed(tmp_path: str, path: str, digest: str) -> bool:
+    """
+    `tmp_path` içeriği (özeti `digest`) hedeften farklıysa yerine taşır, aynıysa geçici
+    dosyayı siler. Dosyanın değişip değişmediğini döndürür.
+    """
+    if file_digest(path) == digest:
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    """Metni atomik olarak yazar; içerik aynıysa dosyaya dokunmaz. Değişti mi döndürür."""
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    if file_digest(path) == digest:
+        return False
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+class Manifest:
+    """
+    Bir çalıştırmada üretilen dosyaların kaydı. Yollar manifest dosyasının bulunduğu
+    klasöre göre göreli tutulur ki farklı makinelerde aynı içerik aynı manifesti üretsin.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.changed: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Manifest":
+        """Diskteki manifesti okur; sonradan yeniden yazılan dosyalar `record` ile güncellenir."""
+        manifest = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest.files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            pass
+        return manifest
+
+    def __contains__(self, path: str) -> bool:
+        return self._relpath(path) in self.files
+
+    def _relpath(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def record(self, path: str, digest: str, entries: int, changed: bool) -> None:
+        rel = self._relpath(path)
+        with self._lock:
+            self.files[rel] = {"sha256": digest, "entries": entries}
+            if changed:
+                self.changed.append(rel)
+
+    def save(self) -> bool:
+        """Manifesti yazar; önceki manifestle aynıysa dosyaya dokunmaz. Değişti mi döndürür."""
+        with self._lock:
+            payload = {"files": dict(sorted(self.files.items()))}
+        return write_if_changed(self.path, json.dumps(payload, ensure_ascii=False, indent=1) + "\n")
+
+    def summary(self) -> str:
+        return f"{len(self.files)} dosya, {len(self.changed)} değişti, {len(self.files) - len(self.changed)} aynı kaldı"
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Çalışma ölçümleri: host başına istek sayısı, gecikme dağılımı (p50/p95/p99),
+aktarılan bayt, ayrıştırma süresi ve aşama başına tekrar/hata sayıları.
+
+Ölçümler süreç genelindeki `METRICS` nesnesinde toplanır:
+
+- HTTP istekleri: `instrument_session` oturumun adaptörlerini sarar (her deneme,
+  yönlendirme ve urllib3'ün kendi içinde yaptığı tekrarlar dahil); `make_session`
+  ve `Engine` bunu kendiliğinden yapar. httpx gibi başka istemciler
+  `record_request` ile bildirir.
+- Aşamalar: `with METRICS.stage("atv/yayın linki"):` bloğu süreyi ve başarıyı
+  kaydeder; blok içindeki (aynı thread ya da asyncio görevi) istekler, tekrarlar,
+  hatalar ve ayrıştırma süresi o aşamaya da yazılır. Hata fırlatmadan sonuçsuz
+  kalan işler `METRICS.mark_failed()` ile bildirilir. `Pipeline` her işi kendi
+  aşamasında çalıştırır.
+- Ayrıştırma: `with METRICS.timer("make_soup"):` (bkz. `common.htmlparse`).
+
+Çalışma sonunda `write_report` raporu `.cache/metrics/<ad>.json` dosyasına yazar
+ve özetini `history.jsonl`'a ekler; böylece çalışmalar arası gerileme izlenebilir.
+"""
+
+import contextvars
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import urlsplit
+
+from common import CACHE_DIR
+
+DEFAULT_REPORT_DIR = CACHE_DIR / "metrics"
+HISTORY_NAME = "history.jsonl"
+HISTORY_LIMIT = 500
+# Gecikme histogramının üst sınırları (saniye); sonuncusu sınırsız.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+log = logging.getLogger("metrics")
+
+
+class _StageItem:
+    """Etkin aşamada çalışan tek bir iş."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.failed = False
+
+
+_current_stage: "contextvars.ContextVar[Optional[_StageItem]]" = contextvars.ContextVar("metrics_stage",
+                                                                                          default=None)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Sıralı listede en yakın sıra yöntemiyle p. yüzdelik (p 0-100)."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    values = sorted(values)
+    buckets: Dict[str, int] = {}
+    for value in values:
+        bound = next(b for b in LATENCY_BUCKETS if value <= b)
+        label = f"<={bound:g}" if bound != float("inf") else f">{LATENCY_BUCKETS[-2]:g}"
+        buckets[label] = buckets.get(label, 0) + 1
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(values[-1], 4) if values else 0.0,
+        "histogram": buckets,
+    }
+
+
+class _HostStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes = 0
+        self.statuses: Dict[str, int] = defaultdict(int)
+        self.latencies: List[float] = []
+
+
+class _StageStats:
+    def __init__(self) -> None:
+        self.items = 0
+        self.failures = 0
+        self.requests = 0
+        self.request_failures = 0
+        self.retries = 0
+        self.parse_s = 0.0
+        self.durations: List[float] = []
+
+
+class Metrics:
+    """Thread-safe ölçüm toplayıcı; `report` JSON'a yazılabilir bir sözlük döndürür."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self._hosts: Dict[str, _HostStats] = defaultdict(_HostStats)
+            self._stages: Dict[str, _StageStats] = defaultdict(_StageStats)
+            self._timings: Dict[str, List[float]] = defaultdict(list)
+
+    # --- Kayıt ---
+
+    def record_request(self, url: str, status: Optional[int], elapsed: float, nbytes: int = 0,
+                       retries: int = 0, error: bool = False) -> None:
+        """Tek bir HTTP yanıtını (ya da `status` None ve `error` ile başarısız denemeyi) kaydeder."""
+        host = urlsplit(url).netloc
+        failed = error or status is None or status >= 400
+        item = _current_stage.get()
+        with self._lock:
+            stats = self._hosts[host]
+            stats.requests += 1
+            stats.failures += failed
+            stats.retries += retries
+            stats.bytes += nbytes
+            stats.statuses[str(status) if status is not None else "hata"] += 1
+            stats.latencies.append(elapsed)
+            if item is not None:
+                stage_stats = self._stages[item.name]
+                stage_stats.requests += 1
+                stage_stats.request_failures += failed
+                stage_stats.retries += retries
+
+    def record_timing(self, name: str, elapsed: float) -> None:
+        item = _current_stage.get()
+        with self._lock:
+            self._timings[name].append(elapsed)
+            if item is not None:
+                self._stages[item.name].parse_s += elapsed
+
+    @staticmethod
+    def mark_failed() -> None:
+        """Etkin aşamadaki işi (hata fırlatmadan sonuçsuz kaldıysa) başarısız sayar."""
+        item = _current_stage.get()
+        if item is not None:
+            item.failed = True
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Bloğun süresini `name` adıyla (ve etkin aşamanın ayrıştırma süresine) ekler."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(name, time.perf_counter() - started)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Bloğu `name` aşamasının bir işi olarak kaydeder; hata bloğun dışına aynen iletilir."""
+        item = _StageItem(name)
+        token = _current_stage.set(item)
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = not item.failed
+        finally:
+            _current_stage.reset(token)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stages[name]
+                stats.items += 1
+                stats.failures += not ok
+                stats.durations.append(elapsed)
+
+    # --- Rapor ---
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {
+                host: {
+                    "requests": s.requests, "failures": s.failures, "retries": s.retries, "bytes": s.bytes,
+                    "statuses": dict(sorted(s.statuses.items())), "latency_s": latency_summary(s.latencies),
+                }
+                for host, s in sorted(self._hosts.items())
+            }
+            stages = {
+                name: {
+                    "items": s.items, "failures": s.failures, "requests": s.requests,
+                    "request_failures": s.request_failures, "retries": s.retries,
+                    "parse_s": round(s.parse_s, 4), "duration_s": latency_summary(s.durations),
+                }
+                for name, s in sorted(self._stages.items())
+            }
+            timings = {
+                name: {"count": len(values), "total_s": round(sum(values), 4),
+                       "p95": round(percentile(sorted(values), 95), 4)}
+                for name, values in sorted(self._timings.items())
+            }
+            started = self.started
+        return {
+            "started_at": int(started),
+            "duration_s": round(time.time() - started, 2),
+            "totals": {
+                "requests": sum(h["requests"] for h in hosts.values()),
+                "failures": sum(h["failures"] for h in hosts.values()),
+                "retries": sum(h["retries"] for h in hosts.values()),
+                "bytes": sum(h["bytes"] for h in hosts.values()),
+                "parse_s": round(sum(t["total_s"] for t in timings.values()), 4),
+            },
+            "hosts": hosts,
+            "stages": stages,
+            "parse": timings,
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        totals = report["totals"]
+        parts = [f"{totals['requests']} istek ({totals['failures']} hatalı, {totals['retries']} tekrar), "
+                 f"{totals['bytes'] / 1024:.1f} KB, ayrıştırma {totals['parse_s']:.1f} sn"]
+        for host, s in report["hosts"].items():
+            latency = s["latency_s"]
+            parts.append(f"{host}: {s['requests']} istek, p50 {latency['p50']:.2f} sn, "
+                         f"p95 {latency['p95']:.2f} sn, p99 {latency['p99']:.2f} sn")
+        return "; ".join(parts)
+
+
+METRICS = Metrics()
+
+
+# ============================
+# requests oturumları
+# ============================
+def _count_retries(response: Any) -> int:
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    return len(getattr(retries, "history", ()) or ())
+
+
+def instrument_session(session: Any, metrics: Optional[Metrics] = None) -> None:
+    """
+    Oturumun adaptörlerini sarar; her yanıt süresi (gövde dahil), durum kodu, bayt ve
+    urllib3 tekrar sayısıyla kaydedilir. Birden çok kez çağrılması güvenlidir.
+    """
+    metrics = metrics or METRICS
+    for adapter in set(session.adapters.values()):
+        if getattr(adapter, "_metrics", None) is not None:
+            adapter._metrics = metrics
+            continue
+        send = adapter.send
+
+        def measured_send(request: Any, *args: Any, _send: Any = send, _adapter: Any = adapter, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                response = _send(request, *args, **kwargs)
+                if kwargs.get("stream"):
+                    # Gövde çağıran tarafından (çoğu zaman kısmen) okunur; başlıktaki boyut kullanılır.
+                    nbytes = int(response.headers.get("Content-Length") or 0)
+                else:
+                    nbytes = len(response.content)
+            except Exception:
+                _adapter._metrics.record_request(request.url, None, time.perf_counter() - started, error=True)
+                raise
+            _adapter._metrics.record_request(request.url, response.status_code, time.perf_counter() - started,
+                                             nbytes, _count_retries(response))
+            return response
+
+        adapter._metrics = metrics
+        adapter.send = measured_send
+
+
+# ============================
+# Rapor dosyaları
+# ============================
+def write_report(name: str, metrics: Optional[Metrics] = None,
+                 directory: Union[str, Path, None] = None, extra: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Raporu `<directory>/<name>.json` dosyasına yazar ve özetini geçmiş dosyasına
+    (son `HISTORY_LIMIT` çalışma) ekler. Yazılan rapor yolunu döndürür.
+    """
+    metrics = metrics or METRICS
+    directory = Path(directory or DEFAULT_REPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    report = dict(metrics.report(), name=name, **(extra or {}))
+    path = directory / f"{name}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    append_history(name, report, directory)
+    log.info("Ölçüm raporu yazıldı: %s", path)
+    return path
+
+
+def append_history(name: str, report: Dict[str, Any], directory: Union[str, Path, None] = None) -> None:
+    """`Metrics.report` çıktısının özetini geçmiş dosyasına ekler (son `HISTORY_LIMIT` çalışma)."""
+    directory = Path(directory or DEFAULT_REPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    history_path = directory / HISTORY_NAME
+    entry = {"name": name, "started_at": report["started_at"], "duration_s": report["duration_s"],
+             **report["totals"],
+             "p95_s": {host: s["latency_s"]["p95"] for host, s in report["hosts"].items()}}
+    try:
+        lines = history_path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        lines = []
+    lines = lines[-(HISTORY_LIMIT - 1):] + [json.dumps(entry, ensure_ascii=False)]
+    # Yarıda kalan bir çalışma geçmişi kesik bırakmasın diye geçici dosya üzerinden yazılır.
+    tmp = history_path.with_name(HISTORY_NAME + ".tmp")
+    tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp, history_path)
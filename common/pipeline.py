@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Thread tabanlı, sınırlı kuyruklu üretici/tüketici hattı.
+
+Her aşama kendi işçi sayısıyla çalışır ve bir sonraki aşamaya sınırlı bir kuyrukla
+bağlanır; böylece örneğin liste sayfaları, dizi sayfaları ve bölüm çözümlemesi
+aynı anda ilerler ama hiçbir aşama bellekte sınırsız iş biriktirmez. Aşama
+fonksiyonu `func(item, emit)` imzasındadır ve ürettiği her işi `emit` ile bir
+sonraki aşamaya (son aşamada sonuç listesine) iletir. Bir işte çıkan hata
+loglanır ve yalnızca o iş düşer. Her iş `common.metrics` ile "<hat adı>/<aşama>"
+aşamasında ölçülür.
+
+    pipeline = Pipeline()
+    pipeline.stage("liste", fetch_listing, workers=4)
+    pipeline.stage("dizi", fetch_series, workers=4)
+    pipeline.stage("bölüm", resolve_episode, workers=8)
+    results = pipeline.run(range(1, 21))
+"""
+
+import logging
+import queue
+import threading
+from collections import Counter
+from typing import Any, Callable, Iterable, List
+
+from common.metrics import METRICS
+
+DEFAULT_QUEUE_SIZE = 64
+
+log = logging.getLogger("pipeline")
+
+_DONE = object()
+
+StageFunc = Callable[[Any, Callable[[Any], None]], None]
+
+
+class _Stage:
+    def __init__(self, name: str, func: StageFunc, workers: int, queue_size: int) -> None:
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+
+
+class Pipeline:
+    """Aşamaları sırayla ekleyip `run` ile çalıştırılan hat; `stats` aşama başına işlenen/hatalı sayısını tutar."""
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self._stages: List[_Stage] = []
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, func: StageFunc, workers: int = 1,
+              queue_size: int = DEFAULT_QUEUE_SIZE) -> "Pipeline":
+        self._stages.append(_Stage(name, func, workers, queue_size))
+        return self
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _worker(self, index: int, emit: Callable[[Any], None]) -> None:
+        stage = self._stages[index]
+        metrics_stage = f"{self.name}/{stage.name}" if self.name else stage.name
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                return
+            try:
+                with METRICS.stage(metrics_stage):
+                    stage.func(item, emit)
+                self._count(f"{stage.name}:tamam")
+            except Exception as e:
+                self._count(f"{stage.name}:hata")
+                log.warning("'%s' aşamasında hata (%r): %s", stage.name, item, e)
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Girdileri ilk aşamaya verir, tüm aşamalar bitince son aşamanın ürettiklerini döndürür."""
+        if not self._stages:
+            return list(items)
+        results: List[Any] = []
+        results_lock = threading.Lock()
+
+        def collect(item: Any) -> None:
+            with results_lock:
+                results.append(item)
+
+        threads: List[List[threading.Thread]] = []
+        for index, stage in enumerate(self._stages):
+            emit = self._stages[index + 1].queue.put if index + 1 < len(self._stages) else collect
+            stage_threads = [
+                threading.Thread(target=self._worker, args=(index, emit), name=f"{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            ]
+            for thread in stage_threads:
+                thread.start()
+            threads.append(stage_threads)
+
+        first = self._stages[0]
+        for item in items:
+            first.queue.put(item)
+        # Bir aşamanın tüm işçileri bitince bir sonraki aşamanın her işçisine bitiş işareti gönderilir.
+        for index, stage in enumerate(self._stages):
+            for _ in range(stage.workers):
+                stage.queue.put(_DONE)
+            for thread in threads[index]:
+                thread.join()
+        return results
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(
+                f"{stage.name}: {self.stats[stage.name + ':tamam']} iş"
+                + (f" ({self.stats[stage.name + ':hata']} hata)" if self.stats[stage.name + ':hata'] else "")
+                for stage in self._stages
+            )
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Sunucu (host) başına uyarlanabilir hız sınırlayıcı.
+
+Her host için hedef bir saniyedeki istek sayısı tutulur ve istekler bu hıza göre
+aralıklandırılır (`burst` kadar isteğe anlık izin verilir). 429/503 yanıtlarında
+hız yarıya iner (çarpımsal azaltma) ve `Retry-After` süresi boyunca o hosta istek
+gönderilmez; art arda `success_window` başarılı yanıttan sonra hız `increase`
+kadar artar (toplamsal artırma, AIMD). Aynı zamanlayıcı thread'lerden `wait`,
+asyncio kodundan `wait_async` ile kullanılır.
+
+requests oturumları `throttle_session` ile bağlanır; böylece oturumdan geçen her
+istek (yönlendirmeler ve koşullu GET'ler dahil) beklenir ve yanıtı bildirilir.
+urllib3 Retry'ın kendi içinde tekrar denediği 429/503 yanıtları da yanıtın tekrar
+geçmişinden okunur. Hızdan bağımsız olarak aynı anda açık istek sayısı
+`HostLimiter` ile host başına sınırlanır.
+"""
+
+import asyncio
+import email.utils
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """`Retry-After` başlığını (saniye ya da HTTP tarihi) beklenecek saniyeye çevirir."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class _HostState:
+    __slots__ = ("rate", "next_time", "successes", "requests", "throttled")
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.next_time = 0.0
+        self.successes = 0
+        self.requests = 0
+        self.throttled = 0
+
+
+class RateScheduler:
+    """Thread-safe, host başına AIMD hız sınırlayıcı."""
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None,
+                 max_rate: Optional[float] = None, increase: Optional[float] = None,
+                 decrease: float = 0.5, success_window: int = 20, max_retry_after: float = 300.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate sıfırdan büyük olmalı")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate if min_rate is not None else rate / 20
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase = increase if increase is not None else rate / 10
+        self.decrease = decrease
+        self.success_window = success_window
+        self.max_retry_after = max_retry_after
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.rate)
+        return state
+
+    def reserve(self, url: str) -> float:
+        """`url`nin hostu için bir sonraki istek zamanını ayırır ve beklenecek süreyi döndürür."""
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            interval = 1.0 / state.rate
+            # Boşta geçen süre en fazla `burst` isteklik kredi birikmesine izin verir.
+            slot = max(now - (self.burst - 1) * interval, state.next_time)
+            state.next_time = slot + interval
+            state.requests += 1
+        return max(0.0, slot - now)
+
+    def wait(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def record(self, url: str, status: int, retry_after: Optional[float] = None) -> None:
+        """Yanıt durumunu bildirir; 429/503'te hızı düşürür, art arda başarılarda artırır."""
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._state(host)
+            if status in THROTTLE_STATUSES:
+                state.throttled += 1
+                state.successes = 0
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                pause = min(retry_after, self.max_retry_after) if retry_after is not None else 1.0 / state.rate
+                state.next_time = max(state.next_time, time.monotonic() + pause)
+            elif status < 500:
+                state.successes += 1
+                if state.successes >= self.success_window:
+                    state.successes = 0
+                    state.rate = min(self.max_rate, state.rate + self.increase)
+
+    def record_headers(self, url: str, status: int, headers: Mapping[str, str]) -> None:
+        self.record(url, status, parse_retry_after(headers.get("Retry-After")))
+
+    def record_response(self, response: Any) -> None:
+        """
+        requests yanıtını bildirir. urllib3 Retry'ın yanıt dönmeden önce kendi içinde
+        tekrar denediği 429/503'ler de tekrar geçmişinden okunarak sayılır.
+        """
+        url = response.url
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        for attempt in getattr(retries, "history", ()) or ():
+            if attempt.status in THROTTLE_STATUSES:
+                self.record(url, attempt.status)
+        self.record_headers(url, response.status_code, response.headers)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                host: {"requests": state.requests, "throttled": state.throttled, "rate": round(state.rate, 2)}
+                for host, state in self._hosts.items()
+            }
+
+    def summary(self) -> str:
+        return "; ".join(
+            f"{host}: {s['requests']} istek, {s['throttled']} kez yavaşlatıldı, son hız {s['rate']}/sn"
+            for host, s in sorted(self.stats().items())
+        ) or "istek yok"
+
+
+class HostLimiter:
+    """Sunucu (host) başına eşzamanlı istek sayısını sınırlar."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            sem = self._slots.get(host)
+            if sem is None:
+                sem = self._slots[host] = threading.BoundedSemaphore(self.limit)
+            return sem
+
+
+def throttle_session(session: Any, scheduler: RateScheduler) -> None:
+    """
+    requests (ya da cloudscraper) oturumunun `send` metodunu zamanlayıcıdan geçirir.
+    Tekrar çağrılırsa önceki zamanlayıcının yerini alır.
+    """
+    send = partial(type(session).send, session)
+
+    def throttled_send(request: Any, **kwargs: Any) -> Any:
+        scheduler.wait(request.url)
+        response = send(request, **kwargs)
+        scheduler.record_response(response)
+        return response
+
+    session.send = throttled_send
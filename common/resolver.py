@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Yayın linklerinin istek anında (tembel) çözümü.
+
+Tembel modda (`--lazy URL`) liste üretimi yalnızca bölüm listelerini tarar; her
+bölümün yayın linki yerine yerel çözümleyicinin adresi yazılır:
+
+    http://127.0.0.1:8080/resolve/atv?u=https%3A%2F%2Fwww.atv.com.tr%2F...%2Fbolum-1
+
+Oynatıcı bu adresi açtığında `LazyResolver` kaynağın mevcut çözüm kodunu
+(`Source.resolve_stream`) çağırır ve gerçek linke yönlendirilir (bkz.
+playlist_server.py --resolver). Çözülen linkler bellekte LRU + TTL ile tutulur;
+aynı bölüm için eşzamanlı gelen istekler tek bir çözümü bekler. Başarısız
+çözümler kısa bir süre (`failure_ttl`) hatırlanır ki oynatıcının tekrar
+denemeleri kaynağa yük bindirmesin.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import quote
+
+RESOLVE_PATH = "/resolve/"
+DEFAULT_TTL = 6 * 3600.0
+DEFAULT_FAILURE_TTL = 60.0
+DEFAULT_CACHE_SIZE = 4096
+# Eşzamanlı istekler çözümü en fazla bu kadar bekler.
+RESOLVE_TIMEOUT = 90.0
+
+Resolve = Callable[[str], Optional[str]]
+
+
+def lazy_url(base: str, source: str, episode_url: str) -> str:
+    """Bölüm için tembel çözümleyici adresi."""
+    return f"{base.rstrip('/')}{RESOLVE_PATH}{source}?u={quote(episode_url, safe='')}"
+
+
+class LazyResolver:
+    """
+    Thread-safe, LRU + TTL önbellekli ve istek birleştirmeli yayın linki çözümleyici.
+
+        resolver = LazyResolver()
+        resolver.register("atv", atv.BASE_URL, lambda url: source.resolve_stream({"name": url, "url": url}))
+        stream_url = resolver.resolve("atv", episode_url)
+
+    Kaynağın bölüm adresleri `prefix` ile başlamalıdır; çözümleyici başka adreslere
+    istek göndermez (ValueError). Bilinmeyen kaynakta KeyError yükseltilir.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, cache_size: int = DEFAULT_CACHE_SIZE,
+                 failure_ttl: float = DEFAULT_FAILURE_TTL) -> None:
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.failure_ttl = failure_ttl
+        self.stats: Counter = Counter()
+        self._sources: Dict[str, Tuple[str, Resolve]] = {}
+        # (kaynak, bölüm adresi) -> (son geçerlilik anı, yayın linki ya da None)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Optional[str]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def register(self, source: str, prefix: str, resolve: Resolve) -> None:
+        self._sources[source] = (prefix, resolve)
+
+    def sources(self) -> Tuple[str, ...]:
+        return tuple(sorted(self._sources))
+
+    def resolve(self, source: str, episode_url: str) -> Optional[str]:
+        """Bölümün yayın linki; çözülemezse None."""
+        prefix, resolve = self._sources[source]
+        if not episode_url.startswith(prefix):
+            raise ValueError(f"{source} için geçersiz bölüm adresi: {episode_url}")
+        key = (source, episode_url)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.stats["önbellek"] += 1
+                return cached[1]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.stats["çözüm"] += 1
+            else:
+                self.stats["birleştirilen"] += 1
+        if not owner:
+            return future.result(timeout=RESOLVE_TIMEOUT)
+
+        stream_url = None
+        try:
+            stream_url = resolve(episode_url)
+        finally:
+            with self._lock:
+                if not stream_url:
+                    self.stats["başarısız"] += 1
+                lifetime = self.ttl if stream_url else self.failure_ttl
+                self._cache[key] = (time.monotonic() + lifetime, stream_url or None)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                del self._inflight[key]
+            # Çözüm hata verdiyse bekleyenler None alır; hata çağırana yükselir.
+            future.set_result(stream_url or None)
+        return stream_url or None
+
+    def summary(self) -> str:
+        with self._lock:
+            size = len(self._cache)
+        return ", ".join(f"{name}: {count}" for name, count in sorted(self.stats.items())) + f", kayıt: {size}"
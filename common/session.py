@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Ortak HTTP oturumu: bağlantı havuzu ve tekrar deneme politikası.
+
+Tüm kaynaklar aynı politikayı kullanır: 429/5xx yanıtlarında ve bağlantı
+hatalarında üstel bekleyerek `MAX_RETRIES` kez tekrar denenir (urllib3 Retry,
+Retry-After başlığına uyar). Havuz boyutu `resize_pool` ile işçi sayısına göre
+büyütülür; cloudscraper gibi kendi adaptörünü takan oturumlarda adaptör ve TLS
+ayarları korunur. Host başına hız sınırı `common.ratelimit.throttle_session` ile
+bağlanır.
+
+Oturumdan geçen istekler `common.metrics` ile ölçülür.
+"""
+
+from typing import Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from common.metrics import instrument_session
+
+MAX_RETRIES = 5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_POOL_SIZE = 10
+
+
+def make_retry(max_retries: int = MAX_RETRIES) -> Retry:
+    return Retry(total=max_retries, backoff_factor=1, status_forcelist=list(RETRY_STATUSES))
+
+
+def make_session(headers: Optional[Mapping[str, str]] = None, max_retries: int = MAX_RETRIES,
+                 pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Tekrar deneme politikası ve verilen başlıklarla yeni bir oturum oluşturur."""
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=make_retry(max_retries), pool_maxsize=max(pool_size, DEFAULT_POOL_SIZE))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    instrument_session(session)
+    return session
+
+
+def resize_pool(session: requests.Session, pool_size: int) -> None:
+    """Oturumdaki adaptörlerin bağlantı havuzlarını en az `pool_size` bağlantıya büyütür."""
+    for adapter in set(session.adapters.values()):
+        if adapter._pool_maxsize < pool_size:
+            adapter.init_poolmanager(adapter._pool_connections, pool_size, block=adapter._pool_block)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Kaynak (source) arayüzü.
+
+Her site üç adımla tanımlanır: içerik listesi (diziler, programlar, sezonlar) ->
+her içeriğin bölüm listesi -> her bölümün yayın linki. Eşzamanlılık, önbellek,
+ara kayıt, tekrar deneme ve M3U çıktısı `common.engine.Engine` tarafından
+sağlanır; kaynak yalnızca siteye özgü istek ve ayrıştırma kodunu içerir.
+
+İçerik ve bölümler sözlüktür. İçeriklerde `name`, `url` ve isteğe bağlı `img`;
+bölümlerde `name` ve `url` bulunur. Yayın linki bölüm listesinden hemen
+okunabiliyorsa bölümün `stream_url` alanına yazılır; varsayılan `resolve_stream`
+bunu döndürür.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from common.m3u import DEFAULT_HEADER, Attrs
+
+Entry = Tuple[str, str, Attrs]
+
+
+class Source:
+    """Kaynakların temel sınıfı; alt sınıflar `list_content` ve `list_episodes`'u uygular."""
+
+    # Log, ara kayıt ve yayın linki önbelleğinde kullanılan kısa ad.
+    name = ""
+    # Ana M3U dosyası, grup dosyaları ve manifest; `manifest_name` None ise manifest yazılmaz.
+    master_path = ""
+    header = DEFAULT_HEADER
+    manifest_name: Optional[str] = "m3u_manifest.json"
+    skip_empty_groups = True
+    # Yayın linkleri için kalıcı önbellek süreleri (gün); None ise motor önbellek kullanmaz.
+    stream_ttl_days: Optional[float] = None
+    stream_revalidate_days: Optional[float] = None
+    # Kaynağın kullandığı HTTP oturumu; motor havuzunu işçi sayısına göre büyütür ve hız sınırını bağlar.
+    session: Optional[requests.Session] = None
+
+    def list_content(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_episodes(self, content: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        İçeriğin bölümlerini sırayla döndürür. Bölüm sayfasından okunan ek bilgiler
+        (ör. poster) `content` üzerine yazılabilir; ara kayıtla birlikte saklanır.
+        """
+        raise NotImplementedError
+
+    def resolve_stream(self, episode: Dict[str, Any]) -> Optional[str]:
+        """Bölümün yayın linkini çözer; çözülemezse None."""
+        return episode.get("stream_url")
+
+    def content_key(self, content: Dict[str, Any]) -> str:
+        return content["url"]
+
+    def episode_key(self, episode: Dict[str, Any]) -> str:
+        return episode["url"]
+
+    def group_path(self, content: Dict[str, Any]) -> Optional[str]:
+        """İçeriğin ayrı M3U dosyası; None ise girdiler yalnızca ana listeye yazılır."""
+        return None
+
+    def entries(self, content: Dict[str, Any]) -> Iterator[Entry]:
+        """Bir içeriğin yayın linki olan bölümlerini (başlık, link, nitelikler) olarak üretir."""
+        item_name = content.get("name", "Bilinmeyen").strip()
+        attrs = [("tvg-logo", content.get("img", "").strip()), ("group-title", item_name)]
+        for ep in content.get("episodes") or []:
+            stream = ep.get("stream_url")
+            if stream:
+                yield ep.get("name", "Bölüm"), stream, attrs
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Bölüm adresi -> çözülmüş yayın linki (veya video ID) eşlemesini SQLite üzerinde
+saklayan kalıcı önbellek.
+
+Her kaynak (ör. "atv", "ddizi") için ayrı bir politika tanımlanır:
+- ttl_days: Bu süreden eski kayıtlar hiç kullanılmaz (kesin son kullanma).
+- revalidate_days: Bu süreden eski kayıtlar yeniden çözülür; çözüm başarısız
+  olursa eski değer kullanılmaya devam eder.
+Toplam kayıt sayısı `max_entries` ile sınırlıdır; fazlası en uzun süredir
+kullanılmayanlardan (LRU) başlanarak silinir.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from common import CACHE_DIR
+
+DEFAULT_CACHE_PATH = CACHE_DIR / "streams.sqlite"
+DEFAULT_MAX_ENTRIES = 200_000
+DAY = 86400.0
+
+log = logging.getLogger("stream-cache")
+
+
+class StreamCache:
+    """Thread-safe, kaynak bazlı TTL'li ve LRU sınırlı yayın linki önbelleği."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._policies: Dict[str, Tuple[float, float]] = {}
+        self._stats: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS streams ("
+            " source TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " resolved_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (source, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS streams_accessed ON streams (accessed_at)")
+        self._conn.commit()
+
+    def set_policy(self, source: str, ttl_days: float, revalidate_days: Optional[float] = None) -> None:
+        """`source` için kesin TTL'i ve yeniden doğrulama eşiğini (gün) ayarlar."""
+        revalidate = ttl_days if revalidate_days is None else min(revalidate_days, ttl_days)
+        self._policies[source] = (ttl_days * DAY, revalidate * DAY)
+
+    def _count(self, source: str, name: str) -> None:
+        # Çağıran kilidi tutuyor olmalı.
+        self._stats.setdefault(source, Counter())[name] += 1
+
+    def lookup(self, source: str, key: str) -> Tuple[Optional[str], bool]:
+        """
+        (değer, taze_mi) döndürür. Kayıt yoksa ya da TTL'i dolmuşsa değer None'dır;
+        yeniden doğrulama eşiği aşılmışsa değer döner ama taze_mi False olur.
+        """
+        ttl, revalidate = self._policies.get(source, (float("inf"), float("inf")))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, resolved_at FROM streams WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                self._count(source, "miss")
+                return None, False
+            self._conn.execute(
+                "UPDATE streams SET accessed_at = ? WHERE source = ? AND key = ?", (now, source, key)
+            )
+            self._maybe_commit()
+            fresh = now - row[1] <= revalidate
+            self._count(source, "hit" if fresh else "stale")
+        return row[0], fresh
+
+    def resolved_at(self, source: str, key: str) -> Optional[float]:
+        """Kaydın çözüldüğü an (epoch saniye); kayıt yoksa None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT resolved_at FROM streams WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, source: str, key: str) -> Optional[str]:
+        """Yalnızca taze bir kayıt varsa değerini döndürür."""
+        value, fresh = self.lookup(source, key)
+        return value if fresh else None
+
+    def put(self, source: str, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO streams (source, key, value, resolved_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (source, key, value, now, now),
+            )
+            self._count(source, "stored")
+            self._maybe_commit()
+
+    def settle(self, source: str, key: str, value: Optional[str], stale: Optional[str]) -> Optional[str]:
+        """Yeni çözülen değeri kaydeder; çözüm başarısızsa eski (stale) değere geri düşer."""
+        if value:
+            self.put(source, key, value)
+            return value
+        if stale:
+            with self._lock:
+                self._count(source, "stale_used")
+        return stale
+
+    def resolve(self, source: str, key: str, resolver: Callable[[], Optional[str]]) -> Optional[str]:
+        """Taze kayıt varsa onu, yoksa `resolver()` sonucunu döndürür ve önbelleğe yazar."""
+        cached, fresh = self.lookup(source, key)
+        if fresh:
+            return cached
+        return self.settle(source, key, resolver(), cached)
+
+    def _maybe_commit(self) -> None:
+        self._pending_writes += 1
+        if self._pending_writes >= 100:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def prune(self) -> int:
+        """Kayıt sayısını `max_entries` altına indirir, silinen kayıt sayısını döndürür."""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM streams").fetchone()[0]
+            excess = total - self.max_entries
+            if excess <= 0:
+                return 0
+            self._conn.execute(
+                "DELETE FROM streams WHERE rowid IN (SELECT rowid FROM streams ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self._conn.commit()
+            return excess
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {source: dict(counter) for source, counter in self._stats.items()}
+
+    def log_stats(self, logger: Optional[logging.Logger] = None) -> None:
+        logger = logger or log
+        for source, counter in sorted(self._stats.items()):
+            logger.info(
+                "Önbellek [%s]: %d isabet, %d ıska, %d yeniden doğrulama, %d eski değer kullanıldı, %d kayıt yazıldı",
+                source, counter["hit"], counter["miss"], counter["stale"], counter["stale_used"], counter["stored"],
+            )
+
+    def close(self) -> None:
+        evicted = self.prune()
+        if evicted:
+            log.info("Önbellek boyut sınırı: %d eski kayıt silindi.", evicted)
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -1,45 +1,221 @@
-import requests
-import os
+"""
+ATV dizileri için stream-extractor vekili üzerinden bölüm listesi üretici.
+
+Her dizi (`SERIES`) için son yayınlanan bölüm, bilinen son bölümden başlayarak
+önce dörtnala (üstel: +1, +2, +4, ...) sonra aralık içinde ikili aramayla
+bulunur; tüm dizilerin yoklamaları aynı turda eşzamanlı gönderilir. Yeni
+bölüm yoksa dizi başına tek istek yapılır, n yeni bölüm O(log n) istekte
+bulunur. Dizilerin bilinen son bölümleri `series_state.json` dosyasında tutulur.
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from common.m3u import Attrs, M3UWriter
+from common.m3u_index import PlaylistIndex
+from common.manifest import write_if_changed
+from common.metrics import METRICS, write_report
+from common.session import make_session
 
-BASE_URL = "https://www.atv.com.tr/karadayi/"
 PROXY_PREFIX = "https://stream-extractor.koprulu.workers.dev/?url="
 EXT = "&ext=mp4"
-COVER_ART = "https://iaatv.tmgrup.com.tr/3b3f5e/500/268/0/0/500/268?u=https://iatv.tmgrup.com.tr/2021/06/24/500x268/1624539164040.jpg"
-CATEGORY = "KaraDayı"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 2
+# Her turda dizi başına gönderilen en fazla yoklama ve toplam eşzamanlı istek sayısı.
+PROBES_PER_ROUND = 4
+MAX_WORKERS = 16
 
-def get_last_episode():
-    try:
-        with open("last_episode.txt", "r") as f:
-            return int(f.read().strip())
-    except:
-        return 194
+# Dizi anahtarı -> bilinen son bölüm.
+STATE_PATH = "series_state.json"
+
+# page: bölüm sayfası ({ep} bölüm numarası); tvg_id / title: girdi adları; output: M3U dosyası.
+SERIES = [
+    {
+        "key": "karadayi",
+        "page": "https://www.atv.com.tr/karadayi/{ep}-bolum/izle",
+        "output": "karadayı.m3u",
+        "title": "KaraDayı Bölüm-{ep}",
+        "tvg_id": "karadayı{ep}",
+        "group": "KaraDayı",
+        "logo": "https://iaatv.tmgrup.com.tr/3b3f5e/500/268/0/0/500/268?u=https://iatv.tmgrup.com.tr/2021/06/24/500x268/1624539164040.jpg",
+    },
+    {
+        "key": "kara-dayi",
+        "page": "https://www.atv.com.tr/karadayi{ep}-bolum/izle",
+        "output": "kara_dayı.m3u",
+        "title": "Kara Dayı Bölüm-{ep}",
+        "tvg_id": "karadayı{ep}",
+        "group": "Kara Dayı",
+        "logo": "https://iaatv.tmgrup.com.tr/3b3f5e/500/268/0/0/500/268?u=https://iatv.tmgrup.com.tr/2021/06/24/500x268/1624539164040.jpg",
+    },
+    {
+        "key": "kurulus-osman",
+        "page": "https://www.atv.com.tr/kurulus-osman/{ep}-bolum/izle",
+        "output": "kurulus-osman.m3u",
+        "title": "Kuruluş Osman Bölüm-{ep}",
+        "tvg_id": "KurulusOsman{ep}",
+        "group": "Kuruluş Osman",
+        "logo": "https://iaatv.tmgrup.com.tr/71709e/500/268/0/0/500/268?u=https://iatv.tmgrup.com.tr/2024/09/24/500x268/1727165994263.jpg",
+    },
+]
+
+SESSION = make_session({"User-Agent": USER_AGENT}, max_retries=MAX_RETRIES, pool_size=MAX_WORKERS)
+
+
+# ============================
+# Son bölümü arama
+# ============================
+class EpisodeSearch:
+    """
+    Bir dizinin son bölümünü arayan durum makinesi. Bölümlerin 1..N aralığında
+    kesintisiz yayınlandığı varsayılır; `probes` sıradaki turda yoklanacak
+    bölümleri verir, `update` sonuçları işler. `last` var olduğu bilinen en büyük
+    bölümdür ve hiçbir zaman başlangıç değerinin altına inmez.
+    """
+
+    def __init__(self, known: int, width: int = PROBES_PER_ROUND) -> None:
+        self.last = known
+        self.missing: Optional[int] = None  # olmadığı bilinen en küçük bölüm
+        self.width = max(1, width)
+        self._gallop = 0  # dörtnala turu; ilk tur yalnızca last+1'i yoklar
 
-def check_episode(episode):
+    @property
+    def done(self) -> bool:
+        return self.missing is not None and self.missing <= self.last + 1
+
+    def probes(self) -> List[int]:
+        if self.done:
+            return []
+        if self.missing is None:
+            if self._gallop == 0:
+                return [self.last + 1]
+            start = 1 + (self._gallop - 1) * self.width
+            return [self.last + 2 ** exponent for exponent in range(start, start + self.width)]
+        # İkili aramanın eşzamanlı hali: aralık her turda width+1 parçaya bölünür.
+        low, high = self.last, self.missing
+        points = {low + (high - low) * k // (self.width + 1) for k in range(1, self.width + 1)}
+        return sorted(p for p in points if low < p < high)
+
+    def update(self, results: Dict[int, bool]) -> None:
+        found = [ep for ep, exists in results.items() if exists]
+        if found:
+            self.last = max(self.last, max(found))
+        absent = [ep for ep, exists in results.items() if not exists and ep > self.last]
+        if absent:
+            self.missing = min(absent + ([self.missing] if self.missing is not None else []))
+        if self.missing is None:
+            self._gallop += 1
+
+
+def probe_url(series: Dict[str, str], episode: int) -> str:
+    return PROXY_PREFIX + series["page"].format(ep=episode)
+
+
+def episode_exists(url: str) -> bool:
     try:
-        url = f"{PROXY_PREFIX}{BASE_URL}{episode}-bolum/izle"
-        headers = {"User-Agent": USER_AGENT}
-        return requests.head(url, headers=headers, timeout=5).status_code == 200
-    except:
+        return SESSION.head(url, timeout=REQUEST_TIMEOUT).status_code == 200
+    except Exception:
         return False
 
-def generate_m3u(end_episode):
-    m3u = "#EXTM3U\n"
 
-    for ep in range(1, end_episode + 1):
-        stream_url = f"{PROXY_PREFIX}{BASE_URL}{ep}-bolum/izle{EXT}"
-        m3u += f"""#EXTINF:-1 tvg-id="karadayı{ep}" tvg-name="Bölüm-{ep}" tvg-logo="{COVER_ART}" group-title="{CATEGORY}",KaraDayı Bölüm-{ep}
-{stream_url}\n"""
+def discover(series_list: List[Dict[str, str]], known: Dict[str, int],
+             exists: Optional[Callable[[str], bool]] = None, workers: int = MAX_WORKERS) -> Dict[str, Dict[str, int]]:
+    """
+    Tüm dizilerin son bölümlerini birlikte arar; her turda bütün dizilerin yoklamaları
+    eşzamanlı gönderilir. Dizi anahtarı -> {"last": son bölüm, "probes": istek sayısı} döner.
+    """
+    exists = exists or episode_exists
+    searches = {series["key"]: EpisodeSearch(known.get(series["key"], 0)) for series in series_list}
+    by_key = {series["key"]: series for series in series_list}
+    probes = {key: 0 for key in searches}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while True:
+            round_probes = [(key, ep) for key, search in searches.items() for ep in search.probes()]
+            if not round_probes:
+                break
+            answers = pool.map(lambda item: exists(probe_url(by_key[item[0]], item[1])), round_probes)
+            results: Dict[str, Dict[int, bool]] = {key: {} for key in searches}
+            for (key, ep), answer in zip(round_probes, answers):
+                results[key][ep] = answer
+                probes[key] += 1
+            for key, search in searches.items():
+                if results[key]:
+                    search.update(results[key])
+    return {key: {"last": search.last, "probes": probes[key]} for key, search in searches.items()}
+
+
+# ============================
+# Durum ve çıktı
+# ============================
+def load_state(path: str = STATE_PATH) -> Dict[str, int]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: Dict[str, int], path: str = STATE_PATH) -> None:
+    write_if_changed(path, json.dumps(state, ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+
+
+def count_entries(path: str) -> int:
+    try:
+        return len(PlaylistIndex.load(path))
+    except OSError:
+        return 0
+
+
+def known_episodes(series_list: List[Dict[str, str]], state: Dict[str, int]) -> Dict[str, int]:
+    """Aramanın başlangıcı: durum dosyasındaki değer, yoksa mevcut listedeki girdi sayısı."""
+    return {s["key"]: state[s["key"]] if s["key"] in state else count_entries(s["output"]) for s in series_list}
+
+
+def entry_attrs(series: Dict[str, str], ep: int) -> Attrs:
+    return [("tvg-id", series["tvg_id"].format(ep=ep)), ("tvg-name", f"Bölüm-{ep}"),
+            ("tvg-logo", series["logo"]), ("group-title", series["group"])]
+
+
+def generate_m3u(series: Dict[str, str], end_episode: int) -> bool:
+    """Dizinin 1..end_episode bölümlerini yazar; dosya değiştiyse True."""
+    with M3UWriter(series["output"]) as writer:
+        for ep in range(1, end_episode + 1):
+            writer.write_entry(series["title"].format(ep=ep), probe_url(series, ep) + EXT, entry_attrs(series, ep))
+    return writer.changed
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ATV dizileri için bölüm keşfi ve M3U üretici")
+    parser.add_argument("--series", nargs="+", choices=[s["key"] for s in SERIES], metavar="DİZİ",
+                        help="Yalnızca bu diziler (varsayılan: hepsi)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="Eşzamanlı yoklama sayısı (varsayılan: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> bool:
+    args = parse_args(argv)
+    series_list = [s for s in SERIES if not args.series or s["key"] in args.series]
+    state = load_state()
+    known = known_episodes(series_list, state)
+    found = discover(series_list, known, workers=args.workers)
+    for series in series_list:
+        key, result = series["key"], found[series["key"]]
+        changed = generate_m3u(series, result["last"])
+        state[key] = result["last"]
+        new = result["last"] - known[key]
+        print(f"{series['group']}: son bölüm {result['last']} ({'+%d yeni' % new if new else 'yeni bölüm yok'}, "
+              f"{result['probes']} istek){', liste güncellendi' if changed else ''}")
+    save_state(state)
+    return True
 
-    with open("karadayı.m3u", "w", encoding="utf-8") as f:
-        f.write(m3u)
 
 if __name__ == "__main__":
-    last_ep = get_last_episode()
-    if check_episode(last_ep + 1):
-        new_ep = last_ep + 1
-        with open("last_episode.txt", "w") as f:
-            f.write(str(new_ep))
-        generate_m3u(new_ep)
-    else:
-        generate_m3u(last_ep)
\ No newline at end of file
+    try:
+        main()
+    finally:
+        print(f"Ölçümler: {METRICS.summary()}")
+        write_report("seriler")
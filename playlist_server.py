@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Üretilmiş M3U listelerini süzülmüş, sıkıştırılmış ve önbelleklenebilir olarak
+sunan küçük yerel HTTP sunucusu.
+
+Listeler açılışta bir kez `common.m3u_index.PlaylistIndex` ile belleğe yüklenir;
+dosyalar en fazla `--reload-interval` saniyede bir stat ile denetlenir ve yalnızca
+değişen (mtime/boyut) dosyalar yeniden okunur. Her liste depo köküne göre yoluyla
+sunulur ve sorgu parametreleriyle süzülür:
+
+    /                                                  liste dizini (JSON)
+    /playsport/all_leagues.m3u?season=2023-2024&team=fenerbahçe
+    /playsport/all_leagues.m3u?league=trendyol 1. lig
+    /ATV/ATV.m3u?series=kuruluş osman
+    /playsport/all_leagues.m3u?group=Süper Lig 2010/2011
+
+Üretilen her görünüm (liste + süzgeç) bir kez oluşturulup gzip/brotli halleriyle
+LRU önbellekte tutulur; yanıtlar güçlü ETag taşır ve If-None-Match eşleşince 304
+döner. Liste değişince o listeye ait görünümler geçersiz olur. Bağlantılar HTTP/1.1
+keep-alive ile açık tutulur. brotli kurulu değilse yalnızca gzip kullanılır.
+
+`--resolver` verilirse tembel modda (`atv.py/ddizi.py/run_all.py --lazy URL`)
+üretilen listelerin /resolve/<kaynak>?u=<bölüm adresi> bağlantıları da sunulur:
+yayın linki ilk oynatmada kaynağın çözüm koduyla bulunur (`common.resolver`) ve
+oynatıcı 302 ile ona yönlendirilir.
+
+Kullanım:
+    python playlist_server.py                          # 127.0.0.1:8080
+    python playlist_server.py --host 0.0.0.0 --port 8080 --reload-interval 5
+    python playlist_server.py --resolver               # + tembel yayın linki çözümleyici
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from common import REPO_ROOT, load_script
+from common.m3u_index import PlaylistIndex
+from common.resolver import DEFAULT_TTL, RESOLVE_PATH, LazyResolver
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel bir bağımlılıktır
+    brotli = None
+
+# ============================
+# 1. AYARLAR
+# ============================
+DEFAULT_PATTERNS = ("*.m3u", "playsport/**/*.m3u", "ATV/**/*.m3u", "DDIZI/**/*.m3u")
+DEFAULT_RELOAD_INTERVAL = 2.0
+VIEW_CACHE_SIZE = 512
+# Bu boyuttan küçük gövdeler sıkıştırılmaz.
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+M3U_TYPE = "audio/x-mpegurl; charset=utf-8"
+# Sorgu parametresi -> PlaylistIndex.rows argümanı; lig ve dizi grup adında aranır.
+FILTERS = {"group": "group", "season": "season", "team": "team", "league": "group_like", "series": "group_like"}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S")
+log = logging.getLogger("playlist-server")
+
+Query = Tuple[Tuple[str, str], ...]
+
+
+# ============================
+# 2. LİSTELER VE GÖRÜNÜMLER
+# ============================
+class View:
+    """Tek bir süzülmüş liste gövdesi; sıkıştırılmış halleri ilk istendiğinde üretilir."""
+
+    def __init__(self, body: bytes, entries: int) -> None:
+        self.entries = entries
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._bodies: Dict[str, bytes] = {"identity": body}
+        self._lock = threading.Lock()
+
+    def body(self, encoding: str) -> bytes:
+        with self._lock:
+            encoded = self._bodies.get(encoding)
+            if encoded is None:
+                raw = self._bodies["identity"]
+                if encoding == "br":
+                    encoded = brotli.compress(raw, quality=BROTLI_QUALITY)
+                else:
+                    encoded = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+                self._bodies[encoding] = encoded
+            return encoded
+
+    def etag_for(self, encoding: str) -> str:
+        # Güçlü ETag her gösterim (sıkıştırma) için ayrı olmalı.
+        return f'"{self.etag}"' if encoding == "identity" else f'"{self.etag}-{encoding}"'
+
+
+class PlaylistStore:
+    """Thread-safe liste deposu; dosya değişikliklerini izler ve görünümleri önbelleğe alır."""
+
+    def __init__(self, root: str, patterns: Tuple[str, ...] = DEFAULT_PATTERNS,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL, cache_size: int = VIEW_CACHE_SIZE) -> None:
+        self.root = root
+        self.patterns = patterns
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self._playlists: Dict[str, Tuple[Tuple[int, int], PlaylistIndex]] = {}
+        self._views: "OrderedDict[Tuple[str, Query], View]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self.reloads = 0
+        self.refresh(force=True)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        files: Dict[str, Tuple[int, int]] = {}
+        for pattern in self.patterns:
+            for path in glob.glob(os.path.join(self.root, pattern), recursive=True):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[os.path.relpath(path, self.root).replace(os.sep, "/")] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def refresh(self, force: bool = False) -> None:
+        """En fazla `reload_interval` saniyede bir, değişen listeleri yeniden yükler."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_interval:
+            return
+        with self._lock:
+            if not force and now - self._checked < self.reload_interval:
+                return
+            self._checked = now
+            files = self._scan()
+            changed = [name for name, version in files.items()
+                       if self._playlists.get(name, (None,))[0] != version]
+            removed = [name for name in self._playlists if name not in files]
+        loaded: Dict[str, Tuple[Tuple[int, int], PlaylistIndex]] = {}
+        for name in changed:
+            try:
+                loaded[name] = (files[name], PlaylistIndex.load(os.path.join(self.root, name)))
+            except (OSError, UnicodeDecodeError) as e:
+                log.warning("Liste okunamadı (%s): %s", name, e)
+        if not loaded and not removed:
+            return
+        with self._lock:
+            self._playlists.update(loaded)
+            for name in removed:
+                self._playlists.pop(name, None)
+            stale = set(loaded) | set(removed)
+            for key in [key for key in self._views if key[0] in stale]:
+                del self._views[key]
+            self.reloads += 1
+        if not force:
+            log.info("Listeler yenilendi: %d güncellendi, %d kaldırıldı.", len(loaded), len(removed))
+
+    def names(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return sorted((name, len(index)) for name, (_, index) in self._playlists.items())
+
+    def view(self, name: str, query: Query) -> Optional[View]:
+        """Listenin süzülmüş görünümü; liste yoksa None, bilinmeyen parametrede ValueError."""
+        self.refresh()
+        key = (name, query)
+        with self._lock:
+            cached = self._views.get(key)
+            if cached is not None:
+                self._views.move_to_end(key)
+                return cached
+            entry = self._playlists.get(name)
+        if entry is None:
+            return None
+        index = entry[1]
+        if query:
+            unknown = [param for param, _ in query if param not in FILTERS]
+            if unknown:
+                raise ValueError("bilinmeyen parametre: " + ", ".join(unknown))
+            index = index.select(**{FILTERS[param]: value for param, value in query})
+        view = View(index.to_bytes(), len(index))
+        with self._lock:
+            # Görünüm üretilirken liste yenilendiyse eski sürüm önbelleğe yazılmaz.
+            if self._playlists.get(name) is entry:
+                self._views[key] = view
+                while len(self._views) > self.cache_size:
+                    self._views.popitem(last=False)
+        return view
+
+
+# ============================
+# 3. HTTP
+# ============================
+def choose_encoding(accept: Optional[str]) -> str:
+    """Accept-Encoding başlığına göre br > gzip > identity sırasıyla seçer (q=0 reddedilir)."""
+    accepted: Dict[str, float] = {}
+    for part in (accept or "").split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def build_resolver(ttl: float = DEFAULT_TTL) -> LazyResolver:
+    """ATV ve DDIZI'nin mevcut yayın linki çözüm kodunu tembel çözümleyiciye bağlar."""
+    resolver = LazyResolver(ttl=ttl)
+    for path, source_class in (("ATV/atv.py", "ATVSource"), ("DDIZI/ddizi.py", "DdiziSource")):
+        module = load_script(path)
+        source = getattr(module, source_class)()
+        resolver.register(source.name, module.BASE_URL,
+                          lambda url, source=source: source.resolve_stream({"name": url, "url": url}))
+    return resolver
+
+
+def make_handler(store: PlaylistStore, resolver: Optional[LazyResolver] = None) -> type:
+    class PlaylistHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "PlaylistServer/1.0"
+        # Başlık ve gövde ayrı yazıldığından küçük yanıtlar Nagle + gecikmeli ACK'e takılmasın.
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args) -> None:
+            log.debug("%s - %s", self.address_string(), format % args)
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Tuple[Tuple[str, str], ...] = (),
+                  head: bool = False) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def _error(self, status: int, message: str, head: bool) -> None:
+            self._send(status, (message + "\n").encode("utf-8"), "text/plain; charset=utf-8", head=head)
+
+        def _resolve(self, source: str, query: str, head: bool) -> None:
+            episode_url = dict(parse_qsl(query)).get("u")
+            if not episode_url:
+                self._error(400, "bölüm adresi (u) eksik", head)
+                return
+            try:
+                stream_url = resolver.resolve(source, episode_url)
+            except KeyError:
+                self._error(404, "bilinmeyen kaynak", head)
+                return
+            except ValueError as e:
+                self._error(400, str(e), head)
+                return
+            except Exception as e:
+                log.warning("Yayın linki çözülemedi (%s): %s", episode_url, e)
+                stream_url = None
+            if not stream_url:
+                self._error(502, "yayın linki çözülemedi", head)
+                return
+            self._send(302, b"", "text/plain; charset=utf-8", (("Location", stream_url), ("Cache-Control", "no-store")),
+                       head=head)
+
+        def _serve(self, head: bool) -> None:
+            url = urlsplit(self.path)
+            if resolver is not None and url.path.startswith(RESOLVE_PATH):
+                self._resolve(url.path[len(RESOLVE_PATH):], url.query, head)
+                return
+            name = unquote(url.path).lstrip("/")
+            if not name:
+                body = json.dumps([{"path": "/" + path, "entries": entries} for path, entries in store.names()],
+                                  ensure_ascii=False, indent=1).encode("utf-8")
+                self._send(200, body, "application/json; charset=utf-8", head=head)
+                return
+            query = tuple(sorted({key: value for key, value in parse_qsl(url.query) if value}.items()))
+            try:
+                view = store.view(name, query)
+            except ValueError as e:
+                self._error(400, str(e), head)
+                return
+            if view is None:
+                self._error(404, "liste bulunamadı", head)
+                return
+            raw_size = len(view.body("identity"))
+            encoding = choose_encoding(self.headers.get("Accept-Encoding")) if raw_size >= MIN_COMPRESS_BYTES \
+                else "identity"
+            etag = view.etag_for(encoding)
+            headers = [("ETag", etag), ("Cache-Control", "no-cache"), ("Vary", "Accept-Encoding"),
+                       ("X-Entries", str(view.entries))]
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                for header, value in headers:
+                    self.send_header(header, value)
+                self.end_headers()
+                return
+            if encoding != "identity":
+                headers.append(("Content-Encoding", encoding))
+            self._send(200, view.body(encoding), M3U_TYPE, tuple(headers), head=head)
+
+        def do_GET(self) -> None:
+            self._serve(head=False)
+
+        def do_HEAD(self) -> None:
+            self._serve(head=True)
+
+    return PlaylistHandler
+
+
+class PlaylistServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], store: PlaylistStore,
+                 resolver: Optional[LazyResolver] = None) -> None:
+        self.store = store
+        self.resolver = resolver
+        super().__init__(address, make_handler(store, resolver))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Üretilmiş M3U listelerini süzülmüş olarak sunan HTTP sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--root", default=str(REPO_ROOT), help="Listelerin aranacağı kök klasör")
+    parser.add_argument("--pattern", dest="patterns", action="append", metavar="GLOB",
+                        help="Sunulacak listeler (köke göre, tekrarlanabilir; varsayılan: %s)" % ", ".join(DEFAULT_PATTERNS))
+    parser.add_argument("--reload-interval", type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help="Dosya değişikliği denetimi aralığı, sn (varsayılan: %(default)s)")
+    parser.add_argument("--resolver", action="store_true",
+                        help="--lazy ile üretilen listeler için /resolve/ yayın linki çözümleyicisini aç")
+    parser.add_argument("--resolve-ttl", type=float, default=DEFAULT_TTL,
+                        help="Çözülen yayın linklerinin bellekte tutulma süresi, sn (varsayılan: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    store = PlaylistStore(args.root, tuple(args.patterns or DEFAULT_PATTERNS), args.reload_interval)
+    resolver = build_resolver(args.resolve_ttl) if args.resolver else None
+    server = PlaylistServer((args.host, args.port), store, resolver)
+    log.info("%d liste yüklendi; http://%s:%d/ adresinde sunuluyor (sıkıştırma: %s).", len(store.names()),
+             args.host, server.server_port, "br, gzip" if brotli is not None else "gzip")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if resolver is not None:
+            log.info("Çözümleyici: %s", resolver.summary())
+
+
+if __name__ == "__main__":
+    main()
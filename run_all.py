@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tüm kaynakları (ATV, DDIZI, yabancidizi, beIN özetleri, ATV dizi bölümleri) tek süreçte
+eşzamanlı çalıştıran ortak giriş noktası.
+
+Her kaynak kendi thread'inde, kendi betiğinin `run` / `main` fonksiyonuyla
+çalışır; kalıcı yayın linki ve HTTP önbellekleri (`.cache/`) tek bir kez açılıp
+tüm kaynaklarca paylaşılır. Bağlantı havuzları kaynak başınadır: havuzlar host
+başına tutulduğundan ve kaynakların hostları ayrı olduğundan ortak bir oturum
+bağlantı yeniden kullanımını artırmaz. Bir kaynağın hatası diğerlerini
+durdurmaz; çalışma sonunda tüm kaynakların durumu, süresi ve değişen çıktı
+dosyaları ve `common.metrics` ölçümleri tek bir JSON raporuna yazılır.
+`--check-links` verilirse kaynaklar bittikten sonra çıktı listelerindeki linkler
+`common.liveness` ile yoklanır ve ölü girdiler etiketlenir ya da çıkarılır.
+
+Kullanım:
+    python run_all.py                              # tüm kaynaklar
+    python run_all.py --sources yabancidizi        # yalnızca seçilenler
+    python run_all.py --max-runtime 330 --report rapor.json
+    python run_all.py --check-links prune           # ölü linkleri listelerden çıkar
+    python run_all.py --lazy http://127.0.0.1:8080  # ATV/DDIZI linkleri oynatılırken çözülür
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common import CACHE_DIR, REPO_ROOT, load_script
+from common.http_cache import HTTPCache
+from common.liveness import LivenessChecker, check_playlists
+from common.manifest import write_if_changed
+from common.metrics import METRICS, append_history
+from common.stream_cache import StreamCache
+
+# ============================
+# 1. AYARLAR
+# ============================
+DEFAULT_REPORT_PATH = CACHE_DIR / "run_report.json"
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S")
+log = logging.getLogger("run-all")
+
+# Önbellekler; --no-cache ile None kalır.
+Caches = Tuple[Optional[StreamCache], Optional[HTTPCache]]
+
+
+# ============================
+# 2. KAYNAKLAR
+# ============================
+def run_atv(args: argparse.Namespace, caches: Caches) -> bool:
+    atv = load_script("ATV/atv.py")
+    stream_cache, http_cache = caches
+    return atv.run(workers=16, per_host=8, use_cache=stream_cache is not None, incremental=True, resume=True,
+                   max_runtime=args.max_runtime, stream_cache=stream_cache, http_cache=http_cache,
+                   lazy=getattr(args, "lazy", None))
+
+
+def run_ddizi(args: argparse.Namespace, caches: Caches) -> bool:
+    ddizi = load_script("DDIZI/ddizi.py")
+    stream_cache, http_cache = caches
+    return ddizi.run(use_cache=stream_cache is not None, resume=True, max_runtime=args.max_runtime,
+                     stream_cache=stream_cache, http_cache=http_cache, lazy=getattr(args, "lazy", None))
+
+
+def run_yabancidizi(args: argparse.Namespace, caches: Caches) -> bool:
+    import yabancidizi_generator
+    stream_cache, http_cache = caches
+    return yabancidizi_generator.main([], stream_cache=stream_cache, http_cache=http_cache)
+
+
+def run_beinsports(args: argparse.Namespace, caches: Caches) -> bool:
+    import beinsportsozet
+    return beinsportsozet.main()
+
+
+def run_seriler(args: argparse.Namespace, caches: Caches) -> bool:
+    import generate_m3u
+    return generate_m3u.main([])
+
+
+@dataclass
+class Job:
+    name: str
+    runner: Callable[[argparse.Namespace, Caches], bool]
+    # Kaynağın yazdığı dosyalar (depo köküne göre glob desenleri); değişenler rapora yazılır.
+    outputs: Tuple[str, ...]
+
+
+JOBS: Dict[str, Job] = {job.name: job for job in (
+    Job("atv", run_atv, ("ATV/ATV.m3u", "ATV/diziler/*.m3u", "ATV/programlar/*.m3u")),
+    Job("ddizi", run_ddizi, ("DDIZI/DDIZI.m3u", "DDIZI/diziler/*.m3u")),
+    Job("yabancidizi", run_yabancidizi, ("yabancidizi_full.m3u",)),
+    Job("beinsports", run_beinsports, ("playsport/**/*.m3u",)),
+    Job("seriler", run_seriler, ("karadayı.m3u", "kara_dayı.m3u", "kurulus-osman.m3u", "series_state.json")),
+)}
+
+
+# ============================
+# 3. ÇALIŞTIRMA VE RAPOR
+# ============================
+def snapshot(patterns: Tuple[str, ...]) -> Dict[str, Tuple[int, int]]:
+    """Desenlere uyan dosyaların (mtime, boyut) bilgisi; çalışma öncesi/sonrası karşılaştırılır."""
+    files: Dict[str, Tuple[int, int]] = {}
+    for pattern in patterns:
+        for path in glob.glob(str(REPO_ROOT / pattern), recursive=True):
+            stat = os.stat(path)
+            files[os.path.relpath(path, REPO_ROOT)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def run_job(job: Job, args: argparse.Namespace, caches: Caches) -> Dict[str, Any]:
+    before = snapshot(job.outputs)
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"source": job.name}
+    log.info("[%s] başlatıldı.", job.name)
+    try:
+        written = job.runner(args, caches)
+        result["status"] = "yazıldı" if written else "yazılmadı"
+    except (Exception, SystemExit) as e:  # SystemExit dahil; bir kaynağın hatası diğerlerini durdurmamalı
+        log.error("[%s] hata: %s", job.name, e, exc_info=not isinstance(e, SystemExit))
+        result["status"] = "hata"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["duration_s"] = round(time.perf_counter() - started, 2)
+    after = snapshot(job.outputs)
+    result["changed"] = sorted(path for path, info in after.items() if before.get(path) != info)
+    result["removed"] = sorted(set(before) - set(after))
+    log.info("[%s] %s (%.1f sn, %d dosya değişti).", job.name, result["status"], result["duration_s"],
+             len(result["changed"]))
+    return result
+
+
+def check_links(names: List[str], mode: str, stream_cache: Optional[StreamCache],
+                lazy: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Seçilen kaynakların tüm M3U çıktılarını birlikte yoklar; sonuçlar yayın linki önbelleğinde tutulur.
+    Yeniden yazılan listeler üreticilerin manifestlerine işlenir; `lazy` çözümleyici adresleri yoklanmaz.
+    """
+    patterns = [str(REPO_ROOT / pattern) for name in names for pattern in JOBS[name].outputs
+                if pattern.endswith(".m3u")]
+    checker = LivenessChecker(stream_cache)
+    files = check_playlists(patterns, checker, mode, lazy)
+    return {
+        "mode": mode,
+        "probes": dict(checker.stats),
+        "files": {os.path.relpath(path, REPO_ROOT): summary for path, summary in files.items()},
+    }
+
+
+def run_all(names: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    """Seçilen kaynakları eşzamanlı çalıştırır ve birleşik raporu döndürür."""
+    stream_cache = StreamCache() if args.use_cache else None
+    http_cache = HTTPCache() if args.use_cache else None
+    started_at, started = int(time.time()), time.perf_counter()
+    liveness: Optional[Dict[str, Any]] = None
+    try:
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="kaynak") as pool:
+            futures = [pool.submit(run_job, JOBS[name], args, (stream_cache, http_cache)) for name in names]
+            sources = [future.result() for future in futures]
+        if getattr(args, "check_links", None):
+            liveness = check_links(names, args.check_links, stream_cache, getattr(args, "lazy", None))
+    finally:
+        if stream_cache is not None:
+            stream_cache.log_stats(log)
+            stream_cache.close()
+        if http_cache is not None:
+            http_cache.log_stats(log)
+            http_cache.close()
+    report: Dict[str, Any] = {
+        "started_at": started_at,
+        "duration_s": round(time.perf_counter() - started, 2),
+        "sources": sources,
+    }
+    if liveness is not None:
+        report["liveness"] = liveness
+    # Tüm kaynakların istek/aşama ölçümleri; aşamalar "<kaynak>/<aşama>" adıyla ayrışır.
+    report["metrics"] = METRICS.report()
+    if stream_cache is not None:
+        report["stream_cache"] = {source: dict(counter) for source, counter in sorted(stream_cache.stats().items())}
+        report["http_cache"] = dict(http_cache.stats)
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tüm M3U kaynaklarını tek süreçte eşzamanlı çalıştırır")
+    parser.add_argument("--sources", nargs="+", choices=sorted(JOBS), default=list(JOBS), metavar="KAYNAK",
+                        help="Çalıştırılacak kaynaklar: %s (varsayılan: hepsi)" % ", ".join(JOBS))
+    parser.add_argument("--max-runtime", type=float, default=None, metavar="DAKİKA",
+                        help="ATV ve DDIZI bu süre dolunca ilerlemeyi kaydedip çıkar (sonraki çalıştırma devam eder)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Kalıcı yayın linki ve HTTP önbelleklerini kullanma")
+    parser.add_argument("--check-links", choices=("tag", "prune"), default=None,
+                        help="Çıktılardaki ölü linkleri etiketle ya da listeden çıkar (varsayılan: denetleme)")
+    parser.add_argument("--lazy", default=None, metavar="URL",
+                        help="ATV ve DDIZI yayın linklerini çözme; bölümleri bu adresteki çözümleyiciye bağla "
+                             "(bkz. playlist_server.py --resolver)")
+    parser.add_argument("--report", default=str(DEFAULT_REPORT_PATH),
+                        help="Birleşik çalışma raporunun yazılacağı JSON dosyası (varsayılan: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Betikler çıktılarını (yabancidizi_full.m3u, playsport/ ...) göreli yollara yazar.
+    os.chdir(REPO_ROOT)
+    names = list(dict.fromkeys(args.sources))
+    report = run_all(names, args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    write_if_changed(args.report, json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+    append_history("run_all", report["metrics"])
+
+    log.info("=" * 50)
+    for result in report["sources"]:
+        log.info("%-12s %-10s %7.1f sn  %d dosya değişti%s", result["source"], result["status"], result["duration_s"],
+                 len(result["changed"]), f"  ({result['error']})" if "error" in result else "")
+    if "liveness" in report:
+        liveness = report["liveness"]
+        log.info("Canlılık (%s): %d listede %d ölü girdi, %d liste güncellendi.", liveness["mode"],
+                 len(liveness["files"]), sum(f["dead"] for f in liveness["files"].values()),
+                 sum(f["changed"] for f in liveness["files"].values()))
+    log.info("Ölçümler: %s", METRICS.summary())
+    log.info("Toplam süre: %.1f sn. Rapor: %s", report["duration_s"], args.report)
+    return 1 if any(result["status"] == "hata" for result in report["sources"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+# Testler ortak paketi (common/) depo kökünden içe aktarır.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""ATV artımlı modunun (yalnızca yeni bölümleri çözme) sahte bir motorla testleri."""
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+pytest.importorskip("slugify")
+
+from common import load_script
+from common.engine import Engine
+from common.m3u import format_entry
+
+DAY = 86400
+SHOW = "https://www.atv.com.tr/dizi"
+
+
+class FakeEngine:
+    """Bölüm listelerini sabit döndüren, çözülen bölümleri kaydeden motor."""
+
+    collect = staticmethod(Engine.collect)
+
+    def __init__(self, pages, fail=()):
+        self.pages = pages
+        self.fail = set(fail)
+        self.resolved = []
+
+    def fetch_episode_lists(self, contents):
+        return [self.pages.get(content["url"], []) for content in contents]
+
+    def resolve_episodes(self, episodes):
+        self.resolved.extend(ep["url"] for ep in episodes)
+        now = int(time.time())
+        return [None if ep["url"] in self.fail else dict(ep, stream_url=ep["url"] + ".m3u8", resolved_at=now)
+                for ep in episodes]
+
+
+@pytest.fixture
+def atv(tmp_path, monkeypatch):
+    module = load_script("ATV/atv.py")
+    monkeypatch.setattr(module, "DIZILER_M3U_DIR", str(tmp_path / "diziler"))
+    return module
+
+
+def episode(n, **extra):
+    return dict({"name": f"{n}. Bölüm", "url": f"{SHOW}/{n}-bolum"}, **extra)
+
+
+def test_only_new_and_expiring_episodes_are_resolved(atv, tmp_path):
+    now = time.time()
+    content = {"name": "Dizi", "url": SHOW, "type": "dizi"}
+    state_path = str(tmp_path / "atv_state.json")
+    atv.save_state([dict(content, episodes=[
+        episode(0, stream_url="s0", resolved_at=now - DAY),       # sayfadan düştü, korunur
+        episode(1, stream_url="s1", resolved_at=now - DAY),       # taze, çözülmez
+        episode(2, stream_url="s2", resolved_at=now - 10 * DAY),  # yeniden doğrulanır; başarısız -> eski link
+        episode(3, stream_url="s3", resolved_at=now - 40 * DAY),  # TTL doldu -> yeniden çözülür
+        episode(5, stream_url="s5", resolved_at=now - 40 * DAY),  # sayfada yok, TTL doldu, çözülemedi -> düşer
+    ])], path=state_path)
+    state = atv.load_state(state_path)
+
+    page = [episode(4), episode(1), episode(2), episode(3)]
+    engine = FakeEngine({SHOW: page}, fail={f"{SHOW}/2-bolum", f"{SHOW}/5-bolum"})
+    data = atv.resolve_incrementally(engine, [content], state)
+
+    assert engine.resolved == [f"{SHOW}/{n}-bolum" for n in (4, 2, 3, 5)]
+    assert [(ep["name"], ep["stream_url"]) for ep in data[0]["episodes"]] == [
+        ("4. Bölüm", f"{SHOW}/4-bolum.m3u8"), ("1. Bölüm", "s1"), ("2. Bölüm", "s2"),
+        ("3. Bölüm", f"{SHOW}/3-bolum.m3u8"), ("0. Bölüm", "s0")]
+
+
+def test_known_episodes_are_seeded_from_existing_playlist(atv, tmp_path):
+    content = {"name": "Aşk, Mantık, İntikam", "url": SHOW, "type": "dizi"}
+    playlist = tmp_path / "diziler" / atv._safe_series_filename(content["name"])
+    playlist.parent.mkdir()
+    playlist.write_text("#EXTM3U\n" + "".join(
+        format_entry(f"{n}. Bölüm", f"https://cdn/{n}.m3u8", [("group-title", content["name"])]) for n in (1, 2)),
+        encoding="utf-8")
+    written = time.time() - 2 * DAY
+    os.utime(playlist, (written, written))
+
+    known = atv._known_episodes(content, {})
+    assert known["2. Bölüm"] == {"name": "2. Bölüm", "stream_url": "https://cdn/2.m3u8",
+                                 "resolved_at": int(written)}
+
+    engine = FakeEngine({SHOW: [episode(3), episode(1), episode(2)]})
+    data = atv.resolve_incrementally(engine, [content], {})
+    assert engine.resolved == [f"{SHOW}/3-bolum"]
+    assert [ep["stream_url"] for ep in data[0]["episodes"]] == [
+        f"{SHOW}/3-bolum.m3u8", "https://cdn/1.m3u8", "https://cdn/2.m3u8"]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""beinsportsozet.py hafta keşfinin testleri (ağ yerine sahte `fetch_and_parse`)."""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("requests")
+
+import beinsportsozet as bein
+
+LEAGUE = {"name": "Lig", "o": 1, "seasons": {10: "2023/2024", 11: "2024/2025"}, "st": {}}
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    weeks = {10: 3, 11: 2}
+    calls = []
+
+    def fetch(url):
+        season, week = map(int, re.search(r"s=(\d+)&r=(\d+)", url).groups())
+        calls.append((season, week))
+        return [[f"{season}{week}", f"Maç {week}", f"https://v/{season}/{week}", ""]] if week <= weeks[season] else []
+
+    monkeypatch.setattr(bein, "LEAGUES", [LEAGUE])
+    monkeypatch.setattr(bein, "fetch_and_parse", fetch)
+    return weeks, calls
+
+
+def test_discovery_probes_until_empty_and_caches_week_counts(fake_api):
+    weeks, calls = fake_api
+    counts = {}
+    with ThreadPoolExecutor(4) as pool:
+        results = bein.discover_weeks(pool, counts)
+    assert counts == {"1:10": 3, "1:11": 2}
+    assert sorted(results["1:10"]) == [1, 2, 3]
+
+    # Sonraki çalıştırmada yalnızca güncel sezonun yeni haftaları yoklanır.
+    weeks[11] = 3
+    calls.clear()
+    with ThreadPoolExecutor(4) as pool:
+        bein.discover_weeks(pool, counts)
+    assert counts["1:11"] == 3
+    assert sorted(call for call in calls if call[0] == 10) == [(10, 1), (10, 2), (10, 3)]
+    assert (11, 4) in calls and (10, 4) not in calls
+
+
+def test_only_complete_past_seasons_are_frozen(fake_api, tmp_path):
+    seasons = list(bein.all_seasons())
+    past, current = seasons
+    counts = {"1:10": 3, "1:11": 2}
+    weeks = {1: [["1", "Maç 1", "https://v/1", ""]], 2: [], 3: [["3", "Maç 3", "https://v/3", ""]]}
+
+    assert bein.is_complete(past, weeks, counts)
+    assert not bein.is_complete(past, {**weeks, 2: None}, counts)  # başarısız hafta
+    assert not bein.is_complete(current, weeks, counts)
+
+    bein.freeze_season(past["key"], weeks, folder=str(tmp_path))
+    assert bein.load_frozen_seasons(seasons, folder=str(tmp_path)) == {past["key"]: weeks}
+
+
+def test_failed_weeks_are_retried_once_and_reported(fake_api, monkeypatch):
+    weeks, calls = fake_api
+    fetch = bein.fetch_and_parse
+    flaky = {(10, 2): 1, (11, 1): 1, (10, 3): 2}  # kaç kez başarısız olacağı
+
+    def sometimes_failing(url):
+        season, week = map(int, re.search(r"s=(\d+)&r=(\d+)", url).groups())
+        if flaky.get((season, week), 0) > 0:
+            flaky[(season, week)] -= 1
+            return None
+        return fetch(url)
+
+    monkeypatch.setattr(bein, "fetch_and_parse", sometimes_failing)
+    counts = {"1:10": 3}
+    seasons = list(bein.all_seasons())
+    with ThreadPoolExecutor(4) as pool:
+        results = bein.discover_weeks(pool, counts, seasons)
+
+    assert results["1:10"][2] and results["1:11"][1]  # ikinci denemede alındı
+    assert bein.failed_weeks(results, seasons) == [bein.week_url(LEAGUE, 10, 3)]
+    assert not bein.is_complete(seasons[0], results["1:10"], counts)
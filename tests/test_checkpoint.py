@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Devam ettirilebilir ara kaydın testleri."""
+
+import json
+
+from common.checkpoint import Checkpoint
+
+
+def test_resume_restores_flushed_progress(tmp_path):
+    path = tmp_path / "atv.json"
+    first = Checkpoint("atv", path=path, flush_interval=3600)
+    first.put("resolved", "https://x/1", {"stream_url": "https://s/1"})
+    assert not path.exists()  # aralık dolmadan diske yazılmaz
+    first.flush()
+
+    assert Checkpoint("atv", path=path).get("resolved", "https://x/1") is None
+    resumed = Checkpoint("atv", path=path, resume=True)
+    assert resumed.get("resolved", "https://x/1") == {"stream_url": "https://s/1"}
+    assert resumed.resumed == 1
+
+    resumed.clear()
+    assert not path.exists()
+
+
+def test_stale_checkpoint_is_ignored(tmp_path):
+    path = tmp_path / "ddizi.json"
+    path.write_text(json.dumps({"version": 1, "created_at": 0, "sections": {"resolved": {"a": "b"}}}))
+    assert Checkpoint("ddizi", path=path, resume=True).get("resolved", "a") is None
+
+
+def test_max_runtime_expires():
+    assert Checkpoint("x", max_runtime=-1).expired()
+    assert not Checkpoint("x", max_runtime=60).expired()
+    assert not Checkpoint("x").expired()
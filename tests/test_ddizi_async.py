@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""DDIZI asenkron motorunun yerel bir sahte (stub) HTTP sunucusuna karşı testi."""
+
+import asyncio
+import importlib.util
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("bs4")
+pytest.importorskip("slugify")
+
+DDIZI_PATH = Path(__file__).resolve().parent.parent / "DDIZI" / "ddizi.py"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/arsiv, dizi ve bölüm sayfalarını ve Fembed /api/source cevabını taklit eder."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: str, content_type: str = "text/html", status: int = 200) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/arsiv":
+            links = "".join(f"<li><a href='/dizi/s{i}'>Dizi {i}</a></li>" for i in range(3))
+            return self._send(f"<ul class='dizi-list'>{links}</ul>")
+        if self.path.startswith("/dizi/"):
+            slug = self.path.rsplit("/", 1)[-1]
+            episodes = "".join(f"<li><a href='/izle/{slug}-{j}'>{slug} Bölüm {j}</a></li>" for j in range(1, 4))
+            return self._send(
+                f"<div class='dizi-poster'><img src='/p/{slug}.jpg'></div>"
+                f"<div class='sezon-bolumleri'><ul>{episodes}</ul></div>"
+            )
+        if self.path.startswith("/izle/"):
+            video = self.path.rsplit("/", 1)[-1]
+            return self._send(f"<iframe src='//femax20.com/v/{video}'></iframe>")
+        self._send("bulunamadı", status=404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        video = self.path.rsplit("/", 1)[-1]
+        payload = {"success": True, "data": [{"file": f"https://cdn/{video}_360.mp4"},
+                                             {"file": f"https://cdn/{video}_720.mp4"}]}
+        self._send(json.dumps(payload), "application/json")
+
+
+@pytest.fixture(scope="module")
+def ddizi():
+    spec = importlib.util.spec_from_file_location("ddizi_under_test", DDIZI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+
+
+def _crawler(ddizi, stub_url, **kwargs):
+    return ddizi.AsyncCrawler(base_url=stub_url, fembed_api_base=stub_url + "api/source/",
+                              rate=1000, burst=1000, **kwargs)
+
+
+def test_crawl_keeps_series_and_episode_order(ddizi, stub_url):
+    data = asyncio.run(_crawler(ddizi, stub_url, concurrency=8).crawl())
+
+    assert [series["name"] for series in data] == ["Dizi 0", "Dizi 1", "Dizi 2"]
+    assert data[0]["img"] == stub_url + "p/s0.jpg"
+    assert [ep["name"] for ep in data[1]["episodes"]] == ["s1 Bölüm 1", "s1 Bölüm 2", "s1 Bölüm 3"]
+    assert data[2]["episodes"][0]["stream_url"] == "https://cdn/s2-1_720.mp4"
+
+
+def test_lazy_crawl_skips_episode_pages(ddizi, stub_url):
+    data = asyncio.run(_crawler(ddizi, stub_url, concurrency=8, lazy_base="http://yerel:8080").crawl())
+
+    episode = data[2]["episodes"][0]
+    assert episode["stream_url"] == "http://yerel:8080/resolve/ddizi?u=" + quote(episode["url"], safe="")
+
+
+def test_series_worker_survives_unexpected_errors(ddizi, stub_url, monkeypatch):
+    original = ddizi.parse_series_page
+
+    def flaky(html, base_url=ddizi.BASE_URL):
+        if b"/p/s0.jpg" in html:
+            raise KeyError("src")
+        return original(html, base_url)
+
+    monkeypatch.setattr(ddizi, "parse_series_page", flaky)
+    # concurrency=4 -> tek dizi işçisi; hata onu öldürseydi tarama kilitlenirdi.
+    data = asyncio.run(asyncio.wait_for(_crawler(ddizi, stub_url, concurrency=4).crawl(), timeout=30))
+
+    assert [series["name"] for series in data] == ["Dizi 1", "Dizi 2"]
+
+
+def test_rate_must_be_positive(ddizi):
+    with pytest.raises(ValueError):
+        ddizi.AsyncCrawler(rate=0)
+    with pytest.raises(SystemExit):
+        ddizi.parse_args(["--rate", "0"])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Ortak tarama motorunun sahte bir kaynakla testleri."""
+
+import random
+import time
+
+from common.checkpoint import Checkpoint
+from common.engine import Engine
+from common.source import Source
+from common.stream_cache import StreamCache
+
+
+class FakeSource(Source):
+    name = "sahte"
+
+    def __init__(self, master_path, fail=()):
+        self.master_path = str(master_path)
+        self.fail = set(fail)
+        self.resolved = []
+
+    def list_content(self):
+        return [{"name": f"Dizi {i}", "url": f"https://x/{i}"} for i in range(4)]
+
+    def list_episodes(self, content):
+        time.sleep(random.random() / 100)
+        content["img"] = content["url"] + ".jpg"
+        return [{"name": f"{content['name']} B{j}", "url": f"{content['url']}/{j}"} for j in range(3)]
+
+    def resolve_stream(self, episode):
+        time.sleep(random.random() / 100)
+        self.resolved.append(episode["url"])
+        return None if episode["url"] in self.fail else episode["url"] + ".m3u8"
+
+    def group_path(self, content):
+        return self.master_path.replace("ana.m3u", content["url"][-1] + ".m3u")
+
+
+def test_run_keeps_order_and_writes_groups(tmp_path):
+    source = FakeSource(tmp_path / "ana.m3u", fail={"https://x/1/0", "https://x/2/0", "https://x/2/1", "https://x/2/2"})
+    data = Engine(source, workers=4).run()
+
+    assert [item["name"] for item in data] == ["Dizi 0", "Dizi 1", "Dizi 3"]
+    assert [ep["name"] for ep in data[1]["episodes"]] == ["Dizi 1 B1", "Dizi 1 B2"]
+    master = (tmp_path / "ana.m3u").read_text(encoding="utf-8")
+    assert master.index("Dizi 0 B2") < master.index("Dizi 1 B1") < master.index("Dizi 3 B0")
+    assert 'tvg-logo="https://x/3.jpg"' in (tmp_path / "3.m3u").read_text(encoding="utf-8")
+    assert not (tmp_path / "2.m3u").exists()
+    assert (tmp_path / "m3u_manifest.json").exists()
+
+
+def test_resume_skips_finished_work(tmp_path):
+    path = tmp_path / "sahte.json"
+    first = FakeSource(tmp_path / "ana.m3u", fail={"https://x/0/0"})
+    checkpoint = Checkpoint("sahte", path=path)
+    engine = Engine(first, workers=2, checkpoint=checkpoint)
+    engine.collect(engine.list_content(), engine.crawl(engine.list_content()))
+    checkpoint.flush()
+
+    second = FakeSource(tmp_path / "ana.m3u")
+    data = Engine(second, workers=2, checkpoint=Checkpoint("sahte", path=path, resume=True)).run()
+    assert second.resolved == ["https://x/0/0"]
+    assert data[0]["img"] == "https://x/0.jpg"
+    assert not path.exists()  # başarılı çalışmada ara kayıt silinir
+
+
+def test_lazy_mode_links_resolver_without_resolving(tmp_path):
+    source = FakeSource(tmp_path / "ana.m3u")
+    data = Engine(source, workers=2, lazy_base="http://127.0.0.1:8080/").run()
+
+    assert source.resolved == []
+    assert data[0]["episodes"][0]["stream_url"] == "http://127.0.0.1:8080/resolve/sahte?u=https%3A%2F%2Fx%2F0%2F0"
+
+
+def test_cached_links_keep_their_resolution_time(tmp_path):
+    cache = StreamCache(tmp_path / "streams.sqlite")
+    source = FakeSource(tmp_path / "ana.m3u")
+    source.stream_ttl_days = 30
+    engine = Engine(source, workers=1, stream_cache=cache)
+    cache.put("sahte", "https://x/0/0", "https://x/0/0.m3u8")
+    cache._conn.execute("UPDATE streams SET resolved_at = resolved_at - 6 * 86400")
+
+    resolved = engine.resolve({"name": "B0", "url": "https://x/0/0"})
+    assert source.resolved == []
+    assert time.time() - resolved["resolved_at"] > 5 * 86400
+    cache.close()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""benchmarks/fixture_server.py yerel fixture sunucusunun testleri."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from fixture_server import FixtureServer  # noqa: E402
+
+
+def test_serves_fixtures_with_etags_and_injected_errors():
+    with FixtureServer("ddizi", size=3) as server:
+        page = requests.get(server.url + "/arsiv", timeout=5)
+        assert page.status_code == 200 and page.text.count("<li>") == 3
+        again = requests.get(server.url + "/arsiv", headers={"If-None-Match": page.headers["ETag"]}, timeout=5)
+        assert again.status_code == 304
+        api = requests.post(server.url + "/api/source/dizi-0-1", timeout=5).json()
+        assert api["data"][-1]["file"].endswith("dizi-0-1_720.mp4")
+        assert requests.get(server.url + "/yok", timeout=5).status_code == 404
+
+    with FixtureServer("atv", error_rate=1.0) as server:
+        failed = requests.get(server.url + "/diziler", timeout=5)
+        assert (failed.status_code, failed.headers["Retry-After"]) == (503, "0")
+        assert server.stats["injected_errors"] == 1
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""generate_m3u.py'deki dörtnala + ikili arama bölüm keşfinin sahte yoklamayla testleri."""
+
+import math
+
+import generate_m3u
+
+
+def fake_exists(latest):
+    """Her dizi için `latest[anahtar]` bölümüne kadar var sayan yoklama; istekleri sayar."""
+    calls = []
+    answers = {generate_m3u.probe_url(s, ep): ep <= latest.get(s["key"], 0)
+               for s in generate_m3u.SERIES for ep in range(1, 5000)}
+
+    def exists(url):
+        calls.append(url)
+        return answers.get(url, False)
+
+    return exists, calls
+
+
+def test_discover_finds_latest_in_logarithmic_probes():
+    series = [s for s in generate_m3u.SERIES if s["key"] in ("karadayi", "kurulus-osman")]
+    for new in (0, 1, 2, 7, 100, 1000):
+        exists, calls = fake_exists({"karadayi": 114 + new, "kurulus-osman": 194})
+        found = generate_m3u.discover(series, {"karadayi": 114, "kurulus-osman": 194}, exists=exists, workers=4)
+        assert found["karadayi"]["last"] == 114 + new
+        assert found["kurulus-osman"] == {"last": 194, "probes": 1}
+        assert found["karadayi"]["probes"] <= 1 + 4 * (2 * math.log2(new + 1) + 2)
+
+
+def test_main_writes_playlists_and_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    exists, _ = fake_exists({"karadayi": 3, "kara-dayi": 0, "kurulus-osman": 2})
+    monkeypatch.setattr(generate_m3u, "episode_exists", exists)
+
+    assert generate_m3u.main(["--series", "karadayi", "kurulus-osman"])
+
+    assert generate_m3u.load_state() == {"karadayi": 3, "kurulus-osman": 2}
+    lines = (tmp_path / "karadayı.m3u").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "#EXTM3U"
+    assert lines[-1] == generate_m3u.PROXY_PREFIX + "https://www.atv.com.tr/karadayi/3-bolum/izle&ext=mp4"
+    assert generate_m3u.count_entries(str(tmp_path / "kurulus-osman.m3u")) == 2
+    assert not (tmp_path / "kara_dayı.m3u").exists()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from common.htmlparse import find_attribute, make_soup
+
+
+def test_find_attribute_matches_conditions():
+    html = b'<div id="other" data-videoid="1"></div><div id="video-container" data-videoid="42"></div>'
+    assert find_attribute(html, "div", "data-videoid", {"id": "video-container"}) == "42"
+
+
+def test_find_attribute_regex_and_missing():
+    html = "<iframe src='//example.com/x'></iframe><iframe src='//femax20.com/v/abc'></iframe>"
+    assert find_attribute(html, "iframe", "src", {"src": re.compile(r"//femax20\.com")}) == "//femax20.com/v/abc"
+    assert find_attribute(html, "input", "value") is None
+
+
+def test_find_attribute_stops_reading_after_match():
+    consumed = []
+
+    def chunks():
+        for chunk in (b'<input name="tok" va', b'lue="abc">', b"<p>", b"</p>"):
+            consumed.append(chunk)
+            yield chunk
+
+    assert find_attribute(chunks(), "input", "value", {"name": "tok"}) == "abc"
+    assert len(consumed) == 2
+
+
+def test_find_attribute_handles_split_multibyte_chars():
+    data = '<a title="Bölüm" href="/x">'.encode("utf-8")
+    split = data.index("ö".encode("utf-8")) + 1
+    assert find_attribute([data[:split], data[split:]], "a", "title") == "Bölüm"
+
+
+def test_make_soup_selects():
+    soup = make_soup(b"<ul class='dizi-list'><li><a href='/a'>A</a></li></ul>")
+    assert [a["href"] for a in soup.select("ul.dizi-list li a")] == ["/a"]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""common.http_cache koşullu GET önbelleğinin sahte bir `fetch` fonksiyonuyla testleri."""
+
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from common import http_cache as http_cache_module
+from common.http_cache import HTTPCache
+
+URL = "https://x/liste"
+
+
+class FakeServer:
+    """Verilen gövdeyi ETag ile sunar; If-None-Match eşleşirse 304 döner."""
+
+    def __init__(self, body=b"<html>1</html>", etag='"v1"'):
+        self.body, self.etag = body, etag
+        self.calls = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.calls.append(dict(headers))
+        response = requests.Response()
+        response.url, response.encoding = url, "utf-8"
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            response.status_code, response._content = 304, b""
+        else:
+            response.status_code, response._content = 200, self.body
+            if self.etag:
+                response.headers["ETag"] = self.etag
+        return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(tmp_path / "http.sqlite")
+    yield cache
+    cache.close()
+
+
+def parse_counting(parsed):
+    def parse(body):
+        parsed.append(body)
+        return {"uzunluk": len(body)}
+    return parse
+
+
+def test_not_modified_skips_parsing(cache):
+    server, parsed = FakeServer(), []
+    assert cache.get_parsed(server.get, URL, parse_counting(parsed), key="t") == {"uzunluk": 14}
+    assert cache.get_parsed(server.get, URL, parse_counting(parsed), key="t") == {"uzunluk": 14}
+
+    assert server.calls[1] == {"If-None-Match": '"v1"'}
+    assert parsed == [b"<html>1</html>"]
+    assert (cache.stats["not_modified"], cache.stats["pages_skipped"], cache.stats["bytes_saved"]) == (1, 1, 14)
+
+    server.body, server.etag = b"<html>22</html>", '"v2"'
+    assert cache.get_parsed(server.get, URL, parse_counting(parsed), key="t") == {"uzunluk": 15}
+
+
+def test_identical_body_only_refreshes_validators(cache, monkeypatch):
+    server, parsed = FakeServer(etag=None), []
+    cache.get_parsed(server.get, URL, parse_counting(parsed), key="t")
+
+    compressed = []
+    monkeypatch.setattr(http_cache_module, "zlib", SimpleNamespace(
+        compress=lambda body: compressed.append(body) or zlib.compress(body), decompress=zlib.decompress))
+    page = cache.get(server.get, URL)
+    assert page.unchanged and page.content == server.body
+    assert cache.get_parsed(server.get, URL, parse_counting(parsed), key="t") == {"uzunluk": 14}
+    assert compressed == [] and len(parsed) == 1 and cache.stats["identical"] == 2
+
+
+def test_not_modified_without_stored_page_is_refetched(cache):
+    server = FakeServer()
+    cache.get(server.get, URL)
+
+    def pruned_meanwhile(url, headers=None, **kwargs):
+        # Doğrulayıcılar okunduktan sonra kayıt silinir (ör. başka bir thread'in prune'u).
+        cache._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        return server.get(url, headers=headers, **kwargs)
+
+    page = cache.get(pruned_meanwhile, URL, headers={"Referer": "https://x/"})
+    assert page.response.status_code == 200 and page.content == server.body and not page.unchanged
+    assert server.calls[1:] == [{"Referer": "https://x/", "If-None-Match": '"v1"'}, {"Referer": "https://x/"}]
+    assert cache.stats["missing"] == 1
+    assert cache.get(server.get, URL).unchanged  # sayfa yeniden kaydedildi
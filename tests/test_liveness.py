@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""common.liveness canlılık denetiminin yerel bir HTTP sunucusuyla testleri."""
+
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from common.liveness import DEAD_TAG, LivenessChecker, check_playlists
+from common.m3u import M3UWriter, format_entry
+from common.manifest import Manifest, file_digest
+from common.resolver import lazy_url
+from common.session import make_session
+from common.stream_cache import StreamCache
+
+HITS: Counter = Counter()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _respond(self, head):
+        HITS[(self.command, self.path)] += 1
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/ok")
+        elif self.path == "/nohead" and head:
+            self.send_response(405)
+        else:
+            status = {"/ok": 200, "/nohead": 206, "/gone": 404, "/busy": 503}[self.path]
+            self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    HITS.clear()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def write_playlist(path, server):
+    paths = ["/ok", "/redirect", "/nohead", "/gone", "/busy"]
+    path.write_text("#EXTM3U\n\n" + "".join(format_entry(f"Maç {p}", server + p, [("group-title", "a,b")])
+                                            for p in paths), encoding="utf-8")
+
+
+def checker(cache=None):
+    return LivenessChecker(cache, workers=4, per_host=2, session=make_session(max_retries=0))
+
+
+def test_dead_entries_are_tagged_then_pruned(server, tmp_path):
+    playlist = tmp_path / "liste.m3u"
+    write_playlist(playlist, server)
+
+    report = check_playlists([str(tmp_path / "*.m3u")], checker(), "tag")
+    assert report[str(playlist)] == {"entries": 5, "dead": 1, "changed": 1}
+    lines = playlist.read_text(encoding="utf-8").splitlines()
+    assert lines[:2] == ["#EXTM3U", ""]
+    assert [line.split('",')[1] for line in lines if line.startswith("#EXTINF")] == [
+        "Maç /ok", "Maç /redirect", "Maç /nohead", DEAD_TAG + "Maç /gone", "Maç /busy"]
+    assert HITS[("GET", "/nohead")] == 1
+
+    check_playlists([str(playlist)], checker(), "prune")
+    urls = [line for line in playlist.read_text(encoding="utf-8").splitlines() if line.startswith("http")]
+    # 503 belirsiz sayılır; girdi listede kalır.
+    assert urls == [server + p for p in ("/ok", "/redirect", "/nohead", "/busy")]
+
+
+def test_definitive_results_are_cached(server, tmp_path):
+    cache = StreamCache(tmp_path / "streams.sqlite")
+    urls = [server + p for p in ("/ok", "/gone", "/busy")]
+    first = checker(cache).check(urls)
+    assert first == {urls[0]: True, urls[1]: False, urls[2]: None}
+
+    again = checker(cache)
+    assert again.check(urls) == first
+    assert (again.stats["önbellek"], again.stats["belirsiz"]) == (2, 1)
+    assert HITS[("HEAD", "/ok")] == HITS[("HEAD", "/gone")] == 1
+    cache.close()
+
+
+def test_pruned_playlist_is_recorded_in_its_manifest(server, tmp_path):
+    manifest = Manifest(str(tmp_path / "m3u_manifest.json"))
+    playlist = tmp_path / "diziler" / "liste.m3u"
+    with M3UWriter(str(playlist), manifest=manifest) as writer:
+        for p in ("/ok", "/gone"):
+            writer.write_entry(f"Bölüm {p}", server + p)
+    manifest.save()
+
+    check_playlists([str(tmp_path / "**" / "*.m3u")], checker(), "prune")
+    files = json.loads((tmp_path / "m3u_manifest.json").read_text(encoding="utf-8"))["files"]
+    assert files == {"diziler/liste.m3u": {"sha256": file_digest(str(playlist)), "entries": 1}}
+
+
+def test_lazy_resolver_urls_are_not_probed(server, tmp_path):
+    playlist = tmp_path / "liste.m3u"
+    resolver = lazy_url(server, "atv", "https://www.atv.com.tr/dizi/1-bolum/izle")
+    playlist.write_text("#EXTM3U\n" + format_entry("Bölüm 1", resolver) + format_entry("Maç", server + "/gone"),
+                        encoding="utf-8")
+
+    report = check_playlists([str(playlist)], checker(), "prune", lazy=server + "/")
+    assert report[str(playlist)] == {"entries": 2, "dead": 1, "changed": 1}
+    assert [line for line in playlist.read_text(encoding="utf-8").splitlines() if line.startswith("http")] == [resolver]
+    assert not any(path.startswith("/resolve/") for _, path in HITS)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Ortak M3U yazıcısının testleri."""
+
+import json
+import os
+
+import pytest
+
+from common.manifest import Manifest
+from common.m3u import M3UFanout, M3UWriter, format_entry
+
+
+def test_format_entry_escapes_attributes_and_title():
+    entry = format_entry('Bölüm "1"\n', " https://x/1.m3u8 ", [("group-title", 'A "B"')])
+    assert entry == "#EXTINF:-1 group-title=\"A 'B'\",Bölüm \"1\" \nhttps://x/1.m3u8\n"
+
+
+def test_writer_replaces_atomically_and_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "liste.m3u"
+    with M3UWriter(str(path)) as writer:
+        writer.write_entry("Bir", "https://x/1", [("tvg-logo", "l.jpg")])
+    assert path.read_text(encoding="utf-8") == '#EXTM3U\n#EXTINF:-1 tvg-logo="l.jpg",Bir\nhttps://x/1\n'
+    assert writer.entries == 1
+
+    with pytest.raises(RuntimeError):
+        with M3UWriter(str(path)) as writer:
+            writer.write_entry("İki", "https://x/2")
+            raise RuntimeError("yarıda kaldı")
+    assert "İki" not in path.read_text(encoding="utf-8")
+    assert not (tmp_path / "liste.m3u.tmp").exists()
+
+
+def test_skip_empty_does_not_create_file(tmp_path):
+    with M3UWriter(str(tmp_path / "bos.m3u"), skip_empty=True):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fanout_writes_master_and_group_files_in_one_pass(tmp_path):
+    with M3UFanout(str(tmp_path / "hepsi.m3u")) as out:
+        out.start_group(str(tmp_path / "a.m3u"))
+        out.write_entry("A1", "https://x/a1")
+        out.start_group(str(tmp_path / "bos.m3u"))
+        out.start_group(None)
+        out.write_entry("B1", "https://x/b1")
+    assert (tmp_path / "hepsi.m3u").read_text(encoding="utf-8").count("#EXTINF") == 2
+    assert (tmp_path / "a.m3u").read_text(encoding="utf-8") == "#EXTM3U\n#EXTINF:-1,A1\nhttps://x/a1\n"
+    assert not (tmp_path / "bos.m3u").exists()
+    assert out.groups_written == 1
+
+    with pytest.raises(ValueError):
+        with M3UFanout(str(tmp_path / "hepsi.m3u")) as out:
+            out.start_group(str(tmp_path / "a.m3u"))
+            out.start_group(str(tmp_path / "b.m3u"))
+            out.start_group(str(tmp_path / "a.m3u"))
+
+
+def test_unchanged_output_is_not_rewritten_and_manifest_is_stable(tmp_path):
+    path = tmp_path / "liste.m3u"
+    manifest_path = tmp_path / "manifest.json"
+
+    def build():
+        manifest = Manifest(str(manifest_path))
+        with M3UWriter(str(path), manifest=manifest) as writer:
+            writer.write_entry("Bir", "https://x/1")
+        return writer, manifest.save()
+
+    writer, manifest_changed = build()
+    assert writer.changed and manifest_changed
+    os.utime(path, (0, 0))
+    os.utime(manifest_path, (0, 0))
+
+    writer, manifest_changed = build()
+    assert not writer.changed and not manifest_changed
+    assert path.stat().st_mtime == 0 and manifest_path.stat().st_mtime == 0
+    assert json.loads(manifest_path.read_text())["files"]["liste.m3u"]["entries"] == 1
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""common.m3u_index okuma indeksinin testleri."""
+
+from common.m3u import format_entry
+from common.m3u_index import PlaylistIndex
+
+PLAYLIST = (
+    "#EXTM3U\n\n"
+    + format_entry("Fenerbahçe 4-0 Antalyaspor", "https://x/1", [("tvg-id", "1"), ("group-title", "Süper Lig 2010/2011")])
+    + format_entry("Bursaspor 1-0 Konyaspor", "https://x/2", [("tvg-id", "2"), ("group-title", "Süper Lig 2010/2011")])
+    + "#EXTVLCOPT:http-user-agent=Mozilla\n"
+    + format_entry('Bölüm "1", son', "https://x/3", [("group-title", "Diziler, yerli")])
+    + format_entry("İSTANBULSPOR 0-0 FENERBAHÇE", "https://x/1", [("tvg-id", "4"), ("group-title", "Süper Lig 2023/2024")])
+)
+
+
+def test_fields_and_exact_round_trip(tmp_path):
+    index = PlaylistIndex.from_text(PLAYLIST + "\n")
+    assert len(index) == 4
+    assert index[2] == ("Diziler, yerli", "", 'Bölüm "1", son', "https://x/3")
+    assert index[0].tvg_id == "1" and index.groups == ["Süper Lig 2010/2011", "Diziler, yerli", "Süper Lig 2023/2024"]
+    assert index.raw(2).startswith("#EXTVLCOPT")
+    assert index.header + "".join(index.raw(row) for row in range(len(index))) + index.trailer == PLAYLIST + "\n"
+
+    crlf = PlaylistIndex.from_text("#EXTM3U\r\n#EXTINF:-1,Bir\r\n  https://x/1 \r\n")
+    assert list(crlf) == [("", "", "Bir", "https://x/1")]
+
+
+def test_filters_dedupe_merge_and_write(tmp_path):
+    index = PlaylistIndex.from_text(PLAYLIST)
+    assert index.rows(group="Süper Lig 2010/2011") == [0, 1]
+    assert index.rows(season="2023-2024") == [3]
+    assert index.rows(team="fenerbahçe") == [0, 3]
+    assert [entry.title for entry in index.select(season="2010/2011", team="bursa")] == ["Bursaspor 1-0 Konyaspor"]
+    assert index.dedupe().urls() == ["https://x/1", "https://x/2", "https://x/3"]
+
+    other = PlaylistIndex.from_text("#EXTM3U\n" + format_entry("Yeni", "https://y/1", [("group-title", "Diziler, yerli")]))
+    merged = PlaylistIndex.merge([index, other])
+    assert len(merged) == 5 and merged[4] == ("Diziler, yerli", "", "Yeni", "https://y/1")
+    assert merged.groups.count("Diziler, yerli") == 1 and merged.rows(group="Diziler, yerli") == [2, 4]
+
+    path = tmp_path / "birlesik.m3u"
+    assert merged.dedupe().write(str(path))
+    assert PlaylistIndex.load(str(path)).urls() == ["https://x/1", "https://x/2", "https://x/3", "https://y/1"]
+    assert not merged.dedupe().write(str(path))
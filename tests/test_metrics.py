@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""common.metrics ölçüm katmanının testleri (yerel bir HTTP sunucusuyla)."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from common.metrics import Metrics, instrument_session, percentile, write_report
+from common.pipeline import Pipeline
+from common.session import make_session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"x" * 100 if self.path == "/ok" else b"yok"
+        self.send_response(200 if self.path == "/ok" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+    assert percentile([], 95) == 0.0
+
+
+def test_requests_are_counted_per_host_and_stage(server, tmp_path):
+    metrics = Metrics()
+    session = make_session(max_retries=0)
+    instrument_session(session, metrics)
+
+    def fetch(path, emit):
+        session.get(server + path, timeout=5)
+
+    # Pipeline aşamaları süreç genelindeki METRICS'e yazılır; istekler yine `metrics`e.
+    with metrics.stage("test/liste"):
+        session.get(server + "/ok", timeout=5)
+    Pipeline(name="test").stage("bölüm", fetch, workers=2).run(["/ok", "/yok"])
+
+    report = metrics.report()
+    host = report["hosts"][server.split("//")[1]]
+    assert (host["requests"], host["failures"], host["bytes"]) == (3, 1, 203)
+    assert host["statuses"] == {"200": 2, "404": 1}
+    assert host["latency_s"]["count"] == 3 and host["latency_s"]["p99"] >= host["latency_s"]["p50"]
+    assert report["stages"]["test/liste"]["requests"] == 1
+
+    path = write_report("deneme", metrics, directory=tmp_path)
+    assert json.loads(path.read_text(encoding="utf-8"))["totals"]["requests"] == 3
+    history = (tmp_path / "history.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(history[-1])["name"] == "deneme"
+
+
+def test_stage_records_failures():
+    metrics = Metrics()
+    with metrics.stage("a"):
+        metrics.mark_failed()
+    with pytest.raises(ValueError):
+        with metrics.stage("a"):
+            raise ValueError
+    with metrics.stage("a"):
+        pass
+    assert (metrics.report()["stages"]["a"]["items"], metrics.report()["stages"]["a"]["failures"]) == (3, 2)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Thread tabanlı tarama hattının testleri."""
+
+import threading
+import time
+
+from common.pipeline import Pipeline
+
+
+def test_stages_fan_out_and_survive_item_errors():
+    def split(n, emit):
+        if n == 3:
+            raise ValueError("bozuk sayfa")
+        for i in range(n):
+            emit((n, i))
+
+    def square(item, emit):
+        emit(item[0] * 10 + item[1])
+
+    pipeline = Pipeline().stage("liste", split, workers=2).stage("kare", square, workers=3)
+    results = pipeline.run([1, 2, 3, 4])
+
+    assert sorted(results) == [10, 20, 21, 40, 41, 42, 43]
+    assert pipeline.stats["liste:hata"] == 1
+    assert "liste: 3 iş (1 hata)" in pipeline.summary()
+
+
+def test_stage_runs_with_configured_concurrency_and_bounded_queue():
+    active = peak = 0
+    lock = threading.Lock()
+
+    def slow(item, emit):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        emit(item)
+
+    pipeline = Pipeline().stage("yavaş", slow, workers=4, queue_size=2)
+    assert sorted(pipeline.run(range(20))) == list(range(20))
+    assert peak == 4
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""playlist_server süzme, sıkıştırma, ETag/304 ve yeniden yükleme testleri."""
+
+import gzip
+import http.client
+import os
+import threading
+from urllib.parse import quote
+
+import pytest
+
+from common.m3u import format_entry
+from playlist_server import PlaylistServer, PlaylistStore, choose_encoding
+
+
+def playlist(*entries):
+    return "#EXTM3U\n\n" + "".join(format_entry(title, url, [("group-title", group)]) for title, url, group in entries)
+
+
+ENTRIES = [(f"Fenerbahçe {n}-0 Rizespor", f"https://x/{n}", "Süper Lig 2023/2024") for n in range(20)] + [
+    ("Bursaspor 1-0 Konyaspor", "https://x/b", "Süper Lig 2010/2011"),
+    ("Göztepe 2-1 Boluspor", "https://x/g", "Trendyol 1. Lig 2023/2024"),
+]
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "ligler").mkdir()
+    (tmp_path / "ligler" / "tum.m3u").write_text(playlist(*ENTRIES), encoding="utf-8")
+    store = PlaylistStore(str(tmp_path), ("**/*.m3u",), reload_interval=0)
+    httpd = PlaylistServer(("127.0.0.1", 0), store)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield tmp_path, httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(port, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_filtered_compressed_and_conditional(server):
+    _, port = server
+    response, body = get(port, "/ligler/tum.m3u?league=trendyol%201.%20lig&season=2023-2024")
+    assert response.status == 200 and response.getheader("X-Entries") == "1"
+    assert body.decode("utf-8") == playlist(ENTRIES[-1])
+
+    response, body = get(port, "/ligler/tum.m3u?team=" + quote("FENERBAHÇE"), {"Accept-Encoding": "gzip, br;q=0"})
+    assert response.getheader("Content-Encoding") == "gzip" and response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body).decode("utf-8") == playlist(*ENTRIES[:20])
+    etag = response.getheader("ETag")
+
+    # ETag içerikten türetilir; aynı içeriği veren başka bir süzgeç de 304 alır.
+    conditional = {"Accept-Encoding": "gzip", "If-None-Match": etag}
+    response, body = get(port, "/ligler/tum.m3u?season=2023%2F2024&team=" + quote("fenerbahçe"), conditional)
+    assert response.status == 304 and body == b""
+    assert get(port, "/ligler/tum.m3u?team=" + quote("fenerbahçe"), {"If-None-Match": etag})[0].status == 200
+
+    assert get(port, "/yok.m3u")[0].status == 404
+    assert get(port, "/ligler/tum.m3u?renk=mavi")[0].status == 400
+
+
+def test_reload_on_change(server):
+    root, port = server
+    response, _ = get(port, "/ligler/tum.m3u")
+    etag = response.getheader("ETag")
+    path = root / "ligler" / "tum.m3u"
+    path.write_text(playlist(*ENTRIES[:2]), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+
+    response, body = get(port, "/ligler/tum.m3u", {"If-None-Match": etag})
+    assert response.status == 200 and body.decode("utf-8") == playlist(*ENTRIES[:2])
+
+
+def test_choose_encoding():
+    assert choose_encoding(None) == "identity"
+    assert choose_encoding("gzip;q=0, identity") == "identity"
+    assert choose_encoding("*") in ("br", "gzip")
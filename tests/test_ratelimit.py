@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""common.ratelimit host başına AIMD hız sınırlayıcısının testleri."""
+
+import asyncio
+import time
+
+import pytest
+
+from common.ratelimit import RateScheduler, parse_retry_after
+
+URL = "https://a.example/x"
+
+
+def test_requests_are_spaced_per_host_after_burst():
+    limiter = RateScheduler(10, burst=2)
+    delays = [limiter.reserve(URL) for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.02)
+    assert delays[3] == pytest.approx(0.2, abs=0.02)
+    # Başka bir host kendi bütçesini kullanır.
+    assert limiter.reserve("https://b.example/y") == 0.0
+
+
+def test_throttling_halves_rate_honors_retry_after_and_recovers():
+    limiter = RateScheduler(10, success_window=2, increase=1)
+    limiter.reserve(URL)
+    limiter.record_headers(URL, 429, {"Retry-After": "3"})
+    assert limiter.stats()["a.example"]["rate"] == 5
+    assert limiter.reserve(URL) == pytest.approx(3, abs=0.05)
+
+    for _ in range(4):
+        limiter.record(URL, 200)
+    assert limiter.stats()["a.example"]["rate"] == 7
+    limiter.record(URL, 500)  # 429/503 dışındaki 5xx hızı değiştirmez
+    assert limiter.stats()["a.example"] == {"requests": 2, "throttled": 1, "rate": 7}
+
+
+def test_async_wait_and_retry_after_formats():
+    limiter = RateScheduler(20)
+
+    async def burst():
+        for _ in range(3):
+            await limiter.wait_async(URL)
+
+    started = time.monotonic()
+    asyncio.run(burst())
+    assert time.monotonic() - started >= 0.09
+
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Thu, 01 Jan 2026 00:01:00 GMT", now=1767225600) == 60
+    assert parse_retry_after("yarın") is None
+    with pytest.raises(ValueError):
+        RateScheduler(0)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""common.resolver tembel çözümleyicinin ve playlist_server /resolve/ yolunun testleri."""
+
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import pytest
+
+from common.resolver import LazyResolver, lazy_url
+from playlist_server import PlaylistServer, PlaylistStore
+
+
+def make_resolver(calls, delay=0.0, **kwargs):
+    def resolve(url):
+        calls.append(url)
+        time.sleep(delay)
+        return None if url.endswith("/yok") else url + ".m3u8"
+
+    resolver = LazyResolver(**kwargs)
+    resolver.register("sahte", "https://x/", resolve)
+    return resolver
+
+
+def test_coalescing_lru_and_ttl():
+    calls = []
+    resolver = make_resolver(calls, delay=0.05, cache_size=2, failure_ttl=0)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: resolver.resolve("sahte", "https://x/1"), range(8)))
+    assert results == ["https://x/1.m3u8"] * 8 and calls == ["https://x/1"]
+    assert resolver.stats["birleştirilen"] == 7
+
+    resolver.resolve("sahte", "https://x/2")
+    resolver.resolve("sahte", "https://x/3")  # en eski kayıt (1) düşer
+    resolver.resolve("sahte", "https://x/1")
+    assert calls.count("https://x/1") == 2
+
+    assert resolver.resolve("sahte", "https://x/yok") is None
+    assert resolver.resolve("sahte", "https://x/yok") is None
+    assert calls.count("https://x/yok") == 2  # başarısız çözüm failure_ttl kadar tutulur
+
+    with pytest.raises(ValueError):
+        resolver.resolve("sahte", "https://baska/1")
+    with pytest.raises(KeyError):
+        resolver.resolve("bilinmeyen", "https://x/1")
+
+
+def test_server_redirects_to_resolved_stream(tmp_path):
+    calls = []
+    store = PlaylistStore(str(tmp_path), ("*.m3u",))
+    httpd = PlaylistServer(("127.0.0.1", 0), store, make_resolver(calls))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    try:
+        statuses = []
+        for episode in ("https://x/dizi/bolum-1", "https://x/dizi/bolum-1", "https://x/yok"):
+            conn = http.client.HTTPConnection("127.0.0.1", httpd.server_port, timeout=5)
+            url = urlsplit(lazy_url(base, "sahte", episode))
+            conn.request("GET", f"{url.path}?{url.query}")
+            response = conn.getresponse()
+            response.read()
+            statuses.append((response.status, response.getheader("Location")))
+            conn.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert statuses == [(302, "https://x/dizi/bolum-1.m3u8")] * 2 + [(502, None)]
+    assert calls == ["https://x/dizi/bolum-1", "https://x/yok"]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""run_all.py'nin sahte kaynaklarla testleri: hata izolasyonu ve birleşik rapor."""
+
+import argparse
+
+import run_all
+
+
+def test_failed_source_does_not_stop_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_all, "REPO_ROOT", tmp_path)
+    (tmp_path / "b.m3u").write_text("#EXTM3U\n", encoding="utf-8")
+
+    def write_a(args, caches):
+        assert caches == (None, None)
+        (tmp_path / "a.m3u").write_text("#EXTM3U\n", encoding="utf-8")
+        return True
+
+    def fail(args, caches):
+        raise RuntimeError("bağlantı yok")
+
+    monkeypatch.setattr(run_all, "JOBS", {
+        "a": run_all.Job("a", write_a, ("*.m3u",)),
+        "b": run_all.Job("b", fail, ("b.m3u",)),
+        "c": run_all.Job("c", lambda args, caches: False, ("c.m3u",)),
+    })
+    report = run_all.run_all(["a", "b", "c"], argparse.Namespace(use_cache=False))
+
+    a, b, c = report["sources"]
+    assert (a["status"], a["changed"]) == ("yazıldı", ["a.m3u"])
+    assert (b["status"], b["error"]) == ("hata", "RuntimeError: bağlantı yok")
+    assert (c["status"], c["changed"]) == ("yazılmadı", [])
+    assert "stream_cache" not in report
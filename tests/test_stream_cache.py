@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""common.stream_cache kalıcı yayın linki önbelleğinin geçici bir SQLite dosyasıyla testleri."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from common import stream_cache as stream_cache_module
+from common.stream_cache import DAY, StreamCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(stream_cache_module, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = StreamCache(tmp_path / "streams.sqlite", max_entries=2)
+    cache.set_policy("atv", ttl_days=30, revalidate_days=7)
+    yield cache
+    cache.close()
+
+
+def test_ttl_and_revalidation(cache, clock):
+    cache.put("atv", "b1", "https://cdn/1.m3u8")
+    assert cache.lookup("atv", "b1") == ("https://cdn/1.m3u8", True)
+
+    clock.value += 8 * DAY  # yeniden doğrulama eşiği aşıldı, TTL dolmadı
+    assert cache.lookup("atv", "b1") == ("https://cdn/1.m3u8", False)
+    assert cache.get("atv", "b1") is None
+
+    clock.value += 23 * DAY  # TTL doldu
+    assert cache.lookup("atv", "b1") == (None, False)
+    assert cache.stats()["atv"] == {"stored": 1, "hit": 1, "stale": 2, "miss": 1}
+
+
+def test_resolve_refreshes_stale_and_falls_back_on_failure(cache, clock):
+    cache.put("atv", "b1", "https://cdn/eski.m3u8")
+    calls = []
+    assert cache.resolve("atv", "b1", lambda: calls.append(1)) == "https://cdn/eski.m3u8"
+    assert calls == []  # taze kayıt çözücüyü çağırmaz
+
+    clock.value += 8 * DAY
+    assert cache.resolve("atv", "b1", lambda: None) == "https://cdn/eski.m3u8"
+    assert cache.stats()["atv"]["stale_used"] == 1
+    assert cache.resolve("atv", "b1", lambda: "https://cdn/yeni.m3u8") == "https://cdn/yeni.m3u8"
+    assert cache.lookup("atv", "b1") == ("https://cdn/yeni.m3u8", True)
+
+    assert cache.settle("atv", "b2", None, None) is None
+    assert cache.lookup("atv", "b2") == (None, False)
+
+
+def test_prune_evicts_least_recently_used(clock, tmp_path):
+    cache = StreamCache(tmp_path / "streams.sqlite", max_entries=2)
+    for key in ("b1", "b2", "b3"):
+        cache.put("atv", key, key + ".m3u8")
+        clock.value += 1
+    cache.lookup("atv", "b1")  # b1 yeniden kullanıldı; en eski erişim b2
+
+    assert cache.prune() == 1
+    assert [cache.get("atv", key) for key in ("b1", "b2", "b3")] == ["b1.m3u8", None, "b3.m3u8"]
+    cache.close()
+
+    reopened = StreamCache(tmp_path / "streams.sqlite")
+    assert reopened.get("atv", "b3") == "b3.m3u8"  # kayıtlar kapatınca diske yazılır
+    reopened.close()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""yabancidizi_generator.py Vidmoly 'data-id' önbelleğinin testleri."""
+
+import pytest
+
+pytest.importorskip("cloudscraper")
+pytest.importorskip("bs4")
+
+import yabancidizi_generator as yd
+from common.stream_cache import StreamCache
+
+
+def test_embed_is_memoized_per_data_id_and_persisted(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_fetch(self, data_id):
+        calls.append(data_id)
+        self.ajax_calls += 1
+        return f"https://vidmoly.to/embed-{data_id}.html"
+
+    monkeypatch.setattr(yd.VidmolyResolver, "_fetch_embed", fake_fetch)
+    cache = StreamCache(tmp_path / "streams.sqlite")
+    try:
+        first = yd.VidmolyResolver("https://site", cache)
+        assert first.embed_for("42") == first.embed_for("42") == "https://vidmoly.to/embed-42.html"
+        assert (first.ajax_calls, first.ajax_avoided) == (1, 1)
+
+        # Yeni çalıştırma: bellek boş, kalıcı önbellekten gelir.
+        second = yd.VidmolyResolver("https://site", cache)
+        assert second.embed_for("42") == "https://vidmoly.to/embed-42.html"
+        assert (second.ajax_calls, second.ajax_avoided) == (0, 1)
+        assert calls == ["42"]
+    finally:
+        cache.close()
@@ -1,8 +1,18 @@
+import argparse
 import cloudscraper
 import re
 import sys
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Set
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from common.engine import Engine
+from common.htmlparse import find_attribute, make_soup
+from common.http_cache import HTTPCache
+from common.metrics import METRICS, instrument_session, write_report
+from common.ratelimit import RateScheduler
+from common.source import Entry, Source
+from common.stream_cache import StreamCache
 
 # --- Konfigürasyon ---
 FALLBACK_BASE_URL = 'https://yabancidizi.so' 
@@ -13,8 +23,19 @@ HEADERS = {
     'X-Requested-With': 'XMLHttpRequest' # AJAX isteği için bu başlık önemli
 }
 MAX_PAGES_TO_SCAN = 20 # Kaç sayfayı kontrol edeceğimiz
+# Vidmoly embed linkleri kalıcı önbellekte tutulur; 14 günden eskiler yeniden doğrulanır.
+STREAM_TTL_DAYS = 60
+STREAM_REVALIDATE_DAYS = 14
+# Tarama hattının aşama başına eşzamanlı işçi sayıları
+LISTING_WORKERS = 4
+SERIES_WORKERS = 4
+EPISODE_WORKERS = 8
+# Host başına saniyedeki başlangıç istek sayısı; Cloudflare 429/503 döndükçe düşer
+# (Retry-After'a uyulur), sorunsuz istekler sürdükçe yeniden artar.
+RATE_LIMIT = 8.0
 
 scraper = cloudscraper.create_scraper()
+instrument_session(scraper)
 
 def get_dynamic_base_url() -> str:
     """Kotlin kaynağından dinamik olarak ana URL'yi çeker."""
@@ -34,106 +55,260 @@ def get_dynamic_base_url() -> str:
     print(f"Varsayılan URL kullanılıyor: {FALLBACK_BASE_URL}", file=sys.stderr)
     return FALLBACK_BASE_URL
 
-def get_vidmoly_embed_url(base_url: str, episode_url: str) -> Optional[str]:
+class VidmolyResolver:
     """
-    Bölüm sayfasından Vidmoly 'data-id'sini alıp AJAX isteği ile embed linkini çözer.
+    Bölüm sayfasındaki Vidmoly 'data-id'sini bulup AJAX isteği ile embed linkini çözer.
+    Bölümün linki kalıcı önbellekte ("yabancidizi") tazeyse hiç istek yapılmaz. Aksi
+    halde sayfa çekilir; embed linkleri 'data-id'ye göre hem bellekte hem kalıcı
+    önbellekte ("yabancidizi-embed") tutulduğundan aynı 'data-id' için admin-ajax.php'ye
+    tekrar gidilmez. `ajax_calls` / `ajax_avoided` yapılan ve önlenen AJAX isteklerini sayar.
     """
-    try:
-        # 1. Bölüm sayfasının HTML'ini al
+
+    def __init__(self, base_url: str, stream_cache: Optional[StreamCache] = None) -> None:
+        self.base_url = base_url
+        self.stream_cache = stream_cache
+        self.ajax_calls = 0
+        self.ajax_avoided = 0
+        self._memo: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def find_data_id(self, episode_url: str) -> Optional[str]:
+        """Bölüm sayfasındaki Vidmoly oynatıcı butonunun 'data-id'sini döndürür."""
         episode_page_res = scraper.get(episode_url, headers=HEADERS, timeout=20)
         episode_page_res.raise_for_status()
-        soup = BeautifulSoup(episode_page_res.text, 'html.parser')
-
-        # 2. Vidmoly oynatıcı butonunu bul
+        soup = make_soup(episode_page_res.content)
         vidmoly_button = soup.find('a', text='Vidmoly')
         if not vidmoly_button or not vidmoly_button.has_attr('data-id'):
             return None
-        
-        data_id = vidmoly_button['data-id']
-        
-        # 3. AJAX POST isteğini yap
-        ajax_url = f"{base_url}/wp-admin/admin-ajax.php"
+        return vidmoly_button['data-id']
+
+    def _fetch_embed(self, data_id: str) -> Optional[str]:
+        with self._lock:
+            self.ajax_calls += 1
+        ajax_url = f"{self.base_url}/wp-admin/admin-ajax.php"
         payload = {
             "action": "get_player_embed",
             "id": data_id
         }
         ajax_res = scraper.post(ajax_url, headers=HEADERS, data=payload, timeout=20)
         ajax_res.raise_for_status()
-        
-        # 4. Gelen cevaptaki iframe'in src'sini al
-        iframe_soup = BeautifulSoup(ajax_res.text, 'html.parser')
-        iframe = iframe_soup.find('iframe')
-        
-        return iframe['src'] if iframe and iframe.has_attr('src') else None
+        # Gelen cevaptaki iframe'in src'sini al
+        return find_attribute(ajax_res.content, 'iframe', 'src')
 
-    except Exception as e:
-        print(f"  - Vidmoly linki alınırken hata: {e}", file=sys.stderr)
-        return None
+    def embed_for(self, data_id: str) -> Optional[str]:
+        """'data-id' için embed linkini bellekten, kalıcı önbellekten ya da AJAX ile döndürür."""
+        with self._lock:
+            if data_id in self._memo:
+                self.ajax_avoided += 1
+                return self._memo[data_id]
+        fetched = []
 
-def main():
-    base_url = get_dynamic_base_url()
-    m3u_lines = ["#EXTM3U\n"]
-    
-    print("Diziler HTML sayfaları taranarak bulunuyor...", file=sys.stderr)
-    
-    for page in range(1, MAX_PAGES_TO_SCAN + 1):
+        def fetch() -> Optional[str]:
+            fetched.append(data_id)
+            return self._fetch_embed(data_id)
+
+        embed = self.stream_cache.resolve("yabancidizi-embed", data_id, fetch) if self.stream_cache else fetch()
+        with self._lock:
+            if not fetched:
+                self.ajax_avoided += 1
+            if embed:
+                self._memo[data_id] = embed
+        return embed
+
+    def _resolve_page(self, episode_url: str) -> Optional[str]:
         try:
-            page_url = f"{base_url}/diziler/sayfa/{page}"
-            print(f"\nSayfa {page} taranıyor: {page_url}", file=sys.stderr)
-            
-            main_page_res = scraper.get(page_url, headers=HEADERS, timeout=20)
-            main_page_res.raise_for_status()
-            soup = BeautifulSoup(main_page_res.text, 'html.parser')
-            
-            series_list = soup.select("div.poster-card a")
-            if not series_list:
-                print(f"Sayfa {page} üzerinde dizi bulunamadı. Tarama tamamlandı.", file=sys.stderr)
-                break
-
-            for series_link in series_list:
-                series_url = series_link['href']
-                series_title = series_link.find('h3').text.strip() if series_link.find('h3') else "Bilinmeyen Dizi"
-                series_poster = series_link.find('img')['src'] if series_link.find('img') and series_link.find('img').has_attr('src') else ""
-                
-                print(f"-> Dizi işleniyor: {series_title}", file=sys.stderr)
-                
-                series_page_res = scraper.get(series_url, headers=HEADERS, timeout=20)
-                series_soup = BeautifulSoup(series_page_res.text, 'html.parser')
-                
-                seasons = series_soup.select("div.seasons-list > div")
-                for season_div in seasons:
-                    season_title = season_div.find('h3').text.strip() if season_div.find('h3') else ""
-                    season_num_match = re.search(r'(\d+)\.\s*Sezon', season_title)
-                    season_num = int(season_num_match.group(1)) if season_num_match else 0
-
-                    episodes = season_div.select("div.season-episodes > a")
-                    for episode_link in episodes:
-                        episode_url = episode_link['href']
-                        episode_title = episode_link.text.strip()
-                        episode_num_match = re.search(r'(\d+)\.\s*Bölüm', episode_title)
-                        episode_num = int(episode_num_match.group(1)) if episode_num_match else 0
-                        
-                        vidmoly_url = get_vidmoly_embed_url(base_url, episode_url)
-                        
-                        if vidmoly_url:
-                            print(f"  + Link bulundu: {series_title} S{season_num:02d}E{episode_num:02d}", file=sys.stderr)
-                            group_title = f"{series_title} | Sezon {season_num}"
-                            full_title = f"{series_title} - S{season_num:02d}E{episode_num:02d} - {episode_title}"
-                            m3u_lines.append(
-                                f'#EXTINF:-1 tvg-name="{full_title}" tvg-logo="{series_poster}" group-title="{group_title}",{full_title}\n'
-                                f'{vidmoly_url}\n'
-                            )
+            data_id = self.find_data_id(episode_url)
+            return self.embed_for(data_id) if data_id else None
+        except Exception as e:
+            print(f"  - Vidmoly linki alınırken hata: {e}", file=sys.stderr)
+            return None
+
+    def resolve(self, episode_url: str) -> Optional[str]:
+        """Bölümün Vidmoly embed linkini döndürür."""
+        if self.stream_cache is None:
+            return self._resolve_page(episode_url)
+        resolved = []
+
+        def resolve_page() -> Optional[str]:
+            resolved.append(episode_url)
+            return self._resolve_page(episode_url)
+
+        embed = self.stream_cache.resolve("yabancidizi", episode_url, resolve_page)
+        if not resolved:
+            with self._lock:
+                self.ajax_avoided += 1
+        return embed
+
+def parse_listing_page(html: bytes) -> List[Dict[str, str]]:
+    """Liste sayfasındaki dizi kartlarından adres, başlık ve posteri ayıklar."""
+    soup = make_soup(html)
+    cards = []
+    for series_link in soup.select("div.poster-card a"):
+        title_tag = series_link.find('h3')
+        img_tag = series_link.find('img')
+        cards.append({
+            "url": series_link['href'],
+            "title": title_tag.text.strip() if title_tag else "Bilinmeyen Dizi",
+            "poster": img_tag['src'] if img_tag and img_tag.has_attr('src') else "",
+        })
+    return cards
+
+def parse_series_page(html: bytes) -> List[Dict]:
+    """Dizi sayfasındaki sezonları ve her sezonun bölümlerini (adres, başlık, numara) ayıklar."""
+    soup = make_soup(html)
+    seasons = []
+    for season_div in soup.select("div.seasons-list > div"):
+        season_title = season_div.find('h3').text.strip() if season_div.find('h3') else ""
+        season_num_match = re.search(r'(\d+)\.\s*Sezon', season_title)
+        episodes = []
+        for episode_link in season_div.select("div.season-episodes > a"):
+            episode_title = episode_link.text.strip()
+            episode_num_match = re.search(r'(\d+)\.\s*Bölüm', episode_title)
+            episodes.append({
+                "url": episode_link['href'],
+                "title": episode_title,
+                "num": int(episode_num_match.group(1)) if episode_num_match else 0,
+            })
+        seasons.append({"num": int(season_num_match.group(1)) if season_num_match else 0, "episodes": episodes})
+    return seasons
 
+class YabanciDiziSource(Source):
+    """
+    yabancidizi: liste sayfaları -> dizi sayfası (sezonlar ve bölümler) -> Vidmoly embed linki.
+    Aynı dizi birden çok liste sayfasında görünebilir; yalnızca bir kez taranır ve
+    çıktıda ilk (en küçük sayfa/sıra) göründüğü yere yazılır.
+    """
+
+    name = "yabancidizi"
+    master_path = "yabancidizi_full.m3u"
+    manifest_name = None
+    session = scraper
+
+    def __init__(self, base_url: str, stream_cache: StreamCache, http_cache: HTTPCache,
+                 listing_workers: int = LISTING_WORKERS) -> None:
+        self.base_url = base_url
+        self.http_cache = http_cache
+        self.listing_workers = max(1, listing_workers)
+        self.vidmoly = VidmolyResolver(base_url, stream_cache)
+        self.duplicates = 0
+
+    def _fetch_listing(self, page: int) -> List[Dict[str, str]]:
+        page_url = f"{self.base_url}/diziler/sayfa/{page}"
+        print(f"Sayfa {page} taranıyor: {page_url}", file=sys.stderr)
+        try:
+            series_list = self.http_cache.get_parsed(
+                scraper.get, page_url, parse_listing_page, key="yabancidizi-liste", headers=HEADERS, timeout=20
+            )
         except Exception as e:
             print(f"Sayfa {page} işlenirken bir hata oluştu: {e}", file=sys.stderr)
-            continue
+            return []
+        if not series_list:
+            print(f"Sayfa {page} üzerinde dizi bulunamadı.", file=sys.stderr)
+        return series_list
+
+    def list_content(self) -> List[Dict[str, str]]:
+        print("Diziler HTML sayfaları taranarak bulunuyor...", file=sys.stderr)
+        with ThreadPoolExecutor(max_workers=self.listing_workers) as pool:
+            pages = list(pool.map(self._fetch_listing, range(1, MAX_PAGES_TO_SCAN + 1)))
+        seen = set()
+        contents = []
+        for series in (series for page in pages for series in page):
+            if series["url"] in seen:
+                self.duplicates += 1
+                continue
+            seen.add(series["url"])
+            contents.append({"url": series["url"], "name": series["title"], "img": series["poster"]})
+        return contents
 
-    output_filename = 'yabancidizi_full.m3u'
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        f.write(''.join(m3u_lines))
-        
-    content_count = len(m3u_lines) - 1
-    print(f"\nİşlem tamamlandı. '{output_filename}' dosyasına {content_count} içerik eklendi.", file=sys.stderr)
+    def list_episodes(self, content: Dict[str, Any]) -> List[Dict[str, Any]]:
+        print(f"-> Dizi işleniyor: {content['name']}", file=sys.stderr)
+        try:
+            seasons = self.http_cache.get_parsed(
+                scraper.get, content["url"], parse_series_page, key="yabancidizi-dizi", headers=HEADERS, timeout=20
+            )
+        except Exception as e:
+            print(f"  - Dizi sayfası alınamadı: {e}", file=sys.stderr)
+            return []
+        episodes = []
+        for season in seasons:
+            for episode in season["episodes"]:
+                code = f"S{season['num']:02d}E{episode['num']:02d}"
+                episodes.append({
+                    "url": episode["url"],
+                    "name": f"{content['name']} - {code} - {episode['title']}",
+                    "code": code,
+                    "season": season["num"],
+                })
+        return episodes
+
+    def resolve_stream(self, episode: Dict[str, Any]) -> Optional[str]:
+        vidmoly_url = self.vidmoly.resolve(episode["url"])
+        if vidmoly_url:
+            print(f"  + Link bulundu: {episode['name']}", file=sys.stderr)
+        return vidmoly_url
+
+    def entries(self, content: Dict[str, Any]) -> Iterator[Entry]:
+        for episode in content["episodes"]:
+            group_title = f"{content['name']} | Sezon {episode['season']}"
+            yield episode["name"], episode["stream_url"], [
+                ("tvg-name", episode["name"]), ("tvg-logo", content["img"]), ("group-title", group_title),
+            ]
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="YabanciDizi M3U oluşturucu")
+    parser.add_argument("--listing-workers", type=int, default=LISTING_WORKERS,
+                        help="Liste sayfalarını eşzamanlı çeken işçi sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--series-workers", type=int, default=SERIES_WORKERS,
+                        help="Dizi sayfalarını eşzamanlı çeken işçi sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--episode-workers", type=int, default=EPISODE_WORKERS,
+                        help="Vidmoly linklerini eşzamanlı çözen işçi sayısı (varsayılan: %(default)s)")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                        help="Host başına saniyedeki başlangıç istek sayısı (varsayılan: %(default)s)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None, stream_cache: Optional[StreamCache] = None,
+         http_cache: Optional[HTTPCache] = None) -> bool:
+    """
+    Listeyi üretir; M3U yazıldıysa True döner. Önbellekler verilirse (run_all.py'nin
+    ortak önbellekleri) onlar kullanılır ve kapatılmaz.
+    """
+    args = parse_args(argv)
+    owns_stream_cache, owns_http_cache = stream_cache is None, http_cache is None
+    stream_cache = stream_cache or StreamCache()
+    stream_cache.set_policy("yabancidizi", STREAM_TTL_DAYS, STREAM_REVALIDATE_DAYS)
+    stream_cache.set_policy("yabancidizi-embed", STREAM_TTL_DAYS, STREAM_REVALIDATE_DAYS)
+    http_cache = http_cache or HTTPCache()
+    limiter = RateScheduler(args.rate, burst=max(1, args.episode_workers))
+    try:
+        source = YabanciDiziSource(get_dynamic_base_url(), stream_cache, http_cache, args.listing_workers)
+        engine = Engine(source, workers=args.episode_workers, list_workers=args.series_workers, limiter=limiter)
+        data = engine.run()
+        if engine.pipeline is not None:
+            print(f"Tarama hattı: {engine.pipeline.summary()}", file=sys.stderr)
+        vidmoly = source.vidmoly
+        print(f"Vidmoly: {vidmoly.ajax_calls} AJAX isteği yapıldı, {vidmoly.ajax_avoided} istek önbellek "
+              f"(bölüm / 'data-id') sayesinde önlendi; {source.duplicates} tekrarlanan dizi taranmadı.", file=sys.stderr)
+        if data:
+            content_count = sum(len(series["episodes"]) for series in data)
+            print(f"\nİşlem tamamlandı. '{source.master_path}' dosyasına {content_count} içerik eklendi.", file=sys.stderr)
+        return bool(data)
+    finally:
+        if owns_stream_cache:
+            for name, counts in stream_cache.stats().items():
+                print(f"Önbellek [{name}]: {counts.get('hit', 0)} isabet, {counts.get('miss', 0)} ıska, "
+                      f"{counts.get('stale', 0)} yeniden doğrulama", file=sys.stderr)
+            stream_cache.close()
+        if owns_http_cache:
+            stats = http_cache.stats
+            print(f"HTTP önbelleği: {stats['requests']} istek, {stats['not_modified']} yanıt 304, "
+                  f"{stats['pages_skipped']} sayfa ayrıştırılmadan atlandı, {stats['bytes_saved'] / 1024:.1f} KB "
+                  f"tasarruf", file=sys.stderr)
+            http_cache.close()
+        print(f"Hız sınırlayıcı: {limiter.summary()}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        print(f"Ölçümler: {METRICS.summary()}", file=sys.stderr)
+        write_report("yabancidizi")